@@ -7,6 +7,9 @@ Flask-based web interface for the interactive map viewer.
 import os
 from flask import Flask
 from backend.config import get_config
+from backend.utils.compression import init_compression
+from backend.utils.metrics import init_metrics
+from backend.utils.profiling import init_profiling
 from flask_cors import CORS
 
 # Check if running on AWS Lambda
@@ -44,10 +47,17 @@ def create_app() -> Flask:
     except Exception:
         pass
     # Register blueprints
-    from .routes import main_bp, api_bp, assets_bp
+    from .routes import main_bp, api_bp, assets_bp, start_inactivity_monitor
     app.register_blueprint(main_bp)
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(assets_bp)
+    start_inactivity_monitor()
+    # Registered before the other hooks so its after_request runs last
+    init_metrics(app)
+    init_profiling(app)
+    # Registered first so it runs after the header hooks below
+    # (on Lambda, CloudFront compresses API responses)
+    init_compression(app, compress_json=not IS_LAMBDA)
     add_cache_busting_headers(app)
     add_api_cache_headers(app)
     return app
@@ -60,6 +70,10 @@ def add_cache_busting_headers(app):
             # Do not force no-store on GET /api/* so CDN can cache per sandbox
             if request.method == 'GET' and request.path.startswith('/api/'):
                 return response
+            # The map page carries its own ETag (routes.main_map); its language comes from the cookie
+            if request.method == 'GET' and request.path == '/':
+                response.headers['Vary'] = (response.headers.get('Vary', '') + ', Cookie').strip(', ')
+                return response
         except Exception:
             pass
         response.headers['Cache-Control'] = 'no-store'
@@ -72,8 +86,10 @@ def add_api_cache_headers(app):
             # Enable CDN caching for GET /api/* responses; others remain no-store
             from flask import request
             if request.method == 'GET' and request.path.startswith('/api/'):
-                # Short TTL on origin; CloudFront will honor behavior TTLs
-                response.headers['Cache-Control'] = 'public, max-age=60'
+                # Short TTL on origin; CloudFront will honor behavior TTLs.
+                # Versioned (ETag) and explicitly uncacheable responses keep their own Cache-Control.
+                if 'ETag' not in response.headers and 'no-store' not in response.headers.get('Cache-Control', ''):
+                    response.headers['Cache-Control'] = 'public, max-age=60'
                 # Vary by sandbox query for safety at proxies
                 response.headers['Vary'] = (response.headers.get('Vary', '') + ', Accept-Encoding, Origin').strip(', ')
         except Exception:
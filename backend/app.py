@@ -4,6 +4,7 @@ The Dying Lands - Main Application
 Refactored entry point using modular architecture.
 """
 
+import os
 import sys
 from pathlib import Path
 from backend.config import get_config, update_config
@@ -25,11 +26,13 @@ def main():
         # Log startup
         log_operation("app_startup", True, f"Starting on {config.host}:{config.port}")
         
-        # Run the application
+        # Run the application. The Werkzeug reloader starts the whole app
+        # twice, so it is opt-in (HEXY_RELOAD=1) rather than implied by debug.
         app.run(
             host=config.host,
             port=config.port,
-            debug=config.debug
+            debug=config.debug,
+            use_reloader=config.debug and os.getenv('HEXY_RELOAD', '0') == '1'
         )
         
     except Exception as e:
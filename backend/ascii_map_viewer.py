@@ -24,8 +24,9 @@ from main_map_generator import MainMapGenerator
 from translation_system import translation_system
 from city_overlay_analyzer import city_overlay_analyzer
 from backend.utils.city_processor import create_major_city_response
+from backend.utils.markdown_tokenizer import load_markdown
 from backend.utils.content_detector import get_hex_content_type, check_hex_has_loot, extract_title
-from backend.utils.grid_generator import generate_hex_grid, get_terrain_for_hex, determine_content_symbol, determine_css_class
+from backend.utils.grid_generator import generate_hex_grid, determine_content_symbol, determine_css_class
 from backend.utils.settlement_data_creator import create_settlement_response_data, create_major_city_response_data
 
 app = Flask(__name__, template_folder='../web/templates', static_folder='../web/static')
@@ -113,8 +114,7 @@ def get_hex_info(hex_code):
     # Check if it's a settlement
     if os.path.exists(hex_file):
         try:
-            with open(hex_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = load_markdown(hex_file).content
             
             # Check if this is a settlement
             if '⌂ **' in content:
@@ -342,8 +342,7 @@ def get_settlement_details(hex_code):
     # Try to load from existing file first
     if os.path.exists(hex_file):
         try:
-            with open(hex_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = load_markdown(hex_file).content
             
             # Check if this is a settlement
             if '⌂ **' in content:
@@ -9,7 +9,9 @@ import os
 import random
 import json
 import math
-from typing import Dict, List, Tuple, Optional, Any
+import shutil
+import threading
+from typing import Dict, List, Tuple, Optional, Any, Iterable
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -17,26 +19,62 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from backend.mork_borg_lore_database import MorkBorgLoreDatabase
 from backend.database_manager import database_manager
 from backend.utils.city_helpers import create_fallback_district_data
+from backend.utils.lazy import LazyObject
 
 class CityOverlayAnalyzer:
     """Generates round hex grids for city overlays using matrix-based district placement and random content generation."""
     
-    def __init__(self, language='en'):
+    def __init__(self, language='en', output_directory: Optional[str] = None):
         self.lore_db = MorkBorgLoreDatabase()
-        # Honor HEXY_OUTPUT_DIR directly if provided, else fallback to app dir
-        base_root = os.getenv('HEXY_OUTPUT_DIR') or os.getenv('HEXY_APP_DIR') or os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-        self.output_directory = os.path.join(base_root, 'dying_lands_output', 'city_overlays')
+        # Overlays live inside the world output directory so that cold-boot
+        # generation can build them in staging and swap them in atomically.
+        if output_directory is None:
+            from backend.config import get_config
+            output_directory = str(get_config().paths.output_path / 'city_overlays')
+        self.output_directory = output_directory
         os.makedirs(self.output_directory, exist_ok=True)
         self.language = language
         self.content_tables = database_manager.load_tables(language)
         self.overlays_cache = {}
+        self.contexts_cache = {}
+        # Source of all overlay randomness; pregeneration gives each city its own seeded generator
+        self.rng = random.Random()
 
     def invalidate_cache(self) -> None:
         """Clear in-memory overlays cache after a reset."""
         try:
             self.overlays_cache.clear()
+            self.contexts_cache.clear()
         except Exception:
             self.overlays_cache = {}
+            self.contexts_cache = {}
+
+    def get_overlay_path(self, overlay_name: str) -> str:
+        """Path of the persisted overlay JSON for this analyzer's language."""
+        return os.path.join(self.output_directory, self.language, f"{overlay_name}_overlay.json")
+
+    def _legacy_overlay_path(self, overlay_name: str) -> str:
+        """Pre-language overlay location (city_overlays/<name>_overlay.json), shared by every language."""
+        return os.path.join(self.output_directory, f"{overlay_name}_overlay.json")
+
+    def _migrate_legacy_overlay(self, overlay_name: str) -> None:
+        """Copy an overlay saved in the old flat layout to this language's path.
+
+        The flat file is left in place: other languages migrate from it too.
+        """
+        legacy = self._legacy_overlay_path(overlay_name)
+        if not os.path.exists(legacy):
+            return
+        filename = self.get_overlay_path(overlay_name)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        tmp = f"{filename}.tmp"
+        shutil.copyfile(legacy, tmp)
+        os.replace(tmp, filename)
+        print(f"Migrated overlay {overlay_name} to {filename}")
+
+    def _context_path(self, city_name: str) -> str:
+        """Path of the persisted city context, stored alongside the overlay."""
+        return os.path.join(self.output_directory, self.language, f"{city_name}_context.json")
 
     def get_available_overlays(self) -> List[Dict[str, Any]]:
         """Get list of available city overlays by name only (no image files)."""
@@ -277,7 +315,8 @@ class CityOverlayAnalyzer:
                 self._get_city_encounters,
                 self._get_city_atmospheres,
                 self._get_city_random_table,
-                self._generate_district_random_table
+                self._generate_district_random_table,
+                rng=self.rng
             )
     
     def _find_district_data(self, district_name: str, city_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
@@ -448,7 +487,7 @@ class CityOverlayAnalyzer:
         if not items:
             raise ValueError("Cannot choose from empty items list")
             
-        return random.choices(items, weights=weights_list)[0]
+        return self.rng.choices(items, weights=weights_list)[0]
     
     def _safe_random_choice(self, items: List[str], context: str = "unknown") -> str:
         """Safely choose a random item from a list, with fallback for empty lists."""
@@ -473,7 +512,7 @@ class CityOverlayAnalyzer:
                 "ruins_artifacts": "Forgotten knowledge"
             }
             return defaults.get(context, "Unknown")
-        return random.choice(items)
+        return self.rng.choice(items)
     
     def _load_city_database(self, city_name: str) -> Optional[Dict[str, Any]]:
         """Load city-specific database if available."""
@@ -693,8 +732,13 @@ class CityOverlayAnalyzer:
         
         return content
     
-    def get_city_context(self, city_name: str) -> Dict[str, Any]:
-        """Get city context information for the left panel."""
+    def get_city_context(self, city_name: str, seed: Optional[str] = None) -> Dict[str, Any]:
+        """Get city context information for the left panel.
+
+        Faction selection is drawn from a generator seeded with ``seed`` so the
+        same seed always yields the same context.
+        """
+        rng = random.Random(seed)
         city_data = self._load_city_database(city_name)
         if not city_data:
             return {}
@@ -749,22 +793,22 @@ class CityOverlayAnalyzer:
             # Select major factions for the city
             major_factions = factions_data.get('major_factions', [])
             if major_factions:
-                num_major = random.randint(2, 4)
-                selected_major = random.sample(major_factions, min(num_major, len(major_factions)))
+                num_major = rng.randint(2, 4)
+                selected_major = rng.sample(major_factions, min(num_major, len(major_factions)))
                 context['major_factions'] = selected_major
             
             # Select local factions for the city
             local_factions = factions_data.get('local_factions', [])
             if local_factions:
-                num_local = random.randint(3, 6)
-                selected_local = random.sample(local_factions, min(num_local, len(local_factions)))
+                num_local = rng.randint(3, 6)
+                selected_local = rng.sample(local_factions, min(num_local, len(local_factions)))
                 context['local_factions'] = selected_local
             
             # Select criminal factions for the city
             criminal_factions = factions_data.get('criminal_factions', [])
             if criminal_factions:
-                num_criminal = random.randint(2, 4)
-                selected_criminal = random.sample(criminal_factions, min(num_criminal, len(criminal_factions)))
+                num_criminal = rng.randint(2, 4)
+                selected_criminal = rng.sample(criminal_factions, min(num_criminal, len(criminal_factions)))
                 context['criminal_factions'] = selected_criminal
             
             # Get faction relationships
@@ -776,8 +820,8 @@ class CityOverlayAnalyzer:
         if not context.get('major_factions') and 'affiliations' in enriched_content:
             affiliations = enriched_content['affiliations']
             if 'faction_affiliations' in affiliations and isinstance(affiliations['faction_affiliations'], list):
-                num_factions = random.randint(3, 6)
-                selected_factions = random.sample(affiliations['faction_affiliations'], 
+                num_factions = rng.randint(3, 6)
+                selected_factions = rng.sample(affiliations['faction_affiliations'], 
                                                 min(num_factions, len(affiliations['faction_affiliations'])))
                 
                 faction_attitudes = affiliations.get('affiliation_attitudes', [])
@@ -785,7 +829,7 @@ class CityOverlayAnalyzer:
                 for faction in selected_factions:
                     faction_info = {
                         'name': faction,
-                        'attitude': random.choice(faction_attitudes) if faction_attitudes else 'Unknown'
+                        'attitude': rng.choice(faction_attitudes) if faction_attitudes else 'Unknown'
                     }
                     context['legacy_factions'].append(faction_info)
         
@@ -808,6 +852,36 @@ class CityOverlayAnalyzer:
     
 
     
+    def load_city_context(self, city_name: str, generation_version: str) -> Dict[str, Any]:
+        """Get the city context for a world generation version.
+
+        The context is generated once per (city, language, generation version)
+        with a seed derived from that key, persisted next to the overlay and
+        then served from memory.
+        """
+        cache_key = (city_name, generation_version)
+        if cache_key in self.contexts_cache:
+            return self.contexts_cache[cache_key]
+
+        filename = self._context_path(city_name)
+        if os.path.exists(filename):
+            try:
+                with open(filename, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+                if stored.get('generation_version') == generation_version:
+                    self.contexts_cache[cache_key] = stored.get('context', {})
+                    return self.contexts_cache[cache_key]
+            except Exception as e:
+                print(f"Error loading city context: {e}")
+
+        context = self.get_city_context(city_name, seed=f"{self.language}:{city_name}:{generation_version}")
+        if context:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump({'generation_version': generation_version, 'context': context}, f, indent=2, ensure_ascii=False)
+        self.contexts_cache[cache_key] = context
+        return context
+
     def _get_city_content_list(self, city_data: Optional[Dict[str, Any]], content_type: str, fallback: List[str]) -> List[str]:
         """Get city-specific content list or fallback to generic."""
         if city_data and content_type in city_data:
@@ -843,25 +917,25 @@ class CityOverlayAnalyzer:
         try:
             district_descriptions = database_manager.get_table('descriptions', 'district_descriptions', self.language)
             if district_descriptions:
-                description = random.choice(district_descriptions)
+                description = self.rng.choice(district_descriptions)
             else:
                 description = district_data.get(
                     'description',
-                    f"A district where {random.choice(['the wealthy once lived', 'merchants once thrived', 'scholars once studied', 'the poor struggle to survive'])}."
+                    f"A district where {self.rng.choice(['the wealthy once lived', 'merchants once thrived', 'scholars once studied', 'the poor struggle to survive'])}."
                 )
         except Exception:
             description = district_data.get(
                 'description',
-                f"A district where {random.choice(['the wealthy once lived', 'merchants once thrived', 'scholars once studied', 'the poor struggle to survive'])}."
+                f"A district where {self.rng.choice(['the wealthy once lived', 'merchants once thrived', 'scholars once studied', 'the poor struggle to survive'])}."
             )
             
         # Encounters
         encounters = district_data.get('encounters', [])
-        encounter = random.choice(encounters) if encounters else "Mysterious activities in the district"
+        encounter = self.rng.choice(encounters) if encounters else "Mysterious activities in the district"
             
         # Atmosphere
         atmospheres = district_data.get('atmosphere_modifiers', [])
-        atmosphere = random.choice(atmospheres) if atmospheres else "Dark and foreboding"
+        atmosphere = self.rng.choice(atmospheres) if atmospheres else "Dark and foreboding"
             
         # Random table
         random_tables = district_data.get('random_tables', {})
@@ -872,11 +946,11 @@ class CityOverlayAnalyzer:
         for content_type in ['buildings', 'streets', 'landmarks']:
             entries = district_data.get(content_type, [])
             if entries:
-                notable_features.append(random.choice(entries))
+                notable_features.append(self.rng.choice(entries))
             if not notable_features:
                 notable_features = [
-                    random.choice(["Crumbling mansions", "Narrow alleyways", "Ancient statues", "Broken fountains"]),
-                    random.choice(["Abandoned shops", "Boarded windows", "Graffiti-covered walls", "Overgrown gardens"])
+                    self.rng.choice(["Crumbling mansions", "Narrow alleyways", "Ancient statues", "Broken fountains"]),
+                    self.rng.choice(["Abandoned shops", "Boarded windows", "Graffiti-covered walls", "Overgrown gardens"])
                 ]
             
         return {
@@ -917,8 +991,8 @@ class CityOverlayAnalyzer:
                 "armazém cheio de artefatos estranhos"
             ]
         
-        name = random.choice(buildings)
-        purpose = random.choice(purposes)
+        name = self.rng.choice(buildings)
+        purpose = self.rng.choice(purposes)
         
         # Get encounters from district data if available
         encounters = []
@@ -928,13 +1002,13 @@ class CityOverlayAnalyzer:
             encounters = self._get_city_encounters(city_data, 'building', [])
         
         if encounters:
-            encounter = random.choice(encounters)
+            encounter = self.rng.choice(encounters)
         else:
             # Try to get encounters from database
             try:
                 building_encounters = database_manager.get_table('encounters', 'building_encounters', self.language)
                 if building_encounters:
-                    encounter = random.choice(building_encounters)
+                    encounter = self.rng.choice(building_encounters)
                 else:
                     raise ValueError("No building encounters available in database")
             except Exception:
@@ -948,13 +1022,13 @@ class CityOverlayAnalyzer:
             atmospheres = self._get_city_atmospheres(city_data, [])
         
         if atmospheres:
-            atmosphere = random.choice(atmospheres)
+            atmosphere = self.rng.choice(atmospheres)
         else:
             # Try to get atmospheres from database
             try:
                 atmospheres = database_manager.get_table('core', 'atmospheres', self.language)
                 if atmospheres:
-                    atmosphere = random.choice(atmospheres)
+                    atmosphere = self.rng.choice(atmospheres)
                 else:
                     raise ValueError("No atmospheres available in database")
             except Exception:
@@ -991,7 +1065,7 @@ class CityOverlayAnalyzer:
         if not streets:
             streets = self._get_enhanced_fallback_content('streets')
         
-        name = random.choice(streets)
+        name = self.rng.choice(streets)
         condition = self._safe_random_choice(database_manager.get_table('features', 'street_features', self.language) or [], "street_features")
         
         # Get encounters from district data if available
@@ -1002,13 +1076,13 @@ class CityOverlayAnalyzer:
             encounters = self._get_city_encounters(city_data, 'street', [])
         
         if encounters:
-            encounter = random.choice(encounters)
+            encounter = self.rng.choice(encounters)
         else:
             # Try to get encounters from database
             try:
                 street_encounters = database_manager.get_table('encounters', 'street_encounters', self.language)
                 if street_encounters:
-                    encounter = random.choice(street_encounters)
+                    encounter = self.rng.choice(street_encounters)
                 else:
                     raise ValueError("No street encounters available in database")
             except Exception:
@@ -1022,13 +1096,13 @@ class CityOverlayAnalyzer:
             atmospheres = self._get_city_atmospheres(city_data, [])
         
         if atmospheres:
-            atmosphere = random.choice(atmospheres)
+            atmosphere = self.rng.choice(atmospheres)
         else:
             # Try to get atmospheres from database
             try:
                 atmospheres = database_manager.get_table('core', 'atmospheres', self.language)
                 if atmospheres:
-                    atmosphere = random.choice(atmospheres)
+                    atmosphere = self.rng.choice(atmospheres)
                 else:
                     raise ValueError("No atmospheres available in database")
             except Exception:
@@ -1062,14 +1136,14 @@ class CityOverlayAnalyzer:
         elif city_data and 'landmarks' in city_data:
             landmarks = city_data['landmarks']
         
-        name = random.choice(landmarks)
+        name = self.rng.choice(landmarks)
         
         # Get landmark features from city data
         significance = ""
         if city_data and 'features' in city_data:
             landmark_features = city_data['features'].get('landmark_features', [])
             if landmark_features:
-                significance = random.choice(landmark_features)
+                significance = self.rng.choice(landmark_features)
             else:
                 significance = self._safe_random_choice(database_manager.get_table('features', 'landmark_features', self.language) or [], "landmark_features")
         else:
@@ -1083,13 +1157,13 @@ class CityOverlayAnalyzer:
             encounters = self._get_city_encounters(city_data, 'landmark', [])
         
         if encounters:
-            encounter = random.choice(encounters)
+            encounter = self.rng.choice(encounters)
         else:
             # Try to get encounters from database
             try:
                 landmark_encounters = database_manager.get_table('encounters', 'landmark_encounters', self.language)
                 if landmark_encounters:
-                    encounter = random.choice(landmark_encounters)
+                    encounter = self.rng.choice(landmark_encounters)
                 else:
                     raise ValueError("No landmark encounters available in database")
             except Exception:
@@ -1103,13 +1177,13 @@ class CityOverlayAnalyzer:
             atmospheres = self._get_city_atmospheres(city_data, [])
         
         if atmospheres:
-            atmosphere = random.choice(atmospheres)
+            atmosphere = self.rng.choice(atmospheres)
         else:
             # Try to get atmospheres from database
             try:
                 atmospheres = database_manager.get_table('core', 'atmospheres', self.language)
                 if atmospheres:
-                    atmosphere = random.choice(atmospheres)
+                    atmosphere = self.rng.choice(atmospheres)
                 else:
                     raise ValueError("No atmospheres available in database")
             except Exception:
@@ -1165,8 +1239,8 @@ class CityOverlayAnalyzer:
             if not specialties:
                 raise ValueError("No market specialties available in database")
         
-        name = random.choice(markets)
-        specialty = random.choice(specialties)
+        name = self.rng.choice(markets)
+        specialty = self.rng.choice(specialties)
         
         # Get encounters from district data if available
         encounters = []
@@ -1176,13 +1250,13 @@ class CityOverlayAnalyzer:
             encounters = self._get_city_encounters(city_data, 'market', [])
         
         if encounters:
-            encounter = random.choice(encounters)
+            encounter = self.rng.choice(encounters)
         else:
             # Try to get encounters from database
             try:
                 market_encounters = database_manager.get_table('encounters', 'market_encounters', self.language)
                 if market_encounters:
-                    encounter = random.choice(market_encounters)
+                    encounter = self.rng.choice(market_encounters)
                 else:
                     raise ValueError("No market encounters available in database")
             except Exception:
@@ -1196,13 +1270,13 @@ class CityOverlayAnalyzer:
             atmospheres = self._get_city_atmospheres(city_data, [])
         
         if atmospheres:
-            atmosphere = random.choice(atmospheres)
+            atmosphere = self.rng.choice(atmospheres)
         else:
             # Try to get atmospheres from database
             try:
                 atmospheres = database_manager.get_table('core', 'atmospheres', self.language)
                 if atmospheres:
-                    atmosphere = random.choice(atmospheres)
+                    atmosphere = self.rng.choice(atmospheres)
                 else:
                     raise ValueError("No atmospheres available in database")
             except Exception:
@@ -1249,8 +1323,8 @@ class CityOverlayAnalyzer:
         if not deities:
             raise ValueError("No temple deities available in database")
         
-        name = random.choice(temples)
-        deity = random.choice(deities)
+        name = self.rng.choice(temples)
+        deity = self.rng.choice(deities)
         
         # Get encounters from district data if available
         encounters = []
@@ -1260,13 +1334,13 @@ class CityOverlayAnalyzer:
             encounters = self._get_city_encounters(city_data, 'temple', [])
         
         if encounters:
-            encounter = random.choice(encounters)
+            encounter = self.rng.choice(encounters)
         else:
             # Try to get encounters from database
             try:
                 temple_encounters = database_manager.get_table('encounters', 'temple_encounters', self.language)
                 if temple_encounters:
-                    encounter = random.choice(temple_encounters)
+                    encounter = self.rng.choice(temple_encounters)
                 else:
                     raise ValueError("No temple encounters available in database")
             except Exception:
@@ -1280,13 +1354,13 @@ class CityOverlayAnalyzer:
             atmospheres = self._get_city_atmospheres(city_data, [])
         
         if atmospheres:
-            atmosphere = random.choice(atmospheres)
+            atmosphere = self.rng.choice(atmospheres)
         else:
             # Try to get atmospheres from database
             try:
                 atmospheres = database_manager.get_table('core', 'atmospheres', self.language)
                 if atmospheres:
-                    atmosphere = random.choice(atmospheres)
+                    atmosphere = self.rng.choice(atmospheres)
                 else:
                     raise ValueError("No atmospheres available in database")
             except Exception:
@@ -1328,7 +1402,7 @@ class CityOverlayAnalyzer:
             if not taverns:
                 raise ValueError("No tavern names available in database")
         
-        name = random.choice(taverns)
+        name = self.rng.choice(taverns)
         
         # Get encounters from district data if available
         encounters = []
@@ -1338,13 +1412,13 @@ class CityOverlayAnalyzer:
             encounters = self._get_city_encounters(city_data, 'tavern', [])
         
         if encounters:
-            encounter = random.choice(encounters)
+            encounter = self.rng.choice(encounters)
         else:
             # Try to get encounters from database
             try:
                 tavern_encounters = database_manager.get_table('encounters', 'tavern_encounters', self.language)
                 if tavern_encounters:
-                    encounter = random.choice(tavern_encounters)
+                    encounter = self.rng.choice(tavern_encounters)
                 else:
                     raise ValueError("No tavern encounters available in database")
             except Exception:
@@ -1358,13 +1432,13 @@ class CityOverlayAnalyzer:
             atmospheres = self._get_city_atmospheres(city_data, [])
         
         if atmospheres:
-            atmosphere = random.choice(atmospheres)
+            atmosphere = self.rng.choice(atmospheres)
         else:
             # Try to get atmospheres from database
             try:
                 atmospheres = database_manager.get_table('core', 'atmospheres', self.language)
                 if atmospheres:
-                    atmosphere = random.choice(atmospheres)
+                    atmosphere = self.rng.choice(atmospheres)
                 else:
                     raise ValueError("No atmospheres available in database")
             except Exception:
@@ -1374,7 +1448,7 @@ class CityOverlayAnalyzer:
         tavern_descriptions = database_manager.get_table('descriptions', 'tavern_descriptions', self.language)
         if not tavern_descriptions:
             raise ValueError("No tavern descriptions available in database")
-        description = random.choice(tavern_descriptions)
+        description = self.rng.choice(tavern_descriptions)
         
         # Get tavern NPCs from city data if available, otherwise from database
         tavern_npcs = []
@@ -1394,7 +1468,7 @@ class CityOverlayAnalyzer:
             
         if not tavern_npcs or not tavern_customers:
             raise ValueError("No tavern NPCs available in database")
-        npcs = [random.choice(tavern_npcs), random.choice(tavern_customers)]
+        npcs = [self.rng.choice(tavern_npcs), self.rng.choice(tavern_customers)]
         
         return {
             'name': name,
@@ -1432,8 +1506,8 @@ class CityOverlayAnalyzer:
             if not purposes:
                 raise ValueError("No guild purposes available in database")
         
-        name = random.choice(guilds)
-        purpose = random.choice(purposes)
+        name = self.rng.choice(guilds)
+        purpose = self.rng.choice(purposes)
         
         # Get encounters from district data if available
         encounters = []
@@ -1443,13 +1517,13 @@ class CityOverlayAnalyzer:
             encounters = self._get_city_encounters(city_data, 'guild', [])
         
         if encounters:
-            encounter = random.choice(encounters)
+            encounter = self.rng.choice(encounters)
         else:
             # Try to get encounters from database
             try:
                 guild_encounters = database_manager.get_table('encounters', 'guild_encounters', self.language)
                 if guild_encounters:
-                    encounter = random.choice(guild_encounters)
+                    encounter = self.rng.choice(guild_encounters)
                 else:
                     raise ValueError("No guild encounters available in database")
             except Exception:
@@ -1463,13 +1537,13 @@ class CityOverlayAnalyzer:
             atmospheres = self._get_city_atmospheres(city_data, [])
         
         if atmospheres:
-            atmosphere = random.choice(atmospheres)
+            atmosphere = self.rng.choice(atmospheres)
         else:
             # Try to get atmospheres from database
             try:
                 atmospheres = database_manager.get_table('core', 'atmospheres', self.language)
                 if atmospheres:
-                    atmosphere = random.choice(atmospheres)
+                    atmosphere = self.rng.choice(atmospheres)
                 else:
                     raise ValueError("No atmospheres available in database")
             except Exception:
@@ -1512,21 +1586,21 @@ class CityOverlayAnalyzer:
         inhabitants = database_manager.get_table('descriptions', 'residence_inhabitants', self.language)
         if not inhabitants:
             raise ValueError("No residence inhabitants available in database")
-        name = random.choice(residences)
-        inhabitant = random.choice(inhabitants)
+        name = self.rng.choice(residences)
+        inhabitant = self.rng.choice(inhabitants)
         encounters = []
         if district_data and 'encounters' in district_data:
             encounters = district_data['encounters']
         elif city_data:
             encounters = self._get_city_encounters(city_data, 'residence', [])
         if encounters:
-            encounter = random.choice(encounters)
+            encounter = self.rng.choice(encounters)
         else:
             # Try to get encounters from database
             try:
                 residence_encounters = database_manager.get_table('encounters', 'residence_encounters', self.language)
                 if residence_encounters:
-                    encounter = random.choice(residence_encounters)
+                    encounter = self.rng.choice(residence_encounters)
                 else:
                     raise ValueError("No residence encounters available in database")
             except Exception:
@@ -1537,13 +1611,13 @@ class CityOverlayAnalyzer:
         elif city_data:
             atmospheres = self._get_city_atmospheres(city_data, [])
         if atmospheres:
-            atmosphere = random.choice(atmospheres)
+            atmosphere = self.rng.choice(atmospheres)
         else:
             # Try to get atmospheres from database
             try:
                 atmospheres = database_manager.get_table('core', 'atmospheres', self.language)
                 if atmospheres:
-                    atmosphere = random.choice(atmospheres)
+                    atmosphere = self.rng.choice(atmospheres)
                 else:
                     raise ValueError("No atmospheres available in database")
             except Exception:
@@ -1580,21 +1654,21 @@ class CityOverlayAnalyzer:
         histories = database_manager.get_table('descriptions', 'ruins_histories', self.language)
         if not histories:
             raise ValueError("No ruins histories available in database")
-        name = random.choice(ruins)
-        history = random.choice(histories)
+        name = self.rng.choice(ruins)
+        history = self.rng.choice(histories)
         encounters = []
         if district_data and 'encounters' in district_data:
             encounters = district_data['encounters']
         elif city_data:
             encounters = self._get_city_encounters(city_data, 'ruins', [])
         if encounters:
-            encounter = random.choice(encounters)
+            encounter = self.rng.choice(encounters)
         else:
             # Try to get encounters from database
             try:
                 ruins_encounters = database_manager.get_table('encounters', 'ruins_encounters', self.language)
                 if ruins_encounters:
-                    encounter = random.choice(ruins_encounters)
+                    encounter = self.rng.choice(ruins_encounters)
                 else:
                     raise ValueError("No ruins encounters available in database")
             except Exception:
@@ -1605,13 +1679,13 @@ class CityOverlayAnalyzer:
         elif city_data:
             atmospheres = self._get_city_atmospheres(city_data, [])
         if atmospheres:
-            atmosphere = random.choice(atmospheres)
+            atmosphere = self.rng.choice(atmospheres)
         else:
             # Try to get atmospheres from database
             try:
                 atmospheres = database_manager.get_table('core', 'atmospheres', self.language)
                 if atmospheres:
-                    atmosphere = random.choice(atmospheres)
+                    atmosphere = self.rng.choice(atmospheres)
                 else:
                     raise ValueError("No atmospheres available in database")
             except Exception:
@@ -1662,15 +1736,15 @@ class CityOverlayAnalyzer:
         
         # Add city events
         if 'city_events' in city_data and city_data['city_events']:
-            content['city_event'] = random.choice(city_data['city_events'])
+            content['city_event'] = self.rng.choice(city_data['city_events'])
         
         # Add weather conditions
         if 'weather_conditions' in city_data and isinstance(city_data['weather_conditions'], list) and len(city_data['weather_conditions']) > 0:
-            content['weather'] = random.choice(city_data['weather_conditions'])
+            content['weather'] = self.rng.choice(city_data['weather_conditions'])
         
         # Add population
         if 'populations' in city_data and isinstance(city_data['populations'], list) and len(city_data['populations']) > 0:
-            content['population'] = random.choice(city_data['populations'])
+            content['population'] = self.rng.choice(city_data['populations'])
         
         # Add notable features for relevant content types
         if content.get('type') in ['landmark', 'building', 'street', 'district']:
@@ -1678,22 +1752,22 @@ class CityOverlayAnalyzer:
                 features = city_data['features']
                 feature_type = f"{content.get('type')}_features"
                 if feature_type in features and isinstance(features[feature_type], list) and len(features[feature_type]) > 0:
-                    content['notable_features'] = [random.choice(features[feature_type])]
+                    content['notable_features'] = [self.rng.choice(features[feature_type])]
                 else:
                     # Fallback to general features
                     if 'landmark_features' in features and isinstance(features['landmark_features'], list) and len(features['landmark_features']) > 0:
-                        content['notable_features'] = [random.choice(features['landmark_features'])]
+                        content['notable_features'] = [self.rng.choice(features['landmark_features'])]
         
         # Add NPC traits for relevant content types
         if content.get('type') in ['tavern', 'guild', 'temple', 'market', 'service', 'street', 'building', 'landmark', 'residence', 'ruins']:
             if 'npc_traits' in city_data and isinstance(city_data['npc_traits'], list) and len(city_data['npc_traits']) > 0:
-                content['npc_trait'] = random.choice(city_data['npc_traits'])
+                content['npc_trait'] = self.rng.choice(city_data['npc_traits'])
             if 'npc_concerns' in city_data and isinstance(city_data['npc_concerns'], list) and len(city_data['npc_concerns']) > 0:
-                content['npc_concern'] = random.choice(city_data['npc_concerns'])
+                content['npc_concern'] = self.rng.choice(city_data['npc_concerns'])
             if 'npc_wants' in city_data and isinstance(city_data['npc_wants'], list) and len(city_data['npc_wants']) > 0:
-                content['npc_want'] = random.choice(city_data['npc_wants'])
+                content['npc_want'] = self.rng.choice(city_data['npc_wants'])
             if 'npc_secrets' in city_data and isinstance(city_data['npc_secrets'], list) and len(city_data['npc_secrets']) > 0:
-                content['npc_secret'] = random.choice(city_data['npc_secrets'])
+                content['npc_secret'] = self.rng.choice(city_data['npc_secrets'])
             
             # Add NPC name and trade (support dict structure with first/second names)
             if 'npc_names' in city_data:
@@ -1702,53 +1776,53 @@ class CityOverlayAnalyzer:
                     first_names = names_src.get('first_names', [])
                     second_names = names_src.get('second_names', [])
                     if isinstance(first_names, list) and isinstance(second_names, list) and first_names and second_names:
-                        content['npc_name'] = f"{random.choice(first_names)} {random.choice(second_names)}"
+                        content['npc_name'] = f"{self.rng.choice(first_names)} {self.rng.choice(second_names)}"
                 elif isinstance(names_src, list) and names_src:
-                    content['npc_name'] = random.choice(names_src)
+                    content['npc_name'] = self.rng.choice(names_src)
             if 'npc_trades' in city_data and isinstance(city_data['npc_trades'], list) and len(city_data['npc_trades']) > 0:
-                content['npc_trade'] = random.choice(city_data['npc_trades'])
+                content['npc_trade'] = self.rng.choice(city_data['npc_trades'])
             
             # Add affiliation
             if 'affiliations' in city_data and isinstance(city_data['affiliations'], dict):
                 affiliations = city_data['affiliations']
                 if 'npc_affiliations' in affiliations and isinstance(affiliations['npc_affiliations'], list) and len(affiliations['npc_affiliations']) > 0:
-                    content['npc_affiliation'] = random.choice(affiliations['npc_affiliations'])
+                    content['npc_affiliation'] = self.rng.choice(affiliations['npc_affiliations'])
                 if 'affiliation_attitudes' in affiliations and isinstance(affiliations['affiliation_attitudes'], list) and len(affiliations['affiliation_attitudes']) > 0:
-                    content['npc_attitude'] = random.choice(affiliations['affiliation_attitudes'])
+                    content['npc_attitude'] = self.rng.choice(affiliations['affiliation_attitudes'])
         
         # Add tavern-specific content
         if content.get('type') == 'tavern':
             if 'tavern_menu' in city_data and isinstance(city_data['tavern_menu'], list) and len(city_data['tavern_menu']) > 0:
-                content['tavern_menu'] = random.choice(city_data['tavern_menu'])
+                content['tavern_menu'] = self.rng.choice(city_data['tavern_menu'])
             if 'tavern_innkeeper' in city_data and isinstance(city_data['tavern_innkeeper'], list) and len(city_data['tavern_innkeeper']) > 0:
-                content['tavern_innkeeper'] = random.choice(city_data['tavern_innkeeper'])
+                content['tavern_innkeeper'] = self.rng.choice(city_data['tavern_innkeeper'])
             if 'tavern_patrons' in city_data and isinstance(city_data['tavern_patrons'], list) and len(city_data['tavern_patrons']) > 0:
-                content['tavern_patron'] = random.choice(city_data['tavern_patrons'])
+                content['tavern_patron'] = self.rng.choice(city_data['tavern_patrons'])
         
         # Add market-specific content
         if content.get('type') == 'market':
             if 'items_sold' in city_data and isinstance(city_data['items_sold'], list) and len(city_data['items_sold']) > 0:
                 # Select 3-5 random items to sell
-                num_items = random.randint(3, 5)
-                selected_items = random.sample(city_data['items_sold'], min(num_items, len(city_data['items_sold'])))
+                num_items = self.rng.randint(3, 5)
+                selected_items = self.rng.sample(city_data['items_sold'], min(num_items, len(city_data['items_sold'])))
                 content['items_sold'] = selected_items
             if 'beast_prices' in city_data and isinstance(city_data['beast_prices'], list) and len(city_data['beast_prices']) > 0:
                 # Select 2-3 random beasts to sell
-                num_beasts = random.randint(2, 3)
-                selected_beasts = random.sample(city_data['beast_prices'], min(num_beasts, len(city_data['beast_prices'])))
+                num_beasts = self.rng.randint(2, 3)
+                selected_beasts = self.rng.sample(city_data['beast_prices'], min(num_beasts, len(city_data['beast_prices'])))
                 content['beast_prices'] = selected_beasts
             if 'services' in city_data and isinstance(city_data['services'], list) and len(city_data['services']) > 0:
                 # Select 2-4 random services to offer
-                num_services = random.randint(2, 4)
-                selected_services = random.sample(city_data['services'], min(num_services, len(city_data['services'])))
+                num_services = self.rng.randint(2, 4)
+                selected_services = self.rng.sample(city_data['services'], min(num_services, len(city_data['services'])))
                 content['services'] = selected_services
         
         # Add service-specific content (for service locations)
         if content.get('type') == 'service':
             if 'services' in city_data and isinstance(city_data['services'], list) and len(city_data['services']) > 0:
                 # Select 3-6 random services to offer
-                num_services = random.randint(3, 6)
-                selected_services = random.sample(city_data['services'], min(num_services, len(city_data['services'])))
+                num_services = self.rng.randint(3, 6)
+                selected_services = self.rng.sample(city_data['services'], min(num_services, len(city_data['services'])))
                 content['services'] = selected_services
         
         # Add patrons for businesses (taverns, markets, guilds)
@@ -1762,20 +1836,20 @@ class CityOverlayAnalyzer:
                     second_names = names_src.get('second_names', [])
                     if isinstance(first_names, list) and isinstance(second_names, list) and first_names and second_names:
                         for _ in range(10):
-                            names_pool.append(f"{random.choice(first_names)} {random.choice(second_names)}")
+                            names_pool.append(f"{self.rng.choice(first_names)} {self.rng.choice(second_names)}")
                 elif isinstance(names_src, list):
                     names_pool = names_src[:]
 
             if names_pool:
                 if 'npc_trades' in city_data and isinstance(city_data['npc_trades'], list) and len(city_data['npc_trades']) > 0:
-                    num_patrons = random.randint(2, 4)
+                    num_patrons = self.rng.randint(2, 4)
                     for _ in range(num_patrons):
-                        name = random.choice(names_pool)
-                        trade = random.choice(city_data['npc_trades'])
+                        name = self.rng.choice(names_pool)
+                        trade = self.rng.choice(city_data['npc_trades'])
                         patrons.append(f"{name} ({trade})")
                 else:
-                    num_patrons = random.randint(2, 4)
-                    patrons = random.sample(names_pool, min(num_patrons, len(names_pool)))
+                    num_patrons = self.rng.randint(2, 4)
+                    patrons = self.rng.sample(names_pool, min(num_patrons, len(names_pool)))
             
             if patrons:
                 content['patrons'] = patrons
@@ -1789,17 +1863,17 @@ class CityOverlayAnalyzer:
                 second_names = names_src.get('second_names', [])
                 if isinstance(first_names, list) and isinstance(second_names, list) and first_names and second_names:
                     for _ in range(10):
-                        names_pool.append(f"{random.choice(first_names)} {random.choice(second_names)}")
+                        names_pool.append(f"{self.rng.choice(first_names)} {self.rng.choice(second_names)}")
             elif isinstance(names_src, list):
                 names_pool = names_src[:]
 
             if names_pool:
-                num_key_npcs = random.randint(2, 3)
+                num_key_npcs = self.rng.randint(2, 3)
                 key_npcs = []
                 for _ in range(num_key_npcs):
-                    name = random.choice(names_pool)
+                    name = self.rng.choice(names_pool)
                     if 'npc_trades' in city_data and isinstance(city_data['npc_trades'], list) and len(city_data['npc_trades']) > 0:
-                        trade = random.choice(city_data['npc_trades'])
+                        trade = self.rng.choice(city_data['npc_trades'])
                         key_npcs.append(f"{name} ({trade})")
                     else:
                         key_npcs.append(name)
@@ -1810,8 +1884,8 @@ class CityOverlayAnalyzer:
             factions_data = city_data['factions']
             if 'faction_names' in factions_data and isinstance(factions_data['faction_names'], list) and len(factions_data['faction_names']) > 0:
                 # Generate 1-3 active factions
-                num_factions = random.randint(1, 3)
-                selected_factions = random.sample(factions_data['faction_names'], min(num_factions, len(factions_data['faction_names'])))
+                num_factions = self.rng.randint(1, 3)
+                selected_factions = self.rng.sample(factions_data['faction_names'], min(num_factions, len(factions_data['faction_names'])))
                 content['active_factions'] = selected_factions
         
         return content
@@ -2007,9 +2081,9 @@ class CityOverlayAnalyzer:
     
     def _save_overlay_data(self, overlay_name: str, overlay_data: Dict[str, Any]):
         """Save overlay data to a JSON file."""
+        filename = self.get_overlay_path(overlay_name)
         # Ensure the output directory exists
-        os.makedirs(self.output_directory, exist_ok=True)
-        filename = os.path.join(self.output_directory, f"{overlay_name}_overlay.json")
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
         
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(overlay_data, f, indent=2, ensure_ascii=False)
@@ -2020,8 +2094,13 @@ class CityOverlayAnalyzer:
         if overlay_name in self.overlays_cache:
             return self.overlays_cache[overlay_name]
         
-        # Try to load from file
-        filename = os.path.join(self.output_directory, f"{overlay_name}_overlay.json")
+        # Try to load from file (overlays of older worlds are in the flat layout)
+        filename = self.get_overlay_path(overlay_name)
+        if not os.path.exists(filename):
+            try:
+                self._migrate_legacy_overlay(overlay_name)
+            except OSError as e:
+                print(f"Error migrating overlay data: {e}")
         if os.path.exists(filename):
             try:
                 with open(filename, 'r', encoding='utf-8') as f:
@@ -2108,9 +2187,9 @@ class CityOverlayAnalyzer:
                 # Use translation system if available
                 try:
                     from backend.translation_system import translation_system
-                    type_label = translation_system.t('type')
-                    description_label = translation_system.t('description')
-                    encounter_label = translation_system.t('encounter')
+                    type_label = translation_system.t('type', language=self.language)
+                    description_label = translation_system.t('description', language=self.language)
+                    encounter_label = translation_system.t('encounter', language=self.language)
                 except ImportError:
                     type_label = 'Type'
                     description_label = 'Description'
@@ -2156,7 +2235,7 @@ class CityOverlayAnalyzer:
             print(f"Cleared cache for overlay: {overlay_name}")
         
         # Also delete the file if it exists
-        filename = os.path.join(self.output_directory, f"{overlay_name}_overlay.json")
+        filename = self.get_overlay_path(overlay_name)
         if os.path.exists(filename):
             os.remove(filename)
             print(f"Deleted overlay file: {filename}")
@@ -2166,6 +2245,55 @@ class CityOverlayAnalyzer:
         self.clear_overlay_cache(overlay_name)
         return self.generate_city_overlay(overlay_name)
 
-# Global instance
-# Initialize with default language, will be updated by routes.py
-city_overlay_analyzer = CityOverlayAnalyzer('en')
\ No newline at end of file
+_analyzers_lock = threading.Lock()
+_analyzers_by_language: Dict[str, CityOverlayAnalyzer] = {}
+
+
+def get_city_overlay_analyzer(language: str) -> CityOverlayAnalyzer:
+    """Return the shared analyzer for a language, creating it on first use."""
+    with _analyzers_lock:
+        analyzer = _analyzers_by_language.get(language)
+        if analyzer is None:
+            analyzer = CityOverlayAnalyzer(language)
+            _analyzers_by_language[language] = analyzer
+        return analyzer
+
+
+def invalidate_city_overlay_caches() -> None:
+    """Drop in-memory overlays for every language (e.g. after a world swap)."""
+    with _analyzers_lock:
+        analyzers = list(_analyzers_by_language.values())
+    for analyzer in analyzers:
+        analyzer.invalidate_cache()
+
+
+def pregenerate_city_overlays(output_directory: str, languages: Iterable[str],
+                              generation_version: Optional[str] = None) -> Dict[str, int]:
+    """Generate overlays for every major city in every language.
+
+    Used by cold-boot generation so overlay requests never pay for generation.
+    Each overlay is seeded by (language, city, generation version), so it does
+    not depend on other threads. When a generation version is given the city
+    contexts are stored as well.
+    Returns the number of overlays written per language.
+    """
+    generated: Dict[str, int] = {}
+    for language in languages:
+        analyzer = CityOverlayAnalyzer(language, output_directory=output_directory)
+        generated[language] = 0
+        for city_key in analyzer.lore_db.major_cities:
+            # Seeded per city, like load_city_context: this runs next to map generation,
+            # so drawing from the global random would make both depend on thread timing
+            analyzer.rng = random.Random(f"{language}:{city_key}:{generation_version}")
+            try:
+                analyzer.generate_city_overlay(city_key)
+                if generation_version:
+                    analyzer.load_city_context(city_key, generation_version)
+                generated[language] += 1
+            except ValueError as e:
+                print(f"Warning: Could not pre-generate overlay {city_key} ({language}): {e}")
+    return generated
+
+
+# Global instance (default language, built on first use); routes use get_city_overlay_analyzer()
+city_overlay_analyzer = LazyObject(lambda: get_city_overlay_analyzer('en'))
@@ -9,13 +9,39 @@ from typing import Dict, Any, Tuple
 from dataclasses import dataclass, field
 from pathlib import Path
 
+# Largest map side: hex codes use at most four digits per coordinate (XXXXYYYY)
+MAX_MAP_DIMENSION = 9999
+
 @dataclass
 class MapConfig:
-    """Map generation configuration."""
-    width: int = 30
-    height: int = 60
+    """Map generation configuration.
+
+    Maps wider or taller than 99 hexes (or HEXY_CHUNKED=1) are chunked: hexes
+    are generated, stored and served in chunk_size x chunk_size blocks.
+    """
+    width: int = int(os.getenv('HEXY_MAP_WIDTH', '30'))
+    height: int = int(os.getenv('HEXY_MAP_HEIGHT', '60'))
     start_x: int = 1
     start_y: int = 1
+    chunk_size: int = int(os.getenv('HEXY_CHUNK_SIZE', '32'))
+    force_chunked: bool = os.getenv('HEXY_CHUNKED', '0').lower() in ('1', 'true', 'yes')
+
+    def __post_init__(self):
+        for name in ('width', 'height'):
+            value = getattr(self, name)
+            if not 1 <= value <= MAX_MAP_DIMENSION:
+                raise ValueError(f"Map {name} must be between 1 and {MAX_MAP_DIMENSION}, got {value}")
+
+    @property
+    def chunked(self) -> bool:
+        return self.force_chunked or max(self.width, self.height) > 99
+
+    @property
+    def code_digits(self) -> int:
+        """Digits per coordinate in hex codes (2 for XXYY, 3 for XXXYYY, ...)."""
+        # core_utils imports this module, so its helper is imported on use
+        from backend.utils.core_utils import hex_code_digits
+        return hex_code_digits(max(self.width, self.height))
     
 @dataclass
 class GenerationConfig:
@@ -95,7 +121,9 @@ class AppConfig:
                 'width': self.map.width,
                 'height': self.map.height,
                 'start_x': self.map.start_x,
-                'start_y': self.map.start_y
+                'start_y': self.map.start_y,
+                'chunk_size': self.map.chunk_size,
+                'chunked': self.map.chunked
             },
             'generation': {
                 'settlement_chance': self.generation.settlement_chance,
@@ -141,6 +169,8 @@ class AppConfig:
             config.map.height = map_data.get('height', config.map.height)
             config.map.start_x = map_data.get('start_x', config.map.start_x)
             config.map.start_y = map_data.get('start_y', config.map.start_y)
+            config.map.chunk_size = map_data.get('chunk_size', config.map.chunk_size)
+            config.map.force_chunked = map_data.get('chunked', config.map.force_chunked)
         
         # Update generation config
         if 'generation' in data:
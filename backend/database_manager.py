@@ -10,6 +10,7 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 import shutil
 from backend.utils.database_categories import get_all_categories, get_core_categories, get_lore_categories
+from backend.utils.metrics import timed
 
 class DatabaseManager:
     """Centralized database management for normalized content tables."""
@@ -36,6 +37,7 @@ class DatabaseManager:
             for lang in ['en', 'pt']:
                 os.makedirs(os.path.join(self.database_path, category, lang), exist_ok=True)
     
+    @timed('table_load')
     def load_tables(self, language: str = 'en') -> Dict[str, Any]:
         """Load all tables for a specific language."""
         if language in self.tables_cache:
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Gunicorn configuration for The Dying Lands
+Usage: gunicorn -c backend/gunicorn_conf.py backend.wsgi:app
+
+The app is preloaded in the master so the lore tables, hex index and terrain
+data are built once and shared copy-on-write by the forked workers. Every
+setting can be tuned through HEXY_* environment variables.
+"""
+
+import multiprocessing
+import os
+
+# Served mode: no idle shutdown (also set by backend.wsgi itself)
+os.environ.setdefault('HEXY_SERVER_MODE', '1')
+
+bind = os.getenv('HEXY_BIND', f"{os.getenv('HEXY_HOST', '0.0.0.0')}:{os.getenv('HEXY_PORT', '6660')}")
+
+# Workers are processes; threads serve concurrent requests inside each one.
+# Hex reads are mostly file I/O, so a few threads per worker go a long way.
+workers = int(os.getenv('HEXY_WORKERS', str(min(multiprocessing.cpu_count() + 1, 8))))
+threads = int(os.getenv('HEXY_THREADS', '4'))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+preload_app = os.getenv('HEXY_PRELOAD', '1') != '0'
+
+# Map generation can take a while on a cold start
+timeout = int(os.getenv('HEXY_WORKER_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('HEXY_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('HEXY_KEEPALIVE', '5'))
+
+# Recycle workers periodically (0 disables); jitter avoids restarting all at once
+max_requests = int(os.getenv('HEXY_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.getenv('HEXY_MAX_REQUESTS_JITTER', '50')) if max_requests else 0
+
+accesslog = os.getenv('HEXY_ACCESS_LOG', '-')
+errorlog = os.getenv('HEXY_ERROR_LOG', '-')
+loglevel = os.getenv('HEXY_LOG_LEVEL', 'info')
+
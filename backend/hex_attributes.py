@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Columnar Hex Attributes for The Dying Lands
+Compact per-hex attribute table (terrain, content type, loot, scroll, region)
+so map statistics are counts over byte columns instead of model walks.
+"""
+
+import threading
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.hex_model import HexType, TerrainType
+from backend.utils.core_utils import parse_hex_coordinates
+
+TERRAIN_LABELS: List[str] = [t.value for t in TerrainType] + ['unknown']
+TYPE_LABELS: List[str] = [t.value for t in HexType]
+REGION_LABELS: List[str] = ['north', 'northwest', 'central', 'south', 'west', 'east', 'unknown']
+
+_TERRAIN_CODES = {label: code for code, label in enumerate(TERRAIN_LABELS)}
+_TYPE_CODES = {label: code for code, label in enumerate(TYPE_LABELS)}
+_REGION_CODES = {label: code for code, label in enumerate(REGION_LABELS)}
+
+
+def _count(column: array, labels: List[str]) -> Dict[str, int]:
+    """Count codes in a byte column and map them back to labels."""
+    return {labels[code]: n for code, n in sorted(Counter(column).items())}
+
+
+class HexAttributeTable:
+    """One row per hex; each attribute is a byte column (array('B'))."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hex_codes: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self.terrain = array('B')
+        self.hex_type = array('B')
+        self.has_loot = array('B')
+        self.has_scroll = array('B')
+        self.region = array('B')
+        self._stats: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return len(self.hex_codes)
+
+    def set_hex(self, hex_code: str, terrain: str, hex_type: str, has_loot: bool,
+                has_scroll: bool, region: str) -> None:
+        """Insert or update the row of a hex."""
+        values = (
+            _TERRAIN_CODES.get(terrain, _TERRAIN_CODES['unknown']),
+            _TYPE_CODES.get(hex_type, _TYPE_CODES['wilderness']),
+            1 if has_loot else 0,
+            1 if has_scroll else 0,
+            _REGION_CODES.get(region, _REGION_CODES['unknown']),
+        )
+        columns = (self.terrain, self.hex_type, self.has_loot, self.has_scroll, self.region)
+        with self._lock:
+            row = self._rows.get(hex_code)
+            if row is None:
+                self._rows[hex_code] = len(self.hex_codes)
+                self.hex_codes.append(hex_code)
+                for column, value in zip(columns, values):
+                    column.append(value)
+            else:
+                for column, value in zip(columns, values):
+                    column[row] = value
+            self._stats = None
+
+    def set_from_dict(self, hex_code: str, hex_dict: Dict[str, Any], region: str) -> None:
+        """Insert or update a row from a parsed, generated or API hex dict."""
+        self.set_hex(
+            hex_code,
+            terrain=hex_dict.get('terrain', 'unknown'),
+            hex_type=hex_dict.get('hex_type') or hex_type_from_data(hex_dict),
+            has_loot=bool(hex_dict.get('loot')),
+            has_scroll=bool(hex_dict.get('scroll')),
+            region=region,
+        )
+
+    def set_from_model(self, hex_code: str, hex_model: Any, region: str,
+                       hex_type: Optional[str] = None) -> None:
+        """Insert or update a row from a hex model."""
+        self.set_hex(
+            hex_code,
+            terrain=hex_model.terrain.value,
+            hex_type=hex_type or hex_model.get_hex_type().value,
+            has_loot=getattr(hex_model, 'loot', None) is not None,
+            has_scroll=getattr(hex_model, 'scroll', None) is not None,
+            region=region,
+        )
+
+    def remove_hex(self, hex_code: str) -> None:
+        """Remove a row (the last row is moved into its place)."""
+        with self._lock:
+            row = self._rows.pop(hex_code, None)
+            if row is None:
+                return
+            last = len(self.hex_codes) - 1
+            columns = (self.terrain, self.hex_type, self.has_loot, self.has_scroll, self.region)
+            if row != last:
+                moved = self.hex_codes[last]
+                self.hex_codes[row] = moved
+                self._rows[moved] = row
+                for column in columns:
+                    column[row] = column[last]
+            self.hex_codes.pop()
+            for column in columns:
+                column.pop()
+            self._stats = None
+
+    def statistics(self) -> Dict[str, Any]:
+        """Aggregate counts; cached until the next write."""
+        stats = self._stats
+        if stats is None:
+            with self._lock:
+                stats = {
+                    "total": len(self.hex_codes),
+                    "by_type": _count(self.hex_type, TYPE_LABELS),
+                    "by_terrain": _count(self.terrain, TERRAIN_LABELS),
+                    "by_region": _count(self.region, REGION_LABELS),
+                    "with_loot": sum(self.has_loot),
+                    "with_scrolls": sum(self.has_scroll),
+                }
+                self._stats = stats
+        return stats
+
+    def terrain_distribution(self, region: Optional[str] = None) -> Dict[str, int]:
+        """Terrain counts for the whole map or a single region."""
+        if region is None:
+            return _count(self.terrain, TERRAIN_LABELS)
+        code = _REGION_CODES.get(region)
+        with self._lock:
+            terrains = array('B', (t for t, r in zip(self.terrain, self.region) if r == code))
+        return _count(terrains, TERRAIN_LABELS)
+
+    def hex_codes_where(self, terrain: Optional[str] = None, hex_type: Optional[str] = None,
+                        region: Optional[str] = None) -> List[str]:
+        """Hex codes whose attributes match all given values."""
+        filters = []
+        if terrain is not None:
+            filters.append((self.terrain, _TERRAIN_CODES.get(terrain, -1)))
+        if hex_type is not None:
+            filters.append((self.hex_type, _TYPE_CODES.get(hex_type, -1)))
+        if region is not None:
+            filters.append((self.region, _REGION_CODES.get(region, -1)))
+        with self._lock:
+            return [code for row, code in enumerate(self.hex_codes)
+                    if all(column[row] == value for column, value in filters)]
+
+
+def statistics_from_entries(entries: Iterable[Tuple[str, Dict[str, Any]]], lore_db) -> Dict[str, Any]:
+    """Statistics of a chunked world from its chunk index entries (no hex files are parsed)."""
+    table = HexAttributeTable()
+    for hex_code, entry in entries:
+        table.set_hex(hex_code, entry.get('terrain') or 'unknown', entry.get('type') or 'wilderness',
+                      bool(entry.get('loot')), bool(entry.get('scroll')), region_for_hex(hex_code, lore_db))
+    return table.statistics()
+
+
+def hex_type_from_data(hex_data: Dict[str, Any]) -> str:
+    """Hex type of a parsed or generated hex dict, from its is_* flags."""
+    if hex_data.get('is_settlement') or hex_data.get('is_major_city'):
+        return HexType.SETTLEMENT.value
+    if hex_data.get('is_dungeon'):
+        return HexType.DUNGEON.value
+    if hex_data.get('is_beast'):
+        return HexType.BEAST.value
+    if hex_data.get('is_npc'):
+        return HexType.NPC.value
+    if hex_data.get('is_sea_encounter'):
+        return HexType.SEA_ENCOUNTER.value
+    return HexType.WILDERNESS.value
+
+
+def region_for_hex(hex_code: str, lore_db) -> str:
+    """Regional classification of a hex code ('unknown' if unparsable)."""
+    try:
+        x, y = parse_hex_coordinates(hex_code)
+    except ValueError:
+        return 'unknown'
+    return lore_db.get_regional_bias(x, y)
@@ -3,6 +3,8 @@ Hex Model System for The Dying Lands
 
 This module provides a clean data model interface for hex content,
 replacing the markdown parsing approach with structured data classes.
+Models are slotted and immutable; the manager's cache holds the single
+in-memory copy of each hex.
 """
 
 from dataclasses import dataclass, field
@@ -37,7 +39,7 @@ class HexType(Enum):
 
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BaseHex:
     """Base class for all hex types."""
     hex_code: str
@@ -59,7 +61,7 @@ class BaseHex:
         return HexType.WILDERNESS
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class WildernessHex(BaseHex):
     """Basic wilderness hex with minimal content."""
     
@@ -67,7 +69,7 @@ class WildernessHex(BaseHex):
         return HexType.WILDERNESS
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SettlementHex:
     """Settlement hex with population, services, and local authority."""
     hex_code: str
@@ -114,7 +116,7 @@ class SettlementHex:
         }
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DungeonHex:
     """Dungeon hex with dangers, treasures, and ancient knowledge."""
     hex_code: str
@@ -156,7 +158,7 @@ class DungeonHex:
         }
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BeastHex:
     """Beast hex with creature details, territory, and threat level."""
     hex_code: str
@@ -202,7 +204,7 @@ class BeastHex:
         }
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class NPCHex:
     """NPC hex with character details, motivations, and demeanor."""
     hex_code: str
@@ -260,7 +262,7 @@ class NPCHex:
         }
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SeaEncounterHex:
     """Sea encounter hex with abyssal entities and oceanic horrors."""
     hex_code: str
@@ -306,6 +308,7 @@ class HexModelManager:
     """Manager class for creating and managing hex models."""
     
     def __init__(self):
+        # Authoritative store of loaded hexes (no raw dicts are kept alongside)
         self.hex_cache: Dict[str, BaseHex] = {}
     
     def create_hex_from_data(self, hex_code: str, data: Dict[str, Any]) -> BaseHex:
@@ -364,9 +367,9 @@ class HexModelManager:
             common_fields = create_common_hex_fields(data, hex_code, terrain)
             # Remove fields that NPCHex doesn't have
             fields_to_remove = ['denizen', 'territory', 'threat_level']
-            for field in fields_to_remove:
-                if field in common_fields:
-                    del common_fields[field]
+            for name in fields_to_remove:
+                if name in common_fields:
+                    del common_fields[name]
             return NPCHex(
                 name=data.get('name', 'Unknown'),
                 denizen_type=data.get('denizen_type', 'Unknown'),
@@ -8,12 +8,20 @@ replacing the markdown parsing approach.
 import json
 from pathlib import Path
 import ast
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator, Tuple
 from backend.hex_model import hex_manager, BaseHex, TerrainType, SettlementHex
+from backend.search_index import search_indexes
+from backend.hex_attributes import HexAttributeTable, region_for_hex
 from backend.config import get_config
+from backend.utils.metrics import timed
 from backend.terrain_system import terrain_system
+from backend.world_chunks import hex_file_path, world_layout
+from backend.translation_system import translation_system
 from backend.mork_borg_lore_database import MorkBorgLoreDatabase
 from backend.utils.ascii_processor import process_ascii_blocks, parse_loot_section_from_ascii
+from backend.utils.markdown_tokenizer import load_markdown, parse_markdown
+from backend.utils.lazy import LazyObject
+from backend.utils.core_utils import output_dir_for_language
 import re
 
 
@@ -23,7 +31,7 @@ class HexService:
     def __init__(self):
         self.config = get_config()
         self.lore_db = MorkBorgLoreDatabase()
-        self.hex_data_cache: Dict[str, Dict[str, Any]] = {}
+        self.attributes = HexAttributeTable()
         self._load_hex_data()
     
     def _load_hex_data(self):
@@ -39,25 +47,39 @@ class HexService:
             hex_code = hex_file.stem.replace("hex_", "")
             try:
                 # For now, we'll still parse the markdown but convert to structured data
-                hex_data = self._parse_hex_markdown(hex_file)
-                if hex_data:
-                    self.hex_data_cache[hex_code] = hex_data
+                if self._load_hex(hex_code, hex_file):
                     hex_count += 1
             except Exception as e:
                 print(f"Error loading hex {hex_code}: {e}")
     
+    def _load_hex(self, hex_code: str, hex_file: Path) -> Optional[BaseHex]:
+        """Parse a hex file into a model and store it (the parsed dict is not kept)."""
+        hex_data = self._parse_hex_markdown(hex_file)
+        if not hex_data:
+            return None
+        hex_model = hex_manager.create_hex_from_data(hex_code, hex_data)
+        hex_manager.cache_hex(hex_code, hex_model)
+        # Major cities are served from the lore database but counted as settlements
+        hex_type = 'settlement' if self._is_major_city(hex_code) else None
+        self.attributes.set_from_model(hex_code, hex_model, region_for_hex(hex_code, self.lore_db), hex_type)
+        return hex_model
+    
+    def _is_major_city(self, hex_code: str) -> bool:
+        hardcoded = self.lore_db.get_hardcoded_hex(hex_code)
+        return bool(hardcoded and hardcoded.get('type') == 'major_city')
+    
+    @timed('hex_parse')
     def _parse_hex_markdown(self, hex_file: Path) -> Optional[Dict[str, Any]]:
         """Parse markdown hex file and convert to structured data."""
         try:
-            with open(hex_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            lines = content.split('\n')
+            content = load_markdown(hex_file).content
             hex_code = hex_file.stem.replace("hex_", "")
             # Extract terrain from markdown
             terrain = self._extract_terrain(content)
             # If terrain is missing or 'plains', use terrain_system
             if not terrain or terrain == 'plains':
-                terrain = terrain_system.get_terrain_for_hex(hex_code, self.lore_db)
+                terrain = terrain_system.get_terrain_grid(self.lore_db).get(hex_code) or \
+                    terrain_system.get_terrain_for_hex(hex_code, self.lore_db)
             # Check if it's a settlement
             if '⌂ **' in content:
                 settlement_data = self._extract_settlement_data(content, hex_code)
@@ -115,68 +137,21 @@ class HexService:
             return None
     
     def _extract_hex_data(self, content: str, hex_code: str) -> Dict[str, Any]:
-        """Extract hex data from markdown content, robustly splitting sections and extracting subfields, code blocks, and normalizing fields."""
-        import re
-        section_pattern = re.compile(r'^##\s+(.+)$', re.MULTILINE)
-        code_block_pattern = re.compile(r'```([\s\S]*?)```', re.MULTILINE)
-        sections = {}
-        last_pos = 0
-        last_section = None
-        for match in section_pattern.finditer(content):
-            section_name = match.group(1).strip().lower().replace(' ', '_')
-            if last_section is not None:
-                sections[last_section] = content[last_pos:match.start()].strip()
-            last_section = section_name
-            last_pos = match.end()
-        if last_section is not None:
-            sections[last_section] = content[last_pos:].strip()
-
-        def extract_subfields_and_code(section_text):
-            """Extract '**Key:** Value' pairs as a dict, code blocks, and return (dict, raw_text, code_blocks)."""
-            subfields = {}
-            lines = section_text.split('\n')
-            raw_lines = []
-            code_blocks = []
-            in_code = False
-            code_accum = []
-            for line in lines:
-                if line.strip().startswith('```'):
-                    if not in_code:
-                        in_code = True
-                        code_accum = []
-                        continue
-                    else:
-                        in_code = False
-                        code_blocks.append('\n'.join(code_accum))
-                        continue
-                if in_code:
-                    code_accum.append(line)
-                    continue
-                m = re.match(r'^\*\*(.+?):\*\*\s*(.+)$', line)
-                if m:
-                    key = m.group(1).strip().lower().replace(' ', '_')
-                    value = m.group(2).strip()
-                    # Store as list if key repeats
-                    if key in subfields:
-                        if isinstance(subfields[key], list):
-                            subfields[key].append(value)
-                        else:
-                            subfields[key] = [subfields[key], value]
-                    else:
-                        subfields[key] = value
-                else:
-                    raw_lines.append(line)
-            raw_text = '\n'.join(raw_lines).strip()
-            return subfields, raw_text, code_blocks
-
+        """Extract hex data from markdown content: per-section subfields, raw text and code blocks, with normalized fields."""
+        # Repeated headings: the last one wins
+        sections = {section.key: section for section in parse_markdown(content).section_list}
         # Normalize loot/treasure fields
         loot_keys = {'treasure_found', 'loot_found', 'treasure', 'loot'}
         hex_data = {'hex_code': hex_code}
         loot_collected = []
         # For each expected section, extract both structured subfields, raw text, and code blocks
         for section in ['encounter', 'denizen', 'danger', 'atmosphere', 'notable_feature', 'treasure', 'loot_found', 'ancient_knowledge', 'npc_details', 'beast_details', 'threat_level', 'territory']:
-            section_text = sections.get(section, '').strip()
-            subfields, raw_text, code_blocks = extract_subfields_and_code(section_text)
+            parsed = sections.get(section)
+            if parsed is not None:
+                section_text = parsed.text
+                subfields, raw_text, code_blocks = dict(parsed.fields), parsed.raw, list(parsed.code_blocks)
+            else:
+                section_text, subfields, raw_text, code_blocks = '', {}, '', []
             # Collect loot/treasure fields
             for k, v in subfields.items():
                 if k in loot_keys:
@@ -727,12 +702,9 @@ class HexService:
         
         # Parse loot if present - use the first loot_found section
         if 'loot_found' in sea_data and sea_data['loot_found']:
-            # Split by sections to get the first loot_found section
-            sections = content.split('## ')
-            for section in sections:
-                if section.startswith('Loot Found'):
-                    loot_content = section.replace('Loot Found', '').strip()
-                    loot_data = self._parse_loot_section(loot_content)
+            for section in parse_markdown(content).section_list:
+                if section.key == 'loot_found':
+                    loot_data = self._parse_loot_section(section.text)
                     if loot_data:
                         sea_data['loot'] = loot_data
                     break
@@ -924,9 +896,9 @@ class HexService:
     
     def _extract_terrain(self, content: str) -> str:
         """Extract terrain from hex content, robust to leading spaces and markdown variations."""
-        match = re.search(r'^\s*\*\*Terrain:\*\*\s*(.+)$', content, re.MULTILINE | re.IGNORECASE)
-        if match:
-            terrain = match.group(1).strip().lower()
+        terrain = parse_markdown(content).field('terrain')
+        if terrain:
+            terrain = terrain.strip().lower()
             # Normalize common variants (English and Portuguese)
             terrain_map = {
                 # English
@@ -959,36 +931,28 @@ class HexService:
     
     def get_hex(self, hex_code: str) -> Optional[BaseHex]:
         """Get a hex model for the given hex code."""
-        # Check cache first
-        cached_hex = hex_manager.get_hex(hex_code)
-        if cached_hex:
-            return cached_hex
-        
-        # Check if it's a major city
+        # Major cities are built from the (language-specific) city tables
         hardcoded = self.lore_db.get_hardcoded_hex(hex_code)
         if hardcoded and hardcoded.get('type') == 'major_city':
             return self._create_major_city_hex(hex_code, hardcoded)
         
-        # Get from hex data cache
-        hex_data = self.hex_data_cache.get(hex_code)
-        if not hex_data:
-            return None
-        
-        # Create hex model
-        hex_model = hex_manager.create_hex_from_data(hex_code, hex_data)
-        hex_manager.cache_hex(hex_code, hex_model)
+        hex_model = hex_manager.get_hex(hex_code)
+        if hex_model is None and world_layout() is not None:
+            # Chunked worlds are too large to preload; hexes are parsed on first use
+            hex_file = hex_file_path(self.config.paths.output_path, hex_code)
+            if hex_file.exists():
+                hex_model = self._load_hex(hex_code, hex_file)
         return hex_model
     
     def _create_major_city_hex(self, hex_code: str, hardcoded: Dict[str, Any]) -> BaseHex:
         """Create a major city hex model."""
         city_key = hardcoded['city_key']
         
-        # Load city data directly from database manager with current language
+        # Load city data directly from database manager in the request's language
         from backend.database_manager import database_manager
-        from backend.routes import current_language
         
         # Load city data from the appropriate language directory
-        cities_table = database_manager.get_table('cities', 'major_cities', current_language)
+        cities_table = database_manager.get_table('cities', 'major_cities', translation_system.language)
         
         # Find the city data in the table
         city_data = {}
@@ -1060,12 +1024,11 @@ class HexService:
         
         city_key = hardcoded['city_key']
         
-        # Load city data directly from database manager with current language
+        # Load city data directly from database manager in the request's language
         from backend.database_manager import database_manager
-        from backend.routes import current_language
         
         # Load city data from the appropriate language directory
-        cities_table = database_manager.get_table('cities', 'major_cities', current_language)
+        cities_table = database_manager.get_table('cities', 'major_cities', translation_system.language)
         
         # Find the city data in the table
         city_data = {}
@@ -1105,7 +1068,7 @@ class HexService:
     def get_all_hexes(self) -> Dict[str, BaseHex]:
         """Get all available hexes."""
         hexes = {}
-        for hex_code in self.hex_data_cache.keys():
+        for hex_code in list(hex_manager.hex_cache):
             hex_model = self.get_hex(hex_code)
             if hex_model:
                 hexes[hex_code] = hex_model
@@ -1114,72 +1077,80 @@ class HexService:
     def get_hexes_by_type(self, hex_type: str) -> List[BaseHex]:
         """Get all hexes of a specific type."""
         hexes = []
-        for hex_code in self.hex_data_cache.keys():
+        for hex_code in list(hex_manager.hex_cache):
             hex_model = self.get_hex(hex_code)
             if hex_model and hex_model.get_hex_type().value == hex_type:
                 hexes.append(hex_model)
         return hexes
     
-    def search_hexes(self, query: str) -> List[BaseHex]:
-        """Search hexes by content."""
-        results = []
-        query_lower = query.lower()
-        
-        for hex_code in self.hex_data_cache.keys():
-            hex_model = self.get_hex(hex_code)
-            if not hex_model:
-                continue
-            
-            # Search in hex data
-            hex_dict = hex_model.to_dict()
-            for key, value in hex_dict.items():
-                if isinstance(value, str) and query_lower in value.lower():
-                    results.append(hex_model)
-                    break
+    def iter_hex_dicts(self, output_dir: Optional[Path] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (hex_code, API dict) for every hex of a world directory.
         
+        The service's own directory is served from its caches; other
+        directories (e.g. another language) are parsed without caching.
+        """
+        if output_dir is None or Path(output_dir) == self.config.paths.output_path:
+            for hex_code in list(hex_manager.hex_cache):
+                hex_model = self.get_hex(hex_code)
+                if hex_model:
+                    yield hex_code, hex_model.to_dict()
+            return
+        hexes_dir = Path(output_dir) / "hexes"
+        if not hexes_dir.exists():
+            return
+        for hex_file in sorted(hexes_dir.glob("hex_*.md")):
+            hex_code = hex_file.stem.replace("hex_", "")
+            hex_data = self._parse_hex_markdown(hex_file)
+            if hex_data:
+                yield hex_code, hex_manager.create_hex_from_data(hex_code, hex_data).to_dict()
+    
+    def search_hexes(self, query: str, hex_type: Optional[str] = None, terrain: Optional[str] = None) -> List[BaseHex]:
+        """Search hexes by content using the inverted index of the current language's world."""
+        output_dir = output_dir_for_language(translation_system.language, self.config.paths.output_path)
+        index = search_indexes.get(output_dir, self.iter_hex_dicts)
+        found = index.search(query, hex_type=hex_type, terrain=terrain, limit=len(index))
+        results = []
+        for entry in found['results']:
+            hex_model = self.get_hex(entry['hex_code'])
+            if hex_model:
+                results.append(hex_model)
         return results
     
     def get_hex_statistics(self) -> Dict[str, Any]:
-        """Get statistics about hex distribution."""
-        stats = {
-            "total": 0,
-            "by_type": {},
-            "by_terrain": {},
-            "with_loot": 0,
-            "with_scrolls": 0
-        }
-        
-        for hex_code in self.hex_data_cache.keys():
-            hex_model = self.get_hex(hex_code)
-            if not hex_model:
-                continue
-            
-            stats["total"] += 1
-            
-            # Count by type
-            hex_type = hex_model.get_hex_type().value
-            stats["by_type"][hex_type] = stats["by_type"].get(hex_type, 0) + 1
-            
-            # Count by terrain
-            terrain = hex_model.terrain.value
-            stats["by_terrain"][terrain] = stats["by_terrain"].get(terrain, 0) + 1
-            
-            # Count with loot
-            hex_dict = hex_model.to_dict()
-            if hex_dict.get('loot'):
-                stats["with_loot"] += 1
-            
-            # Count with scrolls
-            if hex_dict.get('scroll'):
-                stats["with_scrolls"] += 1
-        
-        return stats
+        """Get statistics about hex distribution (from the attribute table)."""
+        return self.attributes.statistics()
     
     def clear_hex_cache(self, hex_code: str):
         """Clear the cache for a specific hex."""
-        if hex_code in self.hex_data_cache:
-            del self.hex_data_cache[hex_code]
+        hex_manager.hex_cache.pop(hex_code, None)
+    
+    def reload(self):
+        """Drop every cached hex and re-read the world (after regeneration or import)."""
+        self.attributes = HexAttributeTable()
+        hex_manager.clear_cache()
+        self._load_hex_data()
+    
+    def refresh_hex(self, hex_code: str, output_dir: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+        """Re-read a hex after its file changed and update caches and search index.
+        
+        output_dir is the world directory the file was written to (see
+        output_dir_for_language); its search index is the one updated.
+        """
+        output_dir = Path(output_dir) if output_dir is not None else self.config.paths.output_path
+        if output_dir == self.config.paths.output_path:
+            self.clear_hex_cache(hex_code)
+            hex_file = hex_file_path(output_dir, hex_code)
+            if not (hex_file.exists() and self._load_hex(hex_code, hex_file)):
+                self.attributes.remove_hex(hex_code)
+            hex_dict = self.get_hex_dict(hex_code)
+        else:
+            # Other language worlds are not cached; parse the file like iter_hex_dicts does
+            hex_file = hex_file_path(output_dir, hex_code)
+            hex_data = self._parse_hex_markdown(hex_file) if hex_file.exists() else None
+            hex_dict = hex_manager.create_hex_from_data(hex_code, hex_data).to_dict() if hex_data else None
+        search_indexes.update_hex(output_dir, hex_code, hex_dict)
+        return hex_dict
 
 
-# Global instance
-hex_service = HexService() 
\ No newline at end of file
+# Global instance (the world is loaded on first use, not at import)
+hex_service = LazyObject(HexService)
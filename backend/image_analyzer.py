@@ -5,14 +5,23 @@ Extracts terrain information from the official Mork Borg map image.
 """
 
 import os
-from typing import Dict, Optional, Tuple, List
-try:
-    from PIL import Image
-    PILLOW_AVAILABLE = True
-except ImportError:
-    PILLOW_AVAILABLE = False
+from collections import Counter
+from importlib.util import find_spec
+from typing import Any, Dict, Optional, Tuple, List
+
+# Pillow is imported on first image load; checking for it is enough at import time
+PILLOW_AVAILABLE = find_spec('PIL') is not None
+if not PILLOW_AVAILABLE:
     print("⚠️  Pillow not available - image analysis disabled")
 
+# numpy is imported by the functions that use it, so importing this module stays cheap
+NUMPY_AVAILABLE = find_spec('numpy') is not None
+
+# Pixels within this palette distance count for the matched terrain
+PALETTE_TOLERANCE = 30
+# Half-width of the square of pixels sampled around a hex centre
+SAMPLE_RADIUS = 5
+
 class ImageAnalyzer:
     """
     Analyzes a map image to determine terrain for a hex grid.
@@ -59,12 +68,18 @@ class ImageAnalyzer:
             ],
         }
         self.map_image = self._load_map_image()
+        # numpy views of the image, built on first use
+        self._pixels = None
+        self._integral = None
+        self._palette_key = None
+        self._palette = None
     
     def _load_map_image(self):
         if not PILLOW_AVAILABLE:
             return None
         if os.path.exists(self.map_image_path):
             try:
+                from PIL import Image
                 img = Image.open(self.map_image_path)
                 if self.debug:
                     print(f"✅ Loaded map image: {self.map_image_path} size={img.size}")
@@ -140,8 +155,98 @@ class ImageAnalyzer:
             self._debug_counter += 1
         return pixel_x, pixel_y, in_image
         
+    # ===== NUMPY IMAGE VIEWS =====
+
+    def _pixel_array(self):
+        """The image as a (height, width, 3) uint8 array."""
+        if self._pixels is None:
+            import numpy as np
+            img = self.map_image
+            if img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGB')
+            self._pixels = np.asarray(img)[:, :, :3]
+        return self._pixels
+
+    def _summed_area_table(self):
+        """Per-channel summed-area table with a zero first row and column."""
+        if self._integral is None:
+            import numpy as np
+            pixels = self._pixel_array()
+            height, width, _ = pixels.shape
+            # int32 halves the memory whenever the full-image sum fits
+            dtype = np.int32 if 255 * height * width < 2 ** 31 else np.int64
+            integral = np.zeros((height + 1, width + 1, 3), dtype=dtype)
+            np.cumsum(np.cumsum(pixels, axis=0, dtype=dtype), axis=1, out=integral[1:, 1:])
+            self._integral = integral
+        return self._integral
+
+    def palette_arrays(self):
+        """(colors (n, 3), terrain index per color, terrain names); rebuilt when terrain_colors changes."""
+        import numpy as np
+        key = tuple((terrain, tuple(colors)) for terrain, colors in self.terrain_colors.items())
+        if key != self._palette_key:
+            names = list(self.terrain_colors)
+            colors = [c for colors in self.terrain_colors.values() for c in colors]
+            owners = [i for i, colors in enumerate(self.terrain_colors.values()) for _ in colors]
+            self._palette = (np.array(colors, dtype=np.int64).reshape(-1, 3),
+                             np.array(owners, dtype=np.intp), names)
+            self._palette_key = key
+        return self._palette
+
+    def _hex_region_bounds(self):
+        """Pixel bounds (left, right, top, bottom) of the box each hex covers, as arrays over (y, x)."""
+        import numpy as np
+        img_width, img_height = self.map_image.size
+        grid_width, grid_height = self.map_width, self.map_height
+        scale = min(img_width / grid_width, img_height / grid_height)
+        x_offset = int((img_width - grid_width * scale) / 2)
+        y_offset = int((img_height - grid_height * scale) / 2)
+        xs = np.arange(1, grid_width + 1)
+        ys = np.arange(1, grid_height + 1)
+        left = (x_offset + (xs - 1) * scale).astype(np.int64)
+        right = (x_offset + xs * scale).astype(np.int64)
+        top = (y_offset + (ys - 1) * scale).astype(np.int64)
+        bottom = (y_offset + ys * scale).astype(np.int64)
+        return (np.clip(left, 0, img_width), np.clip(right, 0, img_width),
+                np.clip(top, 0, img_height), np.clip(bottom, 0, img_height))
+
+    def average_color_grid(self):
+        """
+        Mean RGB of every hex's image region as a (map_height, map_width, 3) array.
+
+        All hexes come from one summed-area table, so this costs a few array
+        operations regardless of hex size.
+        """
+        import numpy as np
+        integral = self._summed_area_table()
+        left, right, top, bottom = self._hex_region_bounds()
+        t, b = top[:, None], bottom[:, None]
+        l, r = left[None, :], right[None, :]
+        sums = integral[b, r] - integral[t, r] - integral[b, l] + integral[t, l]
+        counts = ((b - t) * (r - l))[..., None]
+        return np.where(counts > 0, sums // np.maximum(counts, 1), 0)
+
     def get_average_color_for_hex(self, hex_x: int, hex_y: int) -> Tuple[int, int, int]:
         """Return the average RGB color for the region of the image corresponding to this hex."""
+        if NUMPY_AVAILABLE:
+            img_width, img_height = self.map_image.size
+            scale = min(img_width / self.map_width, img_height / self.map_height)
+            x_offset = int((img_width - self.map_width * scale) / 2)
+            y_offset = int((img_height - self.map_height * scale) / 2)
+            left = max(0, min(int(x_offset + (hex_x - 1) * scale), img_width))
+            right = max(0, min(int(x_offset + hex_x * scale), img_width))
+            top = max(0, min(int(y_offset + (hex_y - 1) * scale), img_height))
+            bottom = max(0, min(int(y_offset + hex_y * scale), img_height))
+            count = (right - left) * (bottom - top)
+            if count <= 0:
+                return (0, 0, 0)
+            integral = self._summed_area_table()
+            total = integral[bottom, right] - integral[top, right] - integral[bottom, left] + integral[top, left]
+            r, g, b = (int(v) for v in total // count)
+            return (r, g, b)
+        return self._get_average_color_for_hex_scalar(hex_x, hex_y)
+
+    def _get_average_color_for_hex_scalar(self, hex_x: int, hex_y: int) -> Tuple[int, int, int]:
         img_width, img_height = self.map_image.size
         grid_width, grid_height = self.map_width, self.map_height
         scale = min(img_width / grid_width, img_height / grid_height)
@@ -168,9 +273,54 @@ class ImageAnalyzer:
         b = sum(c[2] for c in pixels) // len(pixels)
         return (r, g, b)
 
+    def classify_colors(self, colors) -> Tuple[Any, List[str]]:
+        """
+        Terrain index of each color in an (n, 3) array, and the terrain names.
+
+        A color takes the terrain of its nearest palette entry (first entry on
+        ties) when within PALETTE_TOLERANCE, else 'sea' for dark blues, else
+        'unknown'.
+        """
+        import numpy as np
+        palette, owners, names = self.palette_arrays()
+        names = list(names)
+        for extra in ('sea', 'unknown'):
+            if extra not in names:
+                names.append(extra)
+        colors = np.asarray(colors, dtype=np.int64).reshape(-1, 3)
+        diff = colors[:, None, :] - palette[None, :, :]
+        squared = np.einsum('ijk,ijk->ij', diff, diff)
+        nearest = squared.argmin(axis=1)
+        labels = owners[nearest]
+        outside = squared[np.arange(len(colors)), nearest] > PALETTE_TOLERANCE ** 2
+        r, g, b = colors[:, 0], colors[:, 1], colors[:, 2]
+        bluish = (r < 60) & (g < 100) & (b > 100)
+        labels = np.where(outside & bluish, names.index('sea'), labels)
+        labels = np.where(outside & ~bluish, names.index('unknown'), labels)
+        return labels, names
+
     def _analyze_pixel_terrain(self, pixel_x: int, pixel_y: int, hex_code: Optional[str] = None) -> str:
         if not self.map_image:
             return 'unknown'
+        if not NUMPY_AVAILABLE:
+            return self._analyze_pixel_terrain_scalar(pixel_x, pixel_y, hex_code)
+        import numpy as np
+        pixels = self._pixel_array()
+        height, width, _ = pixels.shape
+        offsets = np.arange(-SAMPLE_RADIUS, SAMPLE_RADIUS + 1)
+        xs = np.clip(pixel_x + offsets, 0, width - 1)
+        ys = np.clip(pixel_y + offsets, 0, height - 1)
+        # Sampled column by column, like the scalar version, so ties resolve the same way
+        samples = pixels[ys[None, :], xs[:, None]].reshape(-1, 3)
+        labels, names = self.classify_colors(samples)
+        counts = np.bincount(labels, minlength=len(names))
+        first_seen = np.full(len(names), len(labels))
+        np.minimum.at(first_seen, labels, np.arange(len(labels)))
+        # Most votes; ties go to the terrain that was matched first
+        best = min(np.flatnonzero(counts == counts.max()), key=lambda i: first_seen[i])
+        return names[best]
+
+    def _analyze_pixel_terrain_scalar(self, pixel_x: int, pixel_y: int, hex_code: Optional[str] = None) -> str:
         sample_size = 5
         colors: List[Tuple[int, int, int]] = []
         for dx in range(-sample_size, sample_size + 1):
@@ -194,21 +344,12 @@ class ImageAnalyzer:
         for color in colors:
             best_terrain = 'unknown'
             best_dist = float('inf')
-            palette_distances = {}
             for terrain, color_list in self.terrain_colors.items():
                 for tcolor in color_list:
                     dist = color_distance(color, tcolor)
                     if dist < best_dist:
                         best_dist = dist
                         best_terrain = terrain
-                    # Track min distance for each terrain
-                    if terrain not in palette_distances or dist < palette_distances[terrain]:
-                        palette_distances[terrain] = dist
-            if hex_code == "0503":
-                
-                for t, d in palette_distances.items():
-                    print(f"  {t}: distance={d}")
-                print(f"  -> chosen terrain: {best_terrain} (distance={best_dist})")
             if best_dist <= tolerance:
                 terrain_scores[best_terrain] = terrain_scores.get(best_terrain, 0) + 1
                 color_matches[best_terrain].append(color)
@@ -229,14 +370,95 @@ class ImageAnalyzer:
         return 'unknown'
 
     def _most_common_color(self, color_list: List[Tuple[int, int, int]]) -> Tuple[int, int, int]:
-        from collections import Counter
         if not color_list:
             return (0, 0, 0)
         return Counter(color_list).most_common(1)[0][0]
 
-    def analyze_palette_suggestions(self, sample_limit=10000):
+    def _sample_pixels(self, sample_limit: int):
+        pixels = self._pixel_array()
+        height, width, _ = pixels.shape
+        step = max(1, int(((width * height) / sample_limit) ** 0.5))
+        return pixels[::step, ::step].reshape(-1, 3)
+
+    def cluster_palette(self, k: int = 12, sample_limit: int = 20000, iterations: int = 25,
+                        seed: int = 0) -> List[Dict[str, Any]]:
+        """
+        Dominant colors of the image by k-means over a grid sample of pixels.
+
+        Returns clusters (largest first) with their share of the sample and the
+        nearest current palette terrain, for tuning terrain_colors.
+        """
+        if not self.map_image or not NUMPY_AVAILABLE:
+            return []
+        import numpy as np
+        samples = self._sample_pixels(sample_limit).astype(np.float64)
+        k = max(1, min(k, len(samples)))
+        rng = np.random.default_rng(seed)
+        # k-means++ seeding
+        centers = [samples[rng.integers(len(samples))]]
+        closest = ((samples - centers[0]) ** 2).sum(axis=1)
+        for _ in range(1, k):
+            total = closest.sum()
+            index = rng.choice(len(samples), p=closest / total) if total > 0 else rng.integers(len(samples))
+            centers.append(samples[index])
+            closest = np.minimum(closest, ((samples - samples[index]) ** 2).sum(axis=1))
+        centers = np.array(centers)
+        for _ in range(iterations):
+            distances = ((samples[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+            assignment = distances.argmin(axis=1)
+            sums = np.zeros_like(centers)
+            np.add.at(sums, assignment, samples)
+            counts = np.bincount(assignment, minlength=k)
+            updated = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+            if np.allclose(updated, centers, atol=0.5):
+                centers = updated
+                break
+            centers = updated
+        assignment = ((samples[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+        counts = np.bincount(assignment, minlength=k)
+
+        colors = np.rint(centers).astype(np.int64)
+        palette, owners, names = self.palette_arrays()
+        diff = colors[:, None, :] - palette[None, :, :]
+        squared = (diff * diff).sum(axis=2)
+        nearest = squared.argmin(axis=1)
+        clusters = []
+        for i in np.argsort(-counts, kind='stable'):
+            if not counts[i]:
+                continue
+            clusters.append({
+                'color': tuple(int(c) for c in colors[i]),
+                'share': round(float(counts[i]) / len(samples), 4),
+                'nearest_terrain': names[owners[nearest[i]]],
+                'palette_distance': round(float(squared[i, nearest[i]]) ** 0.5, 1),
+            })
+        return clusters
+
+    def analyze_palette_suggestions(self, sample_limit=10000, k: int = 12):
         """Analyze the image and print the most common colors, suggesting palette updates."""
-        from collections import Counter
+        if not self.map_image:
+            print("[ImageAnalyzer] No image loaded.")
+            return
+        if not NUMPY_AVAILABLE:
+            return self._analyze_palette_suggestions_scalar(sample_limit)
+        import numpy as np
+        colors, counts = np.unique(self._sample_pixels(sample_limit), axis=0, return_counts=True)
+        order = np.argsort(-counts, kind='stable')
+        print("[ImageAnalyzer] Most common colors in image:")
+        for i in order[:20]:
+            print(f"  {tuple(int(c) for c in colors[i])}: {int(counts[i])}")
+        clusters = self.cluster_palette(k=k, sample_limit=sample_limit)
+        print("[ImageAnalyzer] Dominant color clusters (k-means):")
+        for cluster in clusters:
+            print(f"  {cluster['color']}: {cluster['share']:.1%} "
+                  f"(nearest: {cluster['nearest_terrain']}, distance {cluster['palette_distance']})")
+        print("[ImageAnalyzer] Suggest adding these to your palette if they match terrain:")
+        for cluster in clusters:
+            if cluster['palette_distance'] > PALETTE_TOLERANCE:
+                print(f"    {cluster['color']},")
+        return clusters
+
+    def _analyze_palette_suggestions_scalar(self, sample_limit=10000):
         if not self.map_image:
             print("[ImageAnalyzer] No image loaded.")
             return
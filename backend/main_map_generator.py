@@ -6,10 +6,14 @@ Consolidates MapGenerator and HexGenerator into one unified system.
 """
 
 import os
+import json
 import time
+import functools
 import random
 import shutil
-from typing import Dict, List, Tuple, Optional, Any
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Optional, Any
 
 from backend.database_manager import database_manager
 from backend.utils.loot_generator import LootGenerator
@@ -21,6 +25,20 @@ from backend.utils.markdown_formatter import format_beast_details, format_sea_en
 from backend.terrain_system import TerrainSystem
 from backend.translation_system import translation_system
 from backend.mork_borg_lore_database import MorkBorgLoreDatabase
+from backend.hex_attributes import HexAttributeTable, hex_type_from_data, region_for_hex
+from backend.config import get_config as get_app_config
+from backend.world_chunks import ChunkLayout, ChunkStore
+from backend.utils.core_utils import format_hex_code, parse_hex_coordinates
+from backend.utils.metrics import timed
+
+def _in_generator_language(method):
+    """Run a generator method with translations in the generator's language."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.translation_system.use_language(self.language):
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class MainMapGenerator:
     """Unified map generator - single entry point for all map generation."""
@@ -32,8 +50,8 @@ class MainMapGenerator:
         
         # Initialize core systems
         self.language = self.config.get('language', 'en')
+        # Language is applied per call (see _in_generator_language), never process-wide
         self.translation_system = translation_system
-        self.translation_system.set_language(self.language)
         self.lore_db = MorkBorgLoreDatabase()
         
         # Load content tables
@@ -52,6 +70,11 @@ class MainMapGenerator:
         # Map configuration
         self.map_width, self.map_height = self.config.get('map_dimensions', (30, 60))
         self.start_x, self.start_y = self.config.get('map_start', (1, 1))
+        # Large maps are generated and stored chunk by chunk (see backend.world_chunks)
+        self.chunk_layout = None
+        if self.config.get('chunked'):
+            self.chunk_layout = ChunkLayout(self.map_width, self.map_height, self.config.get('chunk_size', 32))
+        self.code_digits = self.chunk_layout.digits if self.chunk_layout else 2
         hexy_output_env = os.getenv('HEXY_OUTPUT_DIR')
         hexy_app_dir = os.getenv('HEXY_APP_DIR')
         if hexy_output_env:
@@ -88,21 +111,32 @@ class MainMapGenerator:
         
         # Initialize terrain system with correct map size
         global terrain_system
-        from backend.terrain_system import TerrainSystem
-        terrain_system = TerrainSystem(
-            map_width=self.map_width,
-            map_height=self.map_height,
-            image_path="data/mork_borg_official_map.jpg",
-            mapping_mode="letterbox",
-            debug=False
-        )
+        if self.chunk_layout is not None:
+            # The official map image only covers the classic map; chunked maps use noise terrain
+            terrain_system = TerrainSystem(
+                map_width=self.map_width,
+                map_height=self.map_height,
+                chunk_size=self.chunk_layout.chunk_size
+            )
+        else:
+            terrain_system = TerrainSystem(
+                map_width=self.map_width,
+                map_height=self.map_height,
+                image_path="data/mork_borg_official_map.jpg",
+                mapping_mode="letterbox",
+                debug=False
+            )
+        self.chunk_store = ChunkStore(self.output_dir, self.chunk_layout) if self.chunk_layout else None
     
     def _load_config(self, config: Dict) -> Dict:
         """Load and validate configuration."""
+        map_config = get_app_config().map
         default_config = {
             'language': 'en',
-            'map_dimensions': (30, 60),
+            'map_dimensions': (map_config.width, map_config.height),
             'map_start': (1, 1),
+            'chunked': map_config.chunked,
+            'chunk_size': map_config.chunk_size,
             # Do not force an output_directory here; let environment decide.
             # When not specified, the generator will use HEXY_OUTPUT_DIR or
             # fallback to APP_DIR/dying_lands_output.
@@ -128,6 +162,8 @@ class MainMapGenerator:
     
     # ===== MAIN GENERATION METHODS =====
     
+    @timed('generate_full_map')
+    @_in_generator_language
     def generate_full_map(self, options: Optional[Dict] = None) -> Dict:
         """Generate content for the entire map."""
         print(f"🗺️ {self.translation_system.t('ui.generating_full_map', fallback='Generating Full Map')}...")
@@ -142,15 +178,21 @@ class MainMapGenerator:
         
         self._create_output_dirs()
         
+        if self.chunk_layout is not None:
+            return self._generate_chunked_map(skip_existing)
+        
         all_hex_data = []
+        attributes = HexAttributeTable()
         generated_count = 0
         skipped_count = 0
+        # Terrain for the whole map, resolved in one pass
+        terrain_grid = terrain_system.get_terrain_grid(self.lore_db)
         
         # Generate content for each hex
         for x in range(self.start_x, self.start_x + self.map_width):
             for y in range(self.start_y, self.start_y + self.map_height):
-                hex_code = f"{x:02d}{y:02d}"
-                hex_file = f"{self.output_dir}/hexes/hex_{hex_code}.md"
+                hex_code = format_hex_code(x, y, self.code_digits)
+                hex_file = self._hex_file_path(hex_code)
                 
                 # Skip if file exists and skip_existing is True
                 if skip_existing and os.path.exists(hex_file):
@@ -161,8 +203,10 @@ class MainMapGenerator:
                 #print(f"🎲 {self.translation_system.t('generating_hex')} {hex_code}...")
                 
                 # Generate hex content
-                hex_data = self.generate_hex_content(hex_code)
+                terrain = terrain_grid.get(hex_code)
+                hex_data = self.generate_hex_content(hex_code, terrain)
                 all_hex_data.append(hex_data)
+                attributes.set_from_dict(hex_code, hex_data, region_for_hex(hex_code, self.lore_db))
                 
                 # Write hex file
                 self._write_hex_file(hex_data)
@@ -175,6 +219,9 @@ class MainMapGenerator:
         if self.config.get('create_ascii_map', True):
             self._create_ascii_map(all_hex_data)
         
+        statistics = attributes.statistics()
+        self._write_statistics_file(statistics)
+        
         print(f"\n✅ {self.translation_system.t('generation_complete')}!")
         print(f"📊 Generated: {generated_count} hexes")
         print(f"⏭️  Skipped: {skipped_count} hexes")
@@ -185,9 +232,91 @@ class MainMapGenerator:
             'generated_count': generated_count,
             'skipped_count': skipped_count,
             'total_hexes': len(all_hex_data),
+            'statistics': statistics,
             'hex_data': all_hex_data
         }
     
+    def _generate_chunked_map(self, skip_existing: bool) -> Dict:
+        """Generate every chunk in turn; only one chunk's hexes are held at a time."""
+        self.chunk_store.write_manifest()
+        generated_count = 0
+        skipped_count = 0
+        for cx, cy in self.chunk_layout.chunks():
+            result = self.generate_chunk(cx, cy, skip_existing=skip_existing)
+            generated_count += result['generated_count']
+            skipped_count += result['skipped_count']
+        
+        print(f"\n✅ {self.translation_system.t('generation_complete')}!")
+        print(f"📊 Generated: {generated_count} hexes in {self.chunk_layout.chunk_count} chunks")
+        print(f"⏭️  Skipped: {skipped_count} hexes")
+        print(f"📁 Files in '{self.chunk_store.root}/' directory")
+        
+        return {
+            'success': True,
+            'generated_count': generated_count,
+            'skipped_count': skipped_count,
+            'total_hexes': generated_count,
+            'chunks': self.chunk_layout.chunk_count,
+            'layout': self.chunk_layout.to_dict(),
+            'hex_data': []
+        }
+    
+    @timed('generate_chunk')
+    @_in_generator_language
+    def generate_chunk(self, cx: int, cy: int, skip_existing: bool = False) -> Dict:
+        """
+        Generate the hexes of one chunk of a chunked map and write its index.
+        
+        Existing hexes are kept (and re-indexed from their entries in the old
+        index) when skip_existing is set.
+        """
+        if self.chunk_layout is None:
+            raise ValueError('Map is not chunked')
+        if not self.chunk_layout.contains_chunk(cx, cy):
+            raise ValueError(f"Chunk {cx},{cy} is outside the map")
+        
+        previous = (self.chunk_store.load_index(cx, cy) or {}).get('hexes', {}) if skip_existing else {}
+        terrain_grid = terrain_system.get_chunk_grid(cx, cy, self.lore_db)
+        entries: Dict[str, Dict[str, Any]] = {}
+        generated_count = 0
+        skipped_count = 0
+        
+        for hex_code, terrain in terrain_grid.items():
+            if skip_existing and hex_code in previous and self._hex_file_path(hex_code).exists():
+                entries[hex_code] = previous[hex_code]
+                skipped_count += 1
+                continue
+            hex_data = self.generate_hex_content(hex_code, terrain)
+            self._write_hex_file(hex_data)
+            entries[hex_code] = self._index_entry(hex_data)
+            generated_count += 1
+        
+        self.chunk_store.write_index(cx, cy, entries)
+        return {
+            'success': True,
+            'chunk': [cx, cy],
+            'generated_count': generated_count,
+            'skipped_count': skipped_count,
+        }
+    
+    @staticmethod
+    def _index_entry(hex_data: Dict[str, Any]) -> Dict[str, Any]:
+        """What a chunk index records about a hex (enough to draw it on the map)."""
+        return {
+            'terrain': hex_data.get('terrain', 'unknown'),
+            'type': hex_type_from_data(hex_data),
+            'loot': bool(hex_data.get('loot')),
+            'scroll': bool(hex_data.get('scroll')),
+            'name': hex_data.get('name'),
+        }
+    
+    def _hex_file_path(self, hex_code: str) -> Path:
+        """Path of a hex's markdown file in this generator's layout."""
+        if self.chunk_store is not None:
+            return self.chunk_store.hex_path(hex_code)
+        return Path(self.output_dir) / 'hexes' / f"hex_{hex_code}.md"
+    
+    @_in_generator_language
     def generate_single_hex(self, hex_code: str) -> Dict:
         """Generate content for a single hex."""
         print(f"🎲 {self.translation_system.t('generating_hex')} {hex_code}...")
@@ -201,10 +330,17 @@ class MainMapGenerator:
         
         # Write hex file
         self._write_hex_file(hex_data)
+        if self.chunk_store is not None:
+            cx, cy = self.chunk_layout.chunk_of_code(hex_code)
+            index = self.chunk_store.load_index(cx, cy) or {}
+            entries = index.get('hexes', {})
+            entries[hex_code] = self._index_entry(hex_data)
+            self.chunk_store.write_index(cx, cy, entries)
         
         print(f"✅ Generated hex {hex_code}")
         return hex_data
     
+    @_in_generator_language
     def generate_hex_content(self, hex_code: str, terrain: Optional[str] = None) -> Dict[str, Any]:
         """Generate complete content for a hex."""
         # Determine terrain if not provided
@@ -219,6 +355,7 @@ class MainMapGenerator:
         # Generate terrain-aware content
         return self._generate_terrain_hex_content(hex_code, terrain)
     
+    @_in_generator_language
     def reset_continent(self) -> Dict:
         """Reset the entire continent and regenerate all content."""
         print(f"🔄 Resetting continent...")
@@ -246,6 +383,7 @@ class MainMapGenerator:
     
     # ===== CONTENT GENERATION METHODS =====
     
+    @timed('generate_content', content_type='lore')
     def _generate_lore_hex_content(self, hex_code: str, hardcoded_data: Dict) -> Dict[str, Any]:
         """Generate content for lore-specific hexes (cities, special locations)."""
         location_type = hardcoded_data.get('type', 'special_location')
@@ -340,6 +478,7 @@ class MainMapGenerator:
         
         return hex_data
 
+    @timed('generate_content', content_type='sea')
     def _generate_sea_content(self, hex_code: str, terrain: str) -> Dict[str, Any]:
         """Generate sea encounter content with Tephrotic nightmares and oceanic horrors."""
         # Get sea content from database
@@ -402,6 +541,7 @@ class MainMapGenerator:
             'content_type': 'sea_encounter'
         }
     
+    @timed('generate_content', content_type='settlement')
     def _generate_settlement_content(self, hex_code: str, terrain: str) -> Dict[str, Any]:
         """Generate settlement-specific content with Mörk Borg tavern details."""
         # Generate settlement name
@@ -448,6 +588,7 @@ class MainMapGenerator:
             'is_settlement': True
         }
     
+    @timed('generate_content', content_type='dungeon')
     def _generate_dungeon_content(self, hex_code: str, terrain: str) -> Dict[str, Any]:
         """Generate dungeon/ruins content with Mörk Borg trap details."""
         # Get dungeon tables
@@ -511,6 +652,7 @@ class MainMapGenerator:
             'is_dungeon': True
         }
     
+    @timed('generate_content', content_type='beast')
     def _generate_beast_content(self, hex_code: str, terrain: str) -> Dict[str, Any]:
         """Generate beast encounter content."""
         # Get bestiary tables
@@ -548,6 +690,7 @@ class MainMapGenerator:
             'is_beast': True
         }
     
+    @timed('generate_content', content_type='npc')
     def _generate_npc_content(self, hex_code: str, terrain: str, denizen_types: List[str]) -> Dict[str, Any]:
         """Generate NPC/denizen content using centralized utility."""
         # Use centralized NPC generator
@@ -749,13 +892,14 @@ T=Tavern  H=House  S=Shrine  G=Gate  W=Well
     
     # ===== FILE I/O METHODS =====
     
+    @timed('file_write')
     def _write_hex_file(self, hex_data: Dict[str, Any]):
         """Write hex content to a markdown file."""
         if 'markdown' not in self.output_formats:
             return
         
         hex_code = hex_data['hex_code']
-        filename = f"{self.output_dir}/hexes/hex_{hex_code}.md"
+        filename = str(self._hex_file_path(hex_code))
         
         # Ensure directory exists
         os.makedirs(os.path.dirname(filename), exist_ok=True)
@@ -794,6 +938,7 @@ T=Tavern  H=House  S=Shrine  G=Gate  W=Well
         
         return terrain_names.get(self.language, terrain_names['en']).get(terrain, terrain.title())
 
+    @timed('markdown_format')
     def _generate_markdown_content(self, hex_data: Dict[str, Any]) -> str:
         """Generate markdown content for the hex."""
         lines = []
@@ -984,6 +1129,14 @@ T=Tavern  H=House  S=Shrine  G=Gate  W=Well
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(content)
     
+    def _write_statistics_file(self, statistics: Dict[str, Any]):
+        """Write aggregate counts of the generated hexes (hex_stats.json)."""
+        try:
+            with open(f"{self.output_dir}/hex_stats.json", 'w', encoding='utf-8') as f:
+                json.dump(statistics, f, indent=2)
+        except OSError as e:
+            print(f"Warning: Could not write hex statistics: {e}")
+    
     def _generate_summary_content(self, all_hex_data: List[Dict[str, Any]]) -> str:
         """Generate summary content."""
         lines = []
@@ -1054,7 +1207,7 @@ T=Tavern  H=House  S=Shrine  G=Gate  W=Well
             for y in range(1, self.map_height + 1):
                 f.write(f"{y:2d} ")
                 for x in range(1, self.map_width + 1):
-                    hex_code = f"{x:02d}{y:02d}"
+                    hex_code = format_hex_code(x, y, self.code_digits)
                     symbol = content_map.get(hex_code, '?')
                     f.write(f" {symbol} ")
                 f.write("\n")
@@ -1073,7 +1226,7 @@ T=Tavern  H=House  S=Shrine  G=Gate  W=Well
         """Create necessary output directories."""
         dirs = [
             self.output_dir,
-            f"{self.output_dir}/hexes",
+            f"{self.output_dir}/chunks" if self.chunk_layout else f"{self.output_dir}/hexes",
             f"{self.output_dir}/npcs"
         ]
         
@@ -1082,10 +1235,12 @@ T=Tavern  H=House  S=Shrine  G=Gate  W=Well
     
     def _is_valid_hex_code(self, hex_code: str) -> bool:
         """Validate hex code format."""
-        if not hex_code.isdigit() or len(hex_code) != 4:
+        try:
+            x, y = parse_hex_coordinates(hex_code)
+        except ValueError:
+            return False
+        if len(hex_code) != 2 * self.code_digits:
             return False
-        
-        x, y = int(hex_code[:2]), int(hex_code[2:])
         return 1 <= x <= self.map_width and 1 <= y <= self.map_height
     
     # ===== INFORMATION METHODS =====
@@ -1159,6 +1314,102 @@ T=Tavern  H=House  S=Shrine  G=Gate  W=Well
         print(f"✅ Configuration updated")
 
 
+# ===== WORLD GENERATION =====
+
+def write_generation_version(output_dir: Path, version: Optional[str] = None, language: str = 'en') -> str:
+    """Write the version.json manifest of a generated world; returns the version."""
+    version = version or str(int(time.time()))
+    manifest = {
+        'version': version,
+        'generatedAt': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+        'language': language,
+    }
+    (Path(output_dir) / 'version.json').write_text(json.dumps(manifest), encoding='utf-8')
+    return version
+
+
+def generate_world(output_dir: Path, language: str = 'en',
+                   overlay_languages: Iterable[str] = ()) -> Optional[str]:
+    """
+    Generate a complete world into output_dir unless one already exists.
+
+    The continent and the city overlays of every overlay language are generated
+    into a sibling staging directory and swapped into place, under a lock file
+    shared by every process. Chunked maps are generated chunk by chunk on
+    request, so only their manifest is written here.
+
+    Returns the generation version of the new world, or None when there already
+    was one (possibly generated by another process meanwhile).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from backend.world_chunks import world_layout
+    from backend.world_import import swap_into_place
+    from backend.world_snapshot import world_exists
+
+    output_dir = Path(output_dir)
+    layout = world_layout()
+    if layout is not None:
+        store = ChunkStore(output_dir, layout)
+        if store.load_manifest() is not None:
+            return None
+        store.write_manifest()
+        return write_generation_version(output_dir, language=language)
+    if world_exists(output_dir):
+        return None
+
+    # Cross-process lock; if another process holds it, wait for its world
+    lock_file = output_dir.parent / f".{output_dir.name}.generating"
+    try:
+        lock_file.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(str(int(time.time())))
+    except FileExistsError:
+        for _ in range(120):  # ~60s
+            if world_exists(output_dir) or not lock_file.exists():
+                break
+            time.sleep(0.5)
+        return None
+
+    generation_version = str(int(time.time()))
+    staging = output_dir.parent / f"{output_dir.name}.staging-{generation_version}"
+    try:
+        # Checked again under the lock: the world may have appeared while we acquired it
+        if world_exists(output_dir):
+            return None
+        generator = MainMapGenerator({'language': language, 'output_directory': str(staging)})
+        # City overlays are generated next to the continent so they land in the same swap
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            map_future = pool.submit(generator.generate_full_map, {'skip_existing': False})
+            overlay_future = pool.submit(_pregenerate_overlays, staging, overlay_languages, generation_version)
+            result = map_future.result()
+            overlay_future.result()
+        if not isinstance(result, dict):
+            raise RuntimeError('Unexpected generation result')
+        write_generation_version(staging, generation_version, language)
+        backup = swap_into_place(staging, output_dir)
+        if backup is not None:
+            shutil.rmtree(backup, ignore_errors=True)
+        return generation_version
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+        try:
+            lock_file.unlink()
+        except OSError:
+            pass
+
+
+def _pregenerate_overlays(staging: Path, languages: Iterable[str], generation_version: str) -> None:
+    """Generate all major-city overlays and contexts for the given languages into staging."""
+    try:
+        from backend.city_overlay_analyzer import pregenerate_city_overlays
+        counts = pregenerate_city_overlays(str(staging / 'city_overlays'), languages, generation_version)
+        print(f"[BOOT] Pre-generated city overlays: {counts}")
+    except Exception as e:
+        # Overlays are still generated lazily on request if this fails
+        print(f"[BOOT] City overlay pre-generation failed: {e}")
+
+
 # ===== MAIN FUNCTION =====
 
 def main():
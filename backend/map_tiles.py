@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Map tiles for The Dying Lands.
+
+The map is served in square tiles of TILE_SIZE x TILE_SIZE cells so clients
+only load what is on screen. At zoom 0 a cell is one hex; at zoom z a cell
+covers 2**z x 2**z hexes and shows their most common terrain. Tiles are
+encoded compactly, row-major:
+
+    {
+      "z": 0, "x": 1, "y": 2,            # tile address
+      "x0": 17, "y0": 33, "step": 1,     # map coordinates of the first cell, hexes per cell side
+      "width": 16, "height": 16,         # cells, clipped at the map edge
+      "symbols": ".^^♠...",              # one character per cell
+      "classes": [3, 3, 1, ...],         # indexes into the class table of /api/map/tiles
+      "flags": [0, 1, 0, ...],           # FLAG_* bits
+      "cities": {"37": "Galgenbeck"}     # cell index -> city name
+    }
+
+    HEXY_TILE_SIZE=16    # cells per tile side
+"""
+
+import os
+from collections import Counter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from backend.terrain_grid import TerrainGrid
+from backend.utils.core_utils import format_hex_code
+
+TILE_SIZE = int(os.getenv('HEXY_TILE_SIZE', '16'))
+MAX_ZOOM = 4
+
+FLAG_CONTENT = 1
+FLAG_CITY = 2
+FLAG_SETTLEMENT = 4
+# The hex has not been generated yet (chunked maps) or has no map entry
+FLAG_PENDING = 8
+
+UNKNOWN_CLASS = 'terrain-unknown'
+CITY_CLASS = 'major-city'
+SETTLEMENT_CLASS = 'settlement'
+
+
+class TileCodec:
+    """Tile addressing and encoding for one map size."""
+
+    def __init__(self, width: int, height: int, terrain_types: Sequence[str],
+                 digits: int = 2, tile_size: int = TILE_SIZE):
+        self.width = width
+        self.height = height
+        self.digits = digits
+        self.tile_size = tile_size
+        terrain_classes = [f'terrain-{t}' for t in terrain_types if f'terrain-{t}' != UNKNOWN_CLASS]
+        self.classes: List[str] = [UNKNOWN_CLASS] + terrain_classes + [SETTLEMENT_CLASS, CITY_CLASS]
+        self._class_index = {name: i for i, name in enumerate(self.classes)}
+
+    # ----- addressing -----
+
+    def tile_counts(self, z: int) -> Tuple[int, int]:
+        span = self.tile_size << z
+        return -(-self.width // span), -(-self.height // span)
+
+    def contains_tile(self, z: int, x: int, y: int) -> bool:
+        if not 0 <= z <= MAX_ZOOM:
+            return False
+        tiles_x, tiles_y = self.tile_counts(z)
+        return 0 <= x < tiles_x and 0 <= y < tiles_y
+
+    def hex_rect(self, z: int, x: int, y: int) -> Tuple[int, int, int, int]:
+        """(x0, y0, x1, y1) of the hexes a tile covers, inclusive and clipped to the map."""
+        span = self.tile_size << z
+        x0, y0 = 1 + x * span, 1 + y * span
+        return x0, y0, min(self.width, x0 + span - 1), min(self.height, y0 + span - 1)
+
+    def hex_code(self, x: int, y: int) -> str:
+        return format_hex_code(x, y, self.digits)
+
+    def class_index(self, css_class: Optional[str]) -> int:
+        """Index of the first known class of a space-separated CSS class string."""
+        for name in (css_class or '').split():
+            index = self._class_index.get(name)
+            if index is not None:
+                return index
+        return 0
+
+    def metadata(self) -> Dict[str, Any]:
+        return {
+            'map_width': self.width,
+            'map_height': self.height,
+            'code_digits': self.digits,
+            'tile_size': self.tile_size,
+            'max_zoom': MAX_ZOOM,
+            'tiles': {z: list(self.tile_counts(z)) for z in range(MAX_ZOOM + 1)},
+            'classes': list(self.classes),
+            'flags': {'content': FLAG_CONTENT, 'city': FLAG_CITY,
+                      'settlement': FLAG_SETTLEMENT, 'pending': FLAG_PENDING},
+        }
+
+    # ----- encoding -----
+
+    def _tile(self, z: int, x: int, y: int, columns: int, rows: int) -> Dict[str, Any]:
+        x0, y0, _, _ = self.hex_rect(z, x, y)
+        return {'z': z, 'x': x, 'y': y, 'x0': x0, 'y0': y0, 'step': 1 << z,
+                'width': columns, 'height': rows}
+
+    def encode_hexes(self, x: int, y: int, hexes: Mapping[str, Mapping[str, Any]]) -> Dict[str, Any]:
+        """Zoom 0 tile from map entries keyed by hex code (the /api/map ascii_map format)."""
+        x0, y0, x1, y1 = self.hex_rect(0, x, y)
+        symbols: List[str] = []
+        classes: List[int] = []
+        flags: List[int] = []
+        cities: Dict[str, str] = {}
+        for hy in range(y0, y1 + 1):
+            for hx in range(x0, x1 + 1):
+                entry = hexes.get(self.hex_code(hx, hy))
+                if entry is None:
+                    symbols.append('?')
+                    classes.append(0)
+                    flags.append(FLAG_PENDING)
+                    continue
+                flag = FLAG_CONTENT if entry.get('has_content') else 0
+                if entry.get('is_city'):
+                    flag |= FLAG_CITY
+                    if entry.get('city_name'):
+                        cities[str(len(flags))] = entry['city_name']
+                if entry.get('content_type') == 'settlement':
+                    flag |= FLAG_SETTLEMENT
+                symbols.append(entry.get('symbol') or '?')
+                classes.append(self.class_index(entry.get('css_class')))
+                flags.append(flag)
+        tile = self._tile(0, x, y, x1 - x0 + 1, y1 - y0 + 1)
+        tile.update({'symbols': ''.join(symbols), 'classes': classes, 'flags': flags, 'cities': cities})
+        return tile
+
+    def encode_overview(self, z: int, x: int, y: int, grid: TerrainGrid,
+                        symbol_for: Callable[[str], str],
+                        cities: Optional[Mapping[Tuple[int, int], str]] = None) -> Dict[str, Any]:
+        """
+        Zoom z > 0 tile: the most common terrain of each cell's hexes.
+
+        grid must cover the tile's hexes; cities maps (x, y) to the names of
+        major cities, which take over the cell they fall in.
+        """
+        x0, y0, x1, y1 = self.hex_rect(z, x, y)
+        step = 1 << z
+        columns = -(-(x1 - x0 + 1) // step)
+        rows = -(-(y1 - y0 + 1) // step)
+        codes, names, width = grid.codes, grid.names, grid.width
+        symbols: List[str] = []
+        classes: List[int] = []
+        flags: List[int] = []
+        for row in range(rows):
+            cy0 = y0 + row * step
+            cy1 = min(y1, cy0 + step - 1)
+            for column in range(columns):
+                cx0 = x0 + column * step
+                cx1 = min(x1, cx0 + step - 1)
+                counts: Counter = Counter()
+                for hy in range(cy0, cy1 + 1):
+                    base = (hy - grid.y0) * width - grid.x0
+                    counts.update(codes[base + cx0:base + cx1 + 1])
+                # Ties go to the lowest terrain code, so tiles are stable
+                terrain = names[min(counts.items(), key=lambda item: (-item[1], item[0]))[0]]
+                symbols.append(symbol_for(terrain))
+                classes.append(self.class_index(f'terrain-{terrain}'))
+                flags.append(0)
+        tile_cities: Dict[str, str] = {}
+        for (hx, hy), name in (cities or {}).items():
+            if x0 <= hx <= x1 and y0 <= hy <= y1:
+                i = ((hy - y0) // step) * columns + (hx - x0) // step
+                symbols[i] = '◆'
+                classes[i] = self._class_index[CITY_CLASS]
+                flags[i] = FLAG_CITY | FLAG_CONTENT
+                tile_cities[str(i)] = name
+        tile = self._tile(z, x, y, columns, rows)
+        tile.update({'symbols': ''.join(symbols), 'classes': classes, 'flags': flags, 'cities': tile_cities})
+        return tile
@@ -18,7 +18,7 @@ class LootType(Enum):
     UTILITY = "utility"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LootItem:
     """Represents a loot item found in a hex."""
     description: str
@@ -38,7 +38,7 @@ class LootItem:
         }
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AncientKnowledge:
     """Represents ancient knowledge or scrolls found in a hex."""
     content: str
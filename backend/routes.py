@@ -4,18 +4,18 @@ Flask Routes for The Dying Lands
 Separated route definitions for better organization.
 """
 
-import re
 import os
+import json
 import time
 import threading
 import secrets
 import logging
 import traceback
-from flask import Blueprint, jsonify, request, abort, render_template
+from flask import Blueprint, jsonify, request, abort, render_template, g
 from flask import Response, send_file
 import os
 from backend.config import get_config
-from backend.utils import setup_project_paths, validate_hex_code
+from backend.utils import setup_project_paths, validate_hex_code, output_dir_for_language
 
 # Setup project paths for imports
 setup_project_paths()
@@ -23,24 +23,39 @@ setup_project_paths()
 # Import after path setup
 from backend.mork_borg_lore_database import MorkBorgLoreDatabase
 from backend.terrain_system import terrain_system
-from backend.main_map_generator import MainMapGenerator
+from backend.terrain_grid import TerrainGrid
+from backend.main_map_generator import MainMapGenerator, generate_world, write_generation_version
 from backend.translation_system import translation_system
 # City overlay analyzer may fail to import during development; guard it
 try:
-    from backend.city_overlay_analyzer import city_overlay_analyzer  # type: ignore
+    from backend.city_overlay_analyzer import (  # type: ignore
+        city_overlay_analyzer,
+        get_city_overlay_analyzer,
+        invalidate_city_overlay_caches,
+    )
 except Exception as _e:  # SyntaxError or other import-time errors
     city_overlay_analyzer = None  # type: ignore
     _CITY_OVERLAY_IMPORT_ERROR = _e  # type: ignore
 from backend.hex_service import hex_service
+from backend.hex_attributes import statistics_from_entries
+from backend.search_index import HexSearchIndex, search_indexes
+from backend.world_store import get_world_store, hex_key, is_shared_store
+from backend.world_import import ImportJob, ImportValidationError, import_jobs, inspect_archive, new_upload_dir, spool_upload
+from backend.world_chunks import CHUNKS_DIR, MANIFEST_NAME, ChunkStore, hex_file_path
+from backend.world_revision import WorldRevision
+from backend.map_tiles import TileCodec
 from backend.hex_model import hex_manager
 from backend.utils.city_processor import create_major_city_response
+from backend.utils.markdown_tokenizer import load_markdown, parse_markdown
 from backend.utils.markdown_parser import parse_content_sections, parse_loot_section, parse_magical_effect, extract_title_from_content, determine_hex_type
 from backend.utils.response_helpers import create_overlay_response, handle_exception_response
+from backend.utils.http_cache import VersionedCache, conditional, file_revision, revision_registry
+from backend.utils.metrics import METRICS_ENABLED, registry as metrics_registry
+from backend.utils.profiling import profiler
 from backend.utils.content_detector import get_hex_content_type, check_hex_has_loot
 from backend.utils.grid_generator import generate_hex_grid, determine_content_symbol, determine_css_class
 import io
 import zipfile
-import tempfile
 import shutil
 from pathlib import Path
 
@@ -52,7 +67,8 @@ assets_bp = Blueprint('assets', __name__, url_prefix='/')
 # Initialize systems
 config = get_config()
 lore_db = MorkBorgLoreDatabase()
-current_language = config.language
+# Language preference cookie written by /api/set-language
+LANGUAGE_COOKIE = 'hexy_language'
 
 # ===== Backend lifetime management via client heartbeat =====
 _HEXY_HEARTBEAT_TS = time.monotonic()
@@ -79,15 +95,43 @@ def _hexy_inactivity_monitor():
             # Never crash monitor
             pass
 
-_t = threading.Thread(target=_hexy_inactivity_monitor, name='hexy-inactivity-monitor', daemon=True)
-_t.start()
+def _idle_shutdown_enabled() -> bool:
+    """The idle monitor is for the desktop app only: served deployments
+    (HEXY_SERVER_MODE, set by backend.wsgi) and Lambda live as long as their
+    server does, and HEXY_IDLE_TIMEOUT=0 disables it explicitly."""
+    if os.getenv('HEXY_SERVER_MODE', '').lower() in ('1', 'true', 'yes'):
+        return False
+    if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+        return False
+    return _HEXY_TIMEOUT_SECONDS > 0
 
-def get_main_map_generator():
-    """Get main map generator with current language configuration."""
-    return MainMapGenerator({'language': current_language, 'output_directory': str(config.paths.output_path)})
+_monitor_thread = None
+_monitor_lock = threading.Lock()
 
-# Initialize with default language
-main_map_generator = get_main_map_generator()
+def start_inactivity_monitor() -> None:
+    """Start the idle-shutdown thread once (called by create_app, not at import)."""
+    global _monitor_thread
+    if not _idle_shutdown_enabled():
+        return
+    with _monitor_lock:
+        if _monitor_thread is None:
+            _monitor_thread = threading.Thread(target=_hexy_inactivity_monitor, name='hexy-inactivity-monitor', daemon=True)
+            _monitor_thread.start()
+
+_generators_lock = threading.Lock()
+_generators_by_language = {}
+
+def get_main_map_generator(language: str | None = None) -> MainMapGenerator:
+    """Main map generator for a language (defaults to the request's), created once per language."""
+    language = language or translation_system.language
+    generator = _generators_by_language.get(language)
+    if generator is None:
+        with _generators_lock:
+            generator = _generators_by_language.get(language)
+            if generator is None:
+                generator = MainMapGenerator({'language': language, 'output_directory': str(config.paths.output_path)})
+                _generators_by_language[language] = generator
+    return generator
 
 # Add this normalization function near the top (after imports)
 def normalize_terrain_name(name: str) -> str:
@@ -132,7 +176,7 @@ def _get_selected_language(default: str | None = None) -> str:
     except Exception:
         lang = None
     if not lang:
-        lang = default or current_language
+        lang = default or request.cookies.get(LANGUAGE_COOKIE) or config.language
     try:
         supported = translation_system.get_supported_languages()  # type: ignore
     except Exception:
@@ -141,14 +185,129 @@ def _get_selected_language(default: str | None = None) -> str:
         lang = 'en'
     return lang
 
+@main_bp.before_app_request
+def _activate_request_language():
+    # Translations follow the request's language for the rest of this request only
+    g.hexy_language_token = translation_system.activate(_get_selected_language())
+
+@main_bp.teardown_app_request
+def _deactivate_request_language(exc=None):
+    token = g.pop('hexy_language_token', None)
+    if token is not None:
+        translation_system.deactivate(token)
+
+def _get_overlay_analyzer():
+    """City overlay analyzer for the language selected by the current request."""
+    return get_city_overlay_analyzer(_get_selected_language())
+
 def _get_output_dir_for_language(lang: str) -> Path:
-    base = config.paths.output_path
-    lang_dir = base / lang
-    return lang_dir if lang_dir.exists() else base
+    return output_dir_for_language(lang, config.paths.output_path)
+
+def _hex_store(output_dir: Path):
+    """The world store hex reads of output_dir go through, or None to read the local files.
+
+    Other language worlds are local only, and a read-only store (an archive)
+    never sees local edits, so the local copy is the current one.
+    """
+    store = get_world_store()
+    if output_dir != config.paths.output_path or store.read_only:
+        return None
+    return store
+
+def _hex_revision(output_dir: Path, hex_code: str):
+    store = _hex_store(output_dir)
+    revision = store.revision(hex_key(hex_code)) if store is not None else None
+    return revision or file_revision(hex_file_path(output_dir, hex_code))
+
+def _read_hex_markdown(output_dir: Path, hex_code: str) -> str | None:
+    """Markdown body of a hex; the main world is read through the world store and its memory cache."""
+    hex_file = hex_file_path(output_dir, hex_code)
+    store = _hex_store(output_dir)
+    text = store.read_hex(hex_code) if store is not None else None
+    if text is None:
+        # Not in the store (yet): the local file, if any
+        return load_markdown(hex_file).content if hex_file.exists() else None
+    if is_shared_store(store, output_dir):
+        try:
+            local = hex_file.read_text(encoding='utf-8')
+        except OSError:
+            local = None
+        if local != text:
+            # Edited on another instance: bring the local copy and caches up to date
+            hex_file.parent.mkdir(parents=True, exist_ok=True)
+            hex_file.write_text(text, encoding='utf-8')
+            _hex_changed(hex_code, output_dir)
+    return parse_markdown(text).content
+
+# ===== CONDITIONAL REQUEST VERSIONS =====
+# Each returns the parts identifying a response representation; they are
+# hashed into the ETag (see backend.utils.http_cache.conditional).
+
+def _hex_version(hex_code):
+    lang = _get_selected_language()
+    return ('hex', hex_code, _get_generation_version(config), lang,
+            _hex_revision(_get_output_dir_for_language(lang), hex_code), world_revision.current())
+
+def _overlay_version(overlay_name, hex_id=None):
+    if city_overlay_analyzer is None:
+        return None
+    analyzer = _get_overlay_analyzer()
+    overlay_file = Path(analyzer.get_overlay_path(overlay_name))
+    if not overlay_file.exists():
+        return None  # Generated on this request; validate from the next one on
+    return ('overlay', overlay_name, hex_id, _get_generation_version(config), analyzer.language,
+            file_revision(overlay_file), revision_registry.get(f'overlay:{analyzer.language}:{overlay_name}'))
+
+def _city_context_version(city_name):
+    return ('city-context', city_name, _get_generation_version(config), _get_selected_language())
+
+def _map_version():
+    # The world revision advances with every hex write and import, in any worker
+    return ('map', _get_generation_version(config), translation_system.language, world_revision.current())
+
+def _page_version():
+    # The page embeds tile metadata only; before cold boot it is generated on this request
+    if terrain_system.layout is None and not _hexes_exist(config.paths.output_path):
+        return None
+    return ('page', _map_version(), _HEXY_HEARTBEAT_TOKEN)
+
+def _chunk_version(cx, cy):
+    # Chunks are generated on first request; only generated chunks are cacheable
+    if terrain_system.layout is None or not terrain_system.layout.contains_chunk(cx, cy):
+        return None
+    index_file = _chunk_store().index_path(cx, cy)
+    if not index_file.exists():
+        return None
+    return ('chunk', cx, cy, _get_generation_version(config), translation_system.language,
+            file_revision(index_file), world_revision.current())
+
+def _tile_version(z, x, y):
+    codec = _tile_codec()
+    if not codec.contains_tile(z, x, y):
+        return None
+    if z > 0:
+        # Overview tiles are terrain only
+        return ('tile', z, x, y, _map_version())
+    if terrain_system.layout is None:
+        return ('tile', z, x, y, _map_version()) if _hexes_exist(config.paths.output_path) else None
+    store = _chunk_store()
+    x0, y0, x1, y1 = codec.hex_rect(z, x, y)
+    revisions = []
+    for cx, cy in terrain_system.layout.chunks_in_rect(x0, y0, x1, y1):
+        index_file = store.index_path(cx, cy)
+        if not index_file.exists():
+            return None
+        revisions.append(file_revision(index_file))
+    return ('tile', z, x, y, _get_generation_version(config), translation_system.language,
+            tuple(revisions), world_revision.current())
+
+def _translations_version(language):
+    return ('translations', language, translation_system.revision)
 
 # ===== MAIN ROUTES =====
 
 @main_bp.route('/')
+@conditional(_page_version)
 def main_map():
     """Main map page with integrated lore."""
     config = get_config()
@@ -159,30 +318,71 @@ def main_map():
     # Atomic cold-boot generation only (no user-triggered regeneration)
     _maybe_atomic_cold_boot_generation(config)
     
+    # Rendered page is reused until the world changes (generation or hex write)
+    return _map_cache.get_or_build(_map_cache_key('page'), _map_version(), _render_main_map)
+
+
+def _render_main_map() -> str:
+    # The grid itself is loaded by the client tile by tile (/api/map/tiles)
+    map_width, map_height = terrain_system.get_map_dimensions()
+    return render_template('main_map.html',
+                         ascii_map=None,
+                         map_tiles=_tile_codec().metadata(),
+                         map_width=map_width,
+                         map_height=map_height,
+                           current_language=translation_system.language,
+                           hexy_token=_HEXY_HEARTBEAT_TOKEN,
+                           gen_version=_get_generation_version(config))
+
+
+_map_cache = VersionedCache()
+
+def _map_cache_key(name: str) -> tuple:
+    # One entry per language, so requests alternating languages don't evict each other
+    return (name, translation_system.language)
+
+def get_map_payload() -> dict:
+    """Serialized-once map payload shared by the page and /api/map."""
+    return _map_cache.get_or_build(_map_cache_key('payload'), _map_version(), _build_map_payload)
+
+
+def _build_map_payload() -> dict:
     # Get map dimensions
     map_width, map_height = terrain_system.get_map_dimensions()
     
+    if terrain_system.layout is not None:
+        # Chunked maps are too large for one payload; clients load /api/map/chunks/<cx>/<cy>
+        return {
+            'ascii_map': {},
+            'map_width': map_width,
+            'map_height': map_height,
+            'major_cities': get_major_cities_data(),
+            'total_hexes': map_width * map_height,
+            'gen_version': _get_generation_version(config),
+            'chunked': True,
+            'layout': terrain_system.layout.to_dict(),
+        }
+    
     # Generate ASCII map data
     ascii_map_data = generate_ascii_map_data()
 
     # If map is empty, regenerate and reload
     if not ascii_map_data:
         print("[AUTO] Map data empty, regenerating full map...")
-        main_map_generator.generate_full_map()
+        get_main_map_generator().generate_full_map()
         ascii_map_data = generate_ascii_map_data()
     
     # Ensure all keys are strings
     ascii_map_data = {str(k): v for k, v in ascii_map_data.items()}
     
-    return render_template('main_map.html',
-                         ascii_map=ascii_map_data,
-                         map_width=map_width,
-                         map_height=map_height,
-                         major_cities=get_major_cities_data(),
-                         total_hexes=map_width * map_height,
-                           current_language=current_language,
-                           hexy_token=_HEXY_HEARTBEAT_TOKEN,
-                           gen_version=_get_generation_version(config))
+    return {
+        'ascii_map': ascii_map_data,
+        'map_width': map_width,
+        'map_height': map_height,
+        'major_cities': get_major_cities_data(),
+        'total_hexes': map_width * map_height,
+        'gen_version': _get_generation_version(config),
+    }
 
 
 def _hexes_exist(output_dir: Path) -> bool:
@@ -198,80 +398,168 @@ def _hexes_exist(output_dir: Path) -> bool:
         return False
 
 
+_cold_boot_lock = threading.Lock()
+
 def _maybe_atomic_cold_boot_generation(cfg):
     """Perform atomic generation only when no map exists.
-    Generates into a staging directory and swaps into place under a simple lock.
+
+    A world published to the shared store by another instance is restored
+    instead; otherwise main_map_generator.generate_world builds one in staging
+    and swaps it into place (a thread lock within the process, a lock file
+    across processes).
     """
     output_dir: Path = cfg.paths.output_path
-    lock_file = output_dir.parent / f".{output_dir.name}.generating"
-
-    # Already have data
-    if _hexes_exist(output_dir):
+    if terrain_system.layout is not None:
+        # Chunked maps are generated chunk by chunk on first request, never all at once
+        if _chunk_store().load_manifest() is not None:
+            return
+    elif _hexes_exist(output_dir):
         return
+    with _cold_boot_lock:
+        _cold_boot_generation_locked(cfg, output_dir)
 
-    # Someone else generating? wait briefly
-    if lock_file.exists():
-        for _ in range(120):  # ~60s
-            if _hexes_exist(output_dir):
-                return
-            if not lock_file.exists():
-                break
-            time.sleep(0.5)
+def _cold_boot_generation_locked(cfg, output_dir: Path):
+    # Another instance may already have generated and published a world
+    if _restore_world_from_store(output_dir):
         return
+    try:
+        generation_version = generate_world(output_dir, translation_system.language,
+                                            cfg.supported_languages if city_overlay_analyzer is not None else ())
+    except Exception as e:
+        print(f"[BOOT] World generation failed: {e}")
+        return
+    if generation_version is None:
+        return  # Generated meanwhile (by another worker, or before we took the lock)
+    _world_replaced()
+    if terrain_system.layout is not None:
+        _publish_world_to_store(output_dir, CHUNKS_DIR + '/' + MANIFEST_NAME)
+    else:
+        _publish_world_to_store(output_dir)
 
-    # Acquire lock
+def _reload_world() -> None:
+    """Drop every in-process view of the world after it was replaced on disk."""
+    search_indexes.invalidate()
+    if hex_service.is_initialized:
+        hex_service.reload()
+    else:
+        # Not loaded yet; the service reads the current world on first use
+        hex_manager.clear_cache()
+    if city_overlay_analyzer is not None:
+        invalidate_city_overlay_caches()
+
+# ===== WORLD REVISION =====
+# Every worker keeps its own view of the world; the revision on disk tells it
+# when another process generated, imported or edited the world (see
+# backend.world_revision).
+
+world_revision = WorldRevision(config.paths.output_path)
+_world_sync_lock = threading.Lock()
+_loaded_world_revision = world_revision.current()
+
+@main_bp.before_app_request
+def _sync_world():
+    """Reload this worker's view of the world when another process changed it on disk."""
+    global _loaded_world_revision
+    revision = world_revision.current()
+    if revision == _loaded_world_revision:
+        return
+    with _world_sync_lock:
+        if revision != _loaded_world_revision:
+            _reload_world()
+            _loaded_world_revision = revision
+
+def _world_replaced() -> None:
+    """Give the world this process just swapped into place a new revision and reload."""
+    global _loaded_world_revision
+    with _world_sync_lock:
+        revision = world_revision.reset()
+        _reload_world()
+        _loaded_world_revision = revision
+
+def _hex_changed(hex_code: str, output_dir: Path, publish: bool = False) -> None:
+    """Re-read a rewritten hex file into the caches, search and chunk indexes; publish=True shares the chunk index."""
+    hex_dict = hex_service.refresh_hex(hex_code, output_dir)
+    if terrain_system.layout is not None and output_dir == config.paths.output_path:
+        # Chunked stats and search read the chunk indexes
+        with _chunk_generation_lock:
+            chunk_store = _chunk_store()
+            updated = chunk_store.update_entry(hex_code, _chunk_index_entry(hex_dict) if hex_dict else None)
+            if updated and publish:
+                index_file = chunk_store.index_path(*terrain_system.layout.chunk_of_code(hex_code))
+                get_world_store().put_bytes(index_file.relative_to(output_dir).as_posix(), index_file.read_bytes())
+    _record_world_edit()
+
+def _record_world_edit() -> None:
+    """Advance the revision after a hex write this process has already applied to its caches."""
+    global _loaded_world_revision
+    before, after = world_revision.bump()
+    with _world_sync_lock:
+        # If another process changed the world since our last sync, the next request reloads
+        if before == _loaded_world_revision:
+            _loaded_world_revision = after
+
+def _restore_world_from_store(output_dir: Path) -> bool:
+    """Copy the world from a shared world store (HEXY_WORLD_STORE) instead of generating one."""
+    store = get_world_store()
+    if not is_shared_store(store, output_dir):
+        return False
     try:
-        lock_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(lock_file, 'w', encoding='utf-8') as f:
-            f.write(str(int(time.time())))
-    except Exception:
-        pass
+        if not store.has_world():
+            return False
+        count = store.materialize(output_dir)
+        print(f"[BOOT] Restored world from store ({count} files)")
+    except Exception as e:
+        print(f"[BOOT] World store restore failed: {e}")
+        return False
+    _world_replaced()
+    return True
 
-    staging = output_dir.parent / f"{output_dir.name}.staging-{int(time.time())}"
+def _fetch_from_store(output_dir: Path, subdir: str) -> bool:
+    """Copy one part of the world (e.g. a chunk) from the shared world store; True if anything was copied."""
+    store = get_world_store()
+    if not is_shared_store(store, output_dir):
+        return False
     try:
-        generator = MainMapGenerator({'language': current_language, 'output_directory': str(staging)})
-        result = generator.generate_full_map({'skip_existing': False})
-        if not isinstance(result, dict):
-            raise RuntimeError('Unexpected generation result')
-
-        backup = None
-        if output_dir.exists():
-            backup = output_dir.parent / f"{output_dir.name}.bak-{int(time.time())}"
-            try:
-                shutil.move(str(output_dir), str(backup))
-            except Exception:
-                shutil.rmtree(output_dir, ignore_errors=True)
-        shutil.move(str(staging), str(output_dir))
-        if backup and backup.exists():
-            shutil.rmtree(backup, ignore_errors=True)
-        # Write generation version manifest
-        _write_generation_version(cfg, output_dir)
-    except Exception:
-        shutil.rmtree(staging, ignore_errors=True)
-    finally:
-        try:
-            if lock_file.exists():
-                lock_file.unlink()
-        except Exception:
-            pass
+        count = store.fetch(output_dir, subdir)
+    except Exception as e:
+        print(f"Warning: Could not fetch {subdir} from store: {e}")
+        return False
+    if count:
+        print(f"[BOOT] Fetched {subdir} from store ({count} files)")
+    return count > 0
+
+def _publish_world_to_store(output_dir: Path, subdir: str = '') -> None:
+    """Push a generated or imported world (or one part of it) to the shared world store, if configured."""
+    store = get_world_store()
+    if store.read_only or not is_shared_store(store, output_dir):
+        return
+    try:
+        count = store.publish(output_dir, subdir)
+        print(f"[BOOT] Published {subdir or 'world'} to store ({count} files)")
+    except Exception as e:
+        print(f"Warning: Could not publish world to store: {e}")
 
-def _write_generation_version(cfg, output_dir: Path) -> None:
+def _write_generation_version(cfg, output_dir: Path, version: str | None = None) -> None:
     try:
-        ver = {
-            'version': str(int(time.time())),
-            'generatedAt': __import__('datetime').datetime.utcnow().isoformat() + 'Z',
-            'language': getattr(cfg, 'language', current_language)
-        }
-        (output_dir / 'version.json').write_text(__import__('json').dumps(ver), encoding='utf-8')
+        write_generation_version(output_dir, version, getattr(cfg, 'language', translation_system.language))
     except Exception:
         pass
 
+_GEN_VERSION_CACHE: dict = {}
+
 def _get_generation_version(cfg) -> str:
     try:
         ver_file = cfg.paths.output_path / 'version.json'
         if ver_file.exists():
+            # Re-read the manifest only when it changed on disk (hot path for ETags)
+            revision = file_revision(ver_file)
+            cached = _GEN_VERSION_CACHE.get(str(ver_file))
+            if cached and cached[0] == revision:
+                return cached[1]
             data = __import__('json').loads(ver_file.read_text(encoding='utf-8'))
-            return str(data.get('version') or '')
+            version = str(data.get('version') or '')
+            _GEN_VERSION_CACHE[str(ver_file)] = (revision, version)
+            return version
         # If missing, create one
         _write_generation_version(cfg, cfg.paths.output_path)
         return str(int(time.time()))
@@ -344,11 +632,11 @@ def serve_service_worker():
         "    event.respondWith(fetch(new Request(req,{cache:'no-store'})));\n"
         "    return;\n"
         "  }\n"
-        "  // API: strict network-only\n"
+        "  // API: network-only; keep the request's cache mode so ETag revalidation works\n"
         "  if(url.pathname.includes('/api/')){\n"
         "    event.respondWith((async()=>{\n"
         "      try{\n"
-        "        return await fetch(new Request(req,{cache:'no-store'}));\n"
+        "        return await fetch(req);\n"
         "      }catch(e){\n"
         "        return Response.error();\n"
         "      }\n"
@@ -414,6 +702,298 @@ def health():
     """Simple health endpoint used by the frontend to detect backend availability."""
     return jsonify({'ok': True})
 
+@api_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Timing histograms in the Prometheus text format (HEXY_METRICS=1)."""
+    if not METRICS_ENABLED:
+        return jsonify({'success': False, 'error': 'Metrics are disabled; set HEXY_METRICS=1'}), 404
+    response = Response(metrics_registry.render_prometheus(), mimetype='text/plain; version=0.0.4')
+    # Every scrape must see current counters, never a CDN or browser copy
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+def _admin_denied():
+    """Error response unless the request carries HEXY_ADMIN_TOKEN; None when allowed."""
+    expected = os.getenv('HEXY_ADMIN_TOKEN')
+    if not expected:
+        return jsonify({'success': False, 'error': 'Admin endpoints are disabled; set HEXY_ADMIN_TOKEN'}), 404
+    supplied = request.headers.get('X-Admin-Token', '')
+    auth = request.headers.get('Authorization', '')
+    if not supplied and auth.startswith('Bearer '):
+        supplied = auth[len('Bearer '):]
+    if not secrets.compare_digest(supplied.encode('utf-8'), expected.encode('utf-8')):
+        return jsonify({'success': False, 'error': 'Invalid admin token'}), 403
+    return None
+
+@api_bp.route('/admin/profiles', methods=['GET'])
+def list_profiles():
+    """Profiler settings and recent runs per endpoint (?endpoint=GET /api/map)."""
+    denied = _admin_denied()
+    if denied:
+        return denied
+    response = jsonify({
+        'success': True,
+        'settings': profiler.settings(),
+        'endpoints': profiler.runs(request.args.get('endpoint')),
+    })
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@api_bp.route('/admin/profiles', methods=['POST'])
+def configure_profiles():
+    """Change profiler settings at runtime: {enabled, routes, top_n, keep}."""
+    denied = _admin_denied()
+    if denied:
+        return denied
+    data = request.get_json(silent=True) or {}
+    routes = data.get('routes')
+    if isinstance(routes, str):
+        routes = [p.strip() for p in routes.split(',')]
+    try:
+        settings = profiler.configure(data.get('enabled'), routes, data.get('top_n'), data.get('keep'))
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': f'Invalid profiler settings: {e}'}), 400
+    return jsonify({'success': True, 'settings': settings})
+
+@api_bp.route('/admin/profiles', methods=['DELETE'])
+def clear_profiles():
+    denied = _admin_denied()
+    if denied:
+        return denied
+    profiler.clear()
+    return jsonify({'success': True})
+
+@api_bp.route('/admin/profiles/dump', methods=['POST'])
+def dump_profiles():
+    """Write recorded runs as .pstats files: {endpoint?, id?}."""
+    denied = _admin_denied()
+    if denied:
+        return denied
+    data = request.get_json(silent=True) or {}
+    try:
+        run_id = int(data['id']) if data.get('id') is not None else None
+        paths = profiler.dump(data.get('endpoint'), run_id)
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': f'Invalid dump request: {e}'}), 400
+    except OSError as e:
+        return jsonify({'success': False, 'error': f'Failed to write profiles: {e}'}), 500
+    return jsonify({'success': True, 'files': paths})
+
+@api_bp.route('/map', methods=['GET'])
+@conditional(lambda: _map_version() if _hexes_exist(config.paths.output_path) else None)
+def get_map():
+    """Full map payload as JSON (same data the main page embeds)."""
+    _maybe_atomic_cold_boot_generation(config)
+    body = _map_cache.get_or_build(_map_cache_key('payload-json'), _map_version(),
+                                   lambda: json.dumps({'success': True, **get_map_payload()}, ensure_ascii=False))
+    return Response(body, mimetype='application/json')
+
+# ===== CHUNKED MAPS =====
+# Maps larger than 99x99 (or HEXY_CHUNKED=1) are split into chunks that are
+# generated, stored and served independently (see backend.world_chunks).
+
+_chunk_generation_lock = threading.Lock()
+
+# Hex types of chunk indexes -> content types of the map symbols and CSS classes
+_CHUNK_CONTENT_TYPES = {
+    'settlement': 'settlement',
+    'dungeon': 'ruins',
+    'beast': 'beast',
+    'npc': 'npc',
+    'sea_encounter': 'sea_encounter',
+}
+
+def _chunk_store() -> ChunkStore:
+    return ChunkStore(config.paths.output_path, terrain_system.layout)
+
+def _load_or_generate_chunk(cx: int, cy: int) -> dict:
+    """Index of a chunk, generating the chunk first if it does not exist yet."""
+    store = _chunk_store()
+    index = store.load_index(cx, cy)
+    if index is not None:
+        return index
+    with _chunk_generation_lock:
+        index = store.load_index(cx, cy)
+        if index is None:
+            output_dir = config.paths.output_path
+            chunk_key = store.chunk_dir(cx, cy).relative_to(output_dir).as_posix()
+            # Another instance may already have generated (and published) this chunk
+            if _fetch_from_store(output_dir, chunk_key):
+                index = store.load_index(cx, cy)
+        if index is None:
+            if store.load_manifest() is None:
+                store.write_manifest()
+                _publish_world_to_store(output_dir, CHUNKS_DIR + '/' + MANIFEST_NAME)
+            get_main_map_generator().generate_chunk(cx, cy)
+            index = store.load_index(cx, cy) or {'hexes': {}}
+            # Chunks are generated on demand, so each one is shared as soon as it exists
+            _publish_world_to_store(output_dir, chunk_key)
+    return index
+
+def _chunk_indexes_version():
+    """Revision of every generated chunk index (chunks appear as the map is explored)."""
+    store = _chunk_store()
+    return tuple((cx, cy, file_revision(store.index_path(cx, cy))) for cx, cy in store.generated_chunks())
+
+def _chunk_index_entry(hex_dict: dict) -> dict:
+    """Chunk index entry of an edited hex (see MainMapGenerator._index_entry)."""
+    return {
+        'terrain': hex_dict.get('terrain', 'unknown'),
+        'type': hex_dict.get('hex_type', 'wilderness'),
+        'loot': bool(hex_dict.get('loot')),
+        'scroll': bool(hex_dict.get('scroll')),
+        'name': hex_dict.get('name'),
+    }
+
+def _build_chunk_search_index() -> HexSearchIndex:
+    # Chunk indexes hold names, types and terrain; hex content is not indexed
+    index = HexSearchIndex()
+    for hex_code, entry in _chunk_store().iter_entries():
+        index.index_hex(hex_code, {
+            'hex_type': entry.get('type') or 'wilderness',
+            'terrain': entry.get('terrain') or 'unknown',
+            'name': entry.get('name') or '',
+        })
+    return index
+
+def _build_chunk_payload(cx: int, cy: int, index: dict) -> dict:
+    layout = terrain_system.layout
+    x0, y0, width, height = layout.bounds(cx, cy)
+    hexes = {}
+    for hex_code, entry in index.get('hexes', {}).items():
+        x, y = layout.parse(hex_code)
+        terrain = normalize_terrain_name(entry.get('terrain') or 'unknown')
+        hardcoded = lore_db.get_hardcoded_hex(hex_code)
+        if hardcoded and hardcoded.get('type') == 'major_city':
+            city_data = lore_db.major_cities.get(hardcoded.get('city_key'), {})
+            hexes[hex_code] = {
+                'x': x, 'y': y,
+                'terrain': terrain,
+                'symbol': '◆',
+                'is_city': True,
+                'city_name': city_data.get('name'),
+                'has_content': True,
+                'css_class': 'major-city'
+            }
+            continue
+        content_type = _CHUNK_CONTENT_TYPES.get(entry.get('type'), 'basic')
+        css_class = determine_css_class(content_type, terrain)
+        if entry.get('loot'):
+            css_class += ' has-content'
+        hexes[hex_code] = {
+            'x': x, 'y': y,
+            'terrain': terrain,
+            'symbol': determine_content_symbol(content_type, terrain),
+            'has_content': bool(entry.get('loot')),
+            'content_type': content_type,
+            'css_class': css_class
+        }
+    return {
+        'success': True,
+        'chunk': [cx, cy],
+        'bounds': {'x': x0, 'y': y0, 'width': width, 'height': height},
+        'hexes': hexes,
+    }
+
+@api_bp.route('/map/chunks', methods=['GET'])
+def get_map_chunks():
+    """Chunk layout of a chunked map and which chunks have been generated."""
+    layout = terrain_system.layout
+    if layout is None:
+        return jsonify({'success': True, 'chunked': False,
+                        'map_width': terrain_system.map_width, 'map_height': terrain_system.map_height})
+    return jsonify({
+        'success': True,
+        'chunked': True,
+        **layout.to_dict(),
+        'generated': _chunk_store().generated_chunks(),
+    })
+
+@api_bp.route('/map/chunks/<int:cx>/<int:cy>', methods=['GET'])
+@conditional(_chunk_version)
+def get_map_chunk(cx, cy):
+    """Hexes of one chunk, generated on first request."""
+    layout = terrain_system.layout
+    if layout is None:
+        return jsonify({'success': False, 'error': 'Map is not chunked; use /api/map'}), 404
+    if not layout.contains_chunk(cx, cy):
+        return jsonify({'success': False, 'error': f'Chunk {cx},{cy} is outside the map'}), 404
+    try:
+        index = _load_or_generate_chunk(cx, cy)
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Failed to generate chunk: {e}'}), 500
+    return jsonify(_build_chunk_payload(cx, cy, index))
+
+# ===== MAP TILES =====
+# The main page loads the map tile by tile, only for the visible part of the
+# map (see backend.map_tiles for the encoding).
+
+_tile_codecs = {}
+
+def _tile_codec() -> TileCodec:
+    map_width, map_height = terrain_system.get_map_dimensions()
+    key = (map_width, map_height, terrain_system.digits)
+    codec = _tile_codecs.get(key)
+    if codec is None:
+        codec = _tile_codecs[key] = TileCodec(map_width, map_height, terrain_system.terrain_types,
+                                              digits=terrain_system.digits)
+    return codec
+
+def _major_city_positions() -> dict:
+    positions = {}
+    if terrain_system.digits != 2:
+        # City coordinates are XXYY positions on the classic map
+        return positions
+    for city in lore_db.major_cities.values():
+        x, y = city.get('coordinates', (0, 0))
+        positions[(x, y)] = city.get('name', '')
+    return positions
+
+def _build_tile(z: int, x: int, y: int) -> dict:
+    codec = _tile_codec()
+    x0, y0, x1, y1 = codec.hex_rect(z, x, y)
+    if terrain_system.layout is None:
+        hexes = get_map_payload()['ascii_map']
+        if z == 0:
+            return codec.encode_hexes(x, y, hexes)
+        # Flat maps take their terrain from the generated hexes (the map image), not from noise
+        terrains = [(hexes.get(codec.hex_code(hx, hy)) or {}).get('terrain', 'unknown')
+                    for hy in range(y0, y1 + 1) for hx in range(x0, x1 + 1)]
+        grid = TerrainGrid.from_terrains(x1 - x0 + 1, y1 - y0 + 1, terrain_system.terrain_types,
+                                         terrains, x0, y0, codec.digits)
+        cities = {(entry['x'], entry['y']): entry.get('city_name', '')
+                  for entry in hexes.values() if entry.get('is_city')}
+        return codec.encode_overview(z, x, y, grid, terrain_system.get_terrain_symbol, cities)
+    if z > 0:
+        grid = terrain_system.get_window_grid(x0, y0, x1 - x0 + 1, y1 - y0 + 1, lore_db)
+        return codec.encode_overview(z, x, y, grid, terrain_system.get_terrain_symbol, _major_city_positions())
+    hexes = {}
+    for cx, cy in terrain_system.layout.chunks_in_rect(x0, y0, x1, y1):
+        hexes.update(_build_chunk_payload(cx, cy, _load_or_generate_chunk(cx, cy))['hexes'])
+    return codec.encode_hexes(x, y, hexes)
+
+@api_bp.route('/map/tiles', methods=['GET'])
+def get_map_tiles():
+    """Tile grid of the map: tile size, tile counts per zoom, class table and flag bits."""
+    return jsonify({'success': True, **_tile_codec().metadata()})
+
+@api_bp.route('/map/tiles/<int:z>/<int:x>/<int:y>', methods=['GET'])
+@conditional(_tile_version)
+def get_map_tile(z, x, y):
+    """One map tile; zoom 0 is one hex per cell, zoom z merges 2**z x 2**z hexes per cell."""
+    if not _tile_codec().contains_tile(z, x, y):
+        return jsonify({'success': False, 'error': f'Tile {z}/{x}/{y} is outside the map'}), 404
+    try:
+        if terrain_system.layout is None:
+            _maybe_atomic_cold_boot_generation(config)
+            # Flat maps slice the cached map payload; tiles are reused until the map changes
+            tile = _map_cache.get_or_build(_map_cache_key(f'tile:{z}/{x}/{y}'), _map_version(), lambda: _build_tile(z, x, y))
+        else:
+            tile = _build_tile(z, x, y)
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'Failed to build tile: {e}'}), 500
+    return jsonify({'success': True, **tile})
+
 @api_bp.route('/debug-paths', methods=['GET'])
 def debug_paths():
     try:
@@ -458,56 +1038,68 @@ def export_output_zip():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _rebuild_after_import(output_dir: Path, job: ImportJob) -> None:
+    """Refresh every in-process view of the world after an import swapped it in."""
+    _world_replaced()
+    job.update('indexing', 0.9, 'Building search index')
+    search_indexes.get(_get_output_dir_for_language(translation_system.language), hex_service.iter_hex_dicts)
+    job.update('indexing', 0.95, 'Publishing world')
+    _publish_world_to_store(output_dir)
+
 @api_bp.route('/import', methods=['POST'])
 def import_output_zip():
+    """
+    Import a world ZIP (multipart field 'file', or a raw application/zip body).
+
+    The upload is spooled to disk and validated here; extraction, the
+    swap and the index rebuild run in a background job polled at
+    /api/import/<job_id>.
+    """
+    upload_dir = None
     try:
-        if 'file' not in request.files:
-            return jsonify({'error': 'Missing file'}), 400
-        file = request.files['file']
-        if not file.filename.lower().endswith('.zip'):
-            return jsonify({'error': 'File must be a .zip'}), 400
-
-        # Save uploaded content to memory and open as zip
-        data = file.read()
-        tmpdir = Path(tempfile.mkdtemp(prefix='hexy-import-'))
-        try:
-            with zipfile.ZipFile(io.BytesIO(data)) as zf:
-                for info in zf.infolist():
-                    # Prevent Zip Slip
-                    dest_path = (tmpdir / info.filename).resolve()
-                    if not str(dest_path).startswith(str(tmpdir.resolve())):
-                        continue
-                    if info.is_dir():
-                        dest_path.mkdir(parents=True, exist_ok=True)
-                    else:
-                        dest_path.parent.mkdir(parents=True, exist_ok=True)
-                        with zf.open(info, 'r') as src, open(dest_path, 'wb') as dst:
-                            shutil.copyfileobj(src, dst)
-
-            # Determine extracted root
-            extracted_root = tmpdir / 'dying_lands_output'
-            src_dir = extracted_root if extracted_root.exists() else tmpdir
-            # Ensure src has expected structure (at least 'hexes' or something)
-            if not any(p.is_dir() for p in src_dir.iterdir()):
-                return jsonify({'error': 'Archive appears empty'}), 400
-
-            final_dir = config.paths.output_path
-            final_dir.parent.mkdir(parents=True, exist_ok=True)
-            # Backup current directory if exists
-            backup = None
-            if final_dir.exists():
-                backup = final_dir.parent / f"{final_dir.name}.bak-{int(time.time())}"
-                shutil.move(str(final_dir), str(backup))
-            # Move imported content into place
-            shutil.move(str(src_dir), str(final_dir))
-            # Clean temp
-            shutil.rmtree(tmpdir, ignore_errors=True)
-            return jsonify({'ok': True, 'backup': str(backup) if backup else None})
-        except Exception:
-            shutil.rmtree(tmpdir, ignore_errors=True)
-            raise
+        if import_jobs.active() is not None:
+            return jsonify({'error': 'Another import is already running',
+                            'job': import_jobs.active().to_dict()}), 409
+        if request.mimetype in ('application/zip', 'application/octet-stream'):
+            stream = request.stream
+        else:
+            if 'file' not in request.files:
+                return jsonify({'error': 'Missing file'}), 400
+            file = request.files['file']
+            if not file.filename.lower().endswith('.zip'):
+                return jsonify({'error': 'File must be a .zip'}), 400
+            stream = file.stream
+
+        upload_dir = new_upload_dir()
+        archive = upload_dir / 'upload.zip'
+        spool_upload(stream, archive)
+        inspection = inspect_archive(archive)
+        job = import_jobs.start(archive, config.paths.output_path, inspection,
+                                _cold_boot_lock, _rebuild_after_import)
+        upload_dir = None  # owned by the job now
+        response = jsonify({'ok': True, 'job': job.to_dict()})
+        response.status_code = 202
+        response.headers['Location'] = f"{request.script_root}/api/import/{job.id}"
+        return response
+    except ImportValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    finally:
+        if upload_dir is not None:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+
+@api_bp.route('/import/<job_id>', methods=['GET'])
+def import_status(job_id):
+    """Progress of a background import job."""
+    job = import_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown import job'}), 404
+    response = jsonify({'ok': True, 'job': job.to_dict()})
+    response.headers['Cache-Control'] = 'no-store'
+    return response
 
 # ===== API ROUTES =====
 
@@ -523,6 +1115,7 @@ def reset_continent():
         return jsonify({'error': str(e)}), 500
 
 @api_bp.route('/hex/<hex_code>')
+@conditional(_hex_version)
 def get_hex_info(hex_code):
     if not validate_hex_code(hex_code):
         return jsonify({'error': 'Invalid hex code format'}), 400
@@ -531,20 +1124,17 @@ def get_hex_info(hex_code):
     lang = _get_selected_language()
     output_dir = _get_output_dir_for_language(lang)
 
+    # Read first: a hex edited on another instance refreshes the caches below
+    content = _read_hex_markdown(output_dir, hex_code)
     hex_data = hex_service.get_hex_dict(hex_code)
     if hex_data:
         # Add raw markdown if available
-        hex_file_path = output_dir / "hexes" / f"hex_{hex_code}.md"
-        if hex_file_path.exists():
-            from backend.utils import safe_file_read
-            hex_data['raw_markdown'] = safe_file_read(hex_file_path)
+        if content is not None:
+            hex_data['raw_markdown'] = content
         return jsonify(hex_data)
 
-    # If not in cache, check for a hex file and parse it for content
-    hex_file_path = output_dir / "hexes" / f"hex_{hex_code}.md"
-    if hex_file_path.exists():
-        from backend.utils import safe_file_read
-        content = safe_file_read(hex_file_path)
+    # If not in cache, parse the hex file content
+    if content is not None:
         hex_type = _determine_hex_type(content)
         
         # Base response with raw markdown
@@ -701,29 +1291,18 @@ def get_hex_info(hex_code):
 
 @api_bp.route('/set-language', methods=['POST'])
 def set_language():
-    """Set the current language for content generation."""
-    global current_language, main_map_generator
-    
-    data = request.get_json()
+    """Remember the client's language (cookie); nothing process-wide changes."""
+    data = request.get_json(silent=True) or {}
     new_language = data.get('language', 'en')
     
     if new_language in ['en', 'pt']:
-        current_language = new_language
-        # Update translation system
-        translation_system.set_language(new_language)
-        # Re-initialize main map generator with new language
-        main_map_generator = get_main_map_generator()
-        # Update city overlay analyzer with new language
-        from backend.city_overlay_analyzer import city_overlay_analyzer
-        from backend.database_manager import database_manager
-        city_overlay_analyzer.language = new_language
-        city_overlay_analyzer.content_tables = database_manager.load_tables(new_language)
-        
-        return jsonify({
+        response = jsonify({
             'success': True,
-            'language': current_language,
-            'message': f'Language set to {current_language}'
+            'language': new_language,
+            'message': f'Language set to {new_language}'
         })
+        response.set_cookie(LANGUAGE_COOKIE, new_language, max_age=365 * 24 * 3600, samesite='Lax')
+        return response
     else:
         return jsonify({
             'success': False,
@@ -731,6 +1310,7 @@ def set_language():
         }), 400
 
 @api_bp.route('/city/<hex_code>')
+@conditional(_hex_version)
 def get_city_details(hex_code):
     """Get detailed information for a major city."""
     city_data = hex_service.get_city_details(hex_code)
@@ -741,6 +1321,7 @@ def get_city_details(hex_code):
         return jsonify({'success': False, 'error': 'Not a major city'}), 404
 
 @api_bp.route('/settlement/<hex_code>')
+@conditional(_hex_version)
 def get_settlement_details(hex_code):
     """Get detailed information for a settlement."""
     # Try model-based service first
@@ -750,13 +1331,9 @@ def get_settlement_details(hex_code):
 
     # Fallback: read and parse the hex markdown directly if present
     try:
-        from backend.utils import safe_file_read
         lang = _get_selected_language()
-        output_dir = _get_output_dir_for_language(lang)
-        hex_file_path = output_dir \
-            / "hexes" / f"hex_{hex_code}.md"
-        if hex_file_path.exists():
-            content = safe_file_read(hex_file_path)
+        content = _read_hex_markdown(_get_output_dir_for_language(lang), hex_code)
+        if content is not None:
             if '⌂ **' in content:
                 parsed = extract_settlement_data(content)
                 return jsonify({
@@ -795,15 +1372,22 @@ def update_hex_content(hex_code):
         
         content = data['content']
         
-        # Write the content to the hex file
-        hex_file_path = config.paths.output_path / "hexes" / f"hex_{hex_code}.md"
-        hex_file_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write the content to the hex file of the world this language reads from
+        output_dir = _get_output_dir_for_language(_get_selected_language())
+        hex_file = hex_file_path(output_dir, hex_code)
+        hex_file.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(hex_file_path, 'w', encoding='utf-8') as f:
+        with open(hex_file, 'w', encoding='utf-8') as f:
             f.write(content)
         
-        # Clear the cache for this hex
-        hex_service.clear_hex_cache(hex_code)
+        # Write through to the shared world store so other instances see the edit
+        store = get_world_store()
+        shared = (output_dir == config.paths.output_path and not store.read_only
+                  and is_shared_store(store, config.paths.output_path))
+        if shared:
+            store.write_hex(hex_code, content)
+        
+        _hex_changed(hex_code, output_dir, publish=shared)
         
         return jsonify({
             'success': True,
@@ -813,6 +1397,63 @@ def update_hex_content(hex_code):
     except Exception as e:
         return jsonify({'error': f'Failed to update hex: {str(e)}'}), 500
 
+@api_bp.route('/search')
+def search_hexes():
+    """
+    Full-text search over hex content with optional type/terrain filters and paging.
+
+    Chunked maps search the generated chunks' indexes, which hold hex names
+    but not content ('full_text' is false in the response).
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        hex_type = request.args.get('type') or None
+        terrain = request.args.get('terrain') or None
+        try:
+            page = max(int(request.args.get('page', 1)), 1)
+            per_page = min(max(int(request.args.get('per_page', 20)), 1), 100)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'page and per_page must be integers'}), 400
+
+        full_text = terrain_system.layout is None
+        if full_text:
+            lang = _get_selected_language()
+            index = search_indexes.get(_get_output_dir_for_language(lang), hex_service.iter_hex_dicts)
+        else:
+            index = _map_cache.get_or_build('chunk-search', _chunk_indexes_version(), _build_chunk_search_index)
+        found = index.search(query, hex_type=hex_type, terrain=terrain,
+                             offset=(page - 1) * per_page, limit=per_page)
+        return jsonify({
+            'success': True,
+            'query': query,
+            'full_text': full_text,
+            'page': page,
+            'per_page': per_page,
+            'total': found['total'],
+            'results': found['results']
+        })
+    except Exception as e:
+        return handle_exception_response(e, "searching hexes")
+
+def _stats_version():
+    if terrain_system.layout is None:
+        return _map_version()
+    return ('stats', _map_version(), _chunk_indexes_version())
+
+@api_bp.route('/stats')
+@conditional(_stats_version)
+def get_stats():
+    """Aggregate hex counts by type, terrain and region (chunked maps: over the generated chunks)."""
+    try:
+        if terrain_system.layout is not None:
+            statistics = _map_cache.get_or_build(
+                'chunk-stats', _chunk_indexes_version(),
+                lambda: statistics_from_entries(_chunk_store().iter_entries(), lore_db))
+            return jsonify({'success': True, 'statistics': statistics})
+        return jsonify({'success': True, 'statistics': hex_service.get_hex_statistics()})
+    except Exception as e:
+        return handle_exception_response(e, "getting hex statistics")
+
 @api_bp.route('/lore-overview')
 def get_lore_overview():
     """Get overview of lore and world information."""
@@ -850,15 +1491,17 @@ def get_city_overlays():
     return jsonify({"success": True, "overlays": overlays})
 
 @api_bp.route('/city-overlay/<overlay_name>')
+@conditional(_overlay_version)
 def get_city_overlay(overlay_name):
     try:
         if city_overlay_analyzer is None:
             return jsonify({'success': False, 'error': f'City overlay analyzer unavailable: {_CITY_OVERLAY_IMPORT_ERROR}'}), 500
+        analyzer = _get_overlay_analyzer()
         
-        overlay_data = city_overlay_analyzer.load_overlay_data(overlay_name)
+        overlay_data = analyzer.load_overlay_data(overlay_name)
         if not overlay_data:
             
-            overlay_data = city_overlay_analyzer.generate_city_overlay(overlay_name)
+            overlay_data = analyzer.generate_city_overlay(overlay_name)
         if not overlay_data:
             return jsonify({'success': False, 'error': 'Failed to generate overlay data'}), 404
 
@@ -903,11 +1546,13 @@ def get_city_overlay(overlay_name):
         return handle_exception_response(e, "loading city overlay")
 
 @api_bp.route('/city-overlay/<overlay_name>/ascii')
+@conditional(_overlay_version)
 def get_city_overlay_ascii(overlay_name):
     try:
         if city_overlay_analyzer is None:
             return jsonify({'success': False, 'error': f'City overlay analyzer unavailable: {_CITY_OVERLAY_IMPORT_ERROR}'}), 500
-        ascii_view = city_overlay_analyzer.get_overlay_ascii_view(overlay_name)
+        analyzer = _get_overlay_analyzer()
+        ascii_view = analyzer.get_overlay_ascii_view(overlay_name)
         return jsonify({
             'success': True,
             'ascii': ascii_view
@@ -916,33 +1561,33 @@ def get_city_overlay_ascii(overlay_name):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @api_bp.route('/city-context/<city_name>')
+@conditional(_city_context_version, max_age=300)
 def get_city_context(city_name):
     """Get city context information for the left panel."""
     try:
         if city_overlay_analyzer is None:
             return jsonify({'success': False, 'error': f'City overlay analyzer unavailable: {_CITY_OVERLAY_IMPORT_ERROR}'}), 500
-        context = city_overlay_analyzer.get_city_context(city_name)
-        response = jsonify({
+        analyzer = _get_overlay_analyzer()
+        gen_version = _get_generation_version(config)
+        context = analyzer.load_city_context(city_name, gen_version)
+        return jsonify({
             'success': True,
             'context': context
         })
-        response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
-        return response
     except Exception as e:
-        import traceback
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @api_bp.route('/city-overlay/<overlay_name>/hex/<hex_id>')
+@conditional(_overlay_version)
 def get_city_overlay_hex(overlay_name, hex_id):
     try:
         if city_overlay_analyzer is None:
             return jsonify({'success': False, 'error': f'City overlay analyzer unavailable: {_CITY_OVERLAY_IMPORT_ERROR}'}), 500
-        overlay_data = city_overlay_analyzer.load_overlay_data(overlay_name)
+        analyzer = _get_overlay_analyzer()
+        overlay_data = analyzer.load_overlay_data(overlay_name)
         if not overlay_data:
-            overlay_data = city_overlay_analyzer.generate_city_overlay(overlay_name)
+            overlay_data = analyzer.generate_city_overlay(overlay_name)
         hex_data = overlay_data['hex_grid'].get(hex_id)
         if not hex_data:
             return jsonify({'success': False, 'error': 'Hex not found'})
@@ -998,7 +1643,6 @@ def get_city_overlay_hex(overlay_name, hex_id):
         response.headers['Expires'] = '0'
         return response
     except Exception as e:
-        import traceback
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1008,10 +1652,11 @@ def regenerate_hex(overlay_name, hex_id):
     try:
         if city_overlay_analyzer is None:
             return jsonify({'success': False, 'error': f'City overlay analyzer unavailable: {_CITY_OVERLAY_IMPORT_ERROR}'}), 500
+        analyzer = _get_overlay_analyzer()
         # Load or generate the city overlay
-        overlay_data = city_overlay_analyzer.load_overlay_data(overlay_name)
+        overlay_data = analyzer.load_overlay_data(overlay_name)
         if not overlay_data:
-            overlay_data = city_overlay_analyzer.generate_city_overlay(overlay_name)
+            overlay_data = analyzer.generate_city_overlay(overlay_name)
         
         # Parse hex_id to get row and column
         try:
@@ -1021,7 +1666,7 @@ def regenerate_hex(overlay_name, hex_id):
             return jsonify({'success': False, 'error': 'Invalid hex ID format'}), 400
         
         # Load city data for context
-        city_data = city_overlay_analyzer.load_city_database(overlay_name.lower())
+        city_data = analyzer.load_city_database(overlay_name.lower())
         
         # Generate new content for the hex
         # First, determine if this is a district hex or position-based hex
@@ -1034,14 +1679,14 @@ def regenerate_hex(overlay_name, hex_id):
         
         if district_name and district_name.lower() not in ['empty', 'unknown']:
             # Generate district-based content
-            new_hex_data = city_overlay_analyzer.generate_district_based_content(
+            new_hex_data = analyzer.generate_district_based_content(
                 district_name, row, col, overlay_name, city_data
             )
         else:
             # Generate position-based content
             radius = overlay_data.get('radius', 3)
-            distance = city_overlay_analyzer.hex_distance(row, col, radius, radius)
-            new_hex_data = city_overlay_analyzer.generate_position_based_content(
+            distance = analyzer.hex_distance(row, col, radius, radius)
+            new_hex_data = analyzer.generate_position_based_content(
                 row, col, distance, radius, overlay_name, city_data
             )
         
@@ -1049,7 +1694,8 @@ def regenerate_hex(overlay_name, hex_id):
         overlay_data['hex_grid'][hex_id] = new_hex_data
         
         # Save the updated overlay data
-        city_overlay_analyzer.save_overlay_data(overlay_name, overlay_data)
+        analyzer.save_overlay_data(overlay_name, overlay_data)
+        revision_registry.bump(f'overlay:{analyzer.language}:{overlay_name}')
         
         return jsonify({
             'success': True,
@@ -1058,7 +1704,6 @@ def regenerate_hex(overlay_name, hex_id):
         })
         
     except Exception as e:
-        import traceback
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -1068,9 +1713,11 @@ def regenerate_overlay(overlay_name):
     try:
         if city_overlay_analyzer is None:
             return jsonify({'success': False, 'error': f'City overlay analyzer unavailable: {_CITY_OVERLAY_IMPORT_ERROR}'}), 500
+        analyzer = _get_overlay_analyzer()
           
         # Regenerate the entire overlay
-        overlay_data = city_overlay_analyzer.regenerate_overlay(overlay_name)
+        overlay_data = analyzer.regenerate_overlay(overlay_name)
+        revision_registry.bump(f'overlay:{analyzer.language}:{overlay_name}')
         
         return jsonify({
             'success': True,
@@ -1091,12 +1738,11 @@ def regenerate_overlay(overlay_name):
 def _get_major_city_info(hex_code: str, hardcoded: dict) -> dict:
     city_key = hardcoded['city_key']
     city_data = lore_db.major_cities[city_key]
-    return create_major_city_response(city_data, hex_code, current_language)
+    return create_major_city_response(city_data, hex_code, translation_system.language)
 
 def _get_hex_file_info(hex_code: str, hex_file) -> dict:
     try:
-        from backend.utils import safe_file_read
-        content = safe_file_read(hex_file)
+        content = load_markdown(hex_file).content
         if '⌂ **' in content:
             settlement_data = extract_settlement_data(content)
             return jsonify({
@@ -1124,7 +1770,7 @@ def _get_hex_file_info(hex_code: str, hex_file) -> dict:
         hex_data = extract_hex_data(content)
         hex_type = _determine_hex_type(content)
         terrain = hex_data.get('terrain', 'unknown')
-        terrain_name = main_map_generator._get_translated_terrain_name(terrain)
+        terrain_name = get_main_map_generator()._get_translated_terrain_name(terrain)
         response_data = {
             'exists': True,
             'is_major_city': False,
@@ -1172,12 +1818,14 @@ def _get_hex_file_info(hex_code: str, hex_file) -> dict:
 def generate_ascii_map_data():
     # Use centralized grid generator for base grid
     base_grid = generate_hex_grid(lore_db)
+    terrain_grid = terrain_system.get_terrain_grid(lore_db)
     
     # Process each hex to add content-specific information
     for hex_code, hex_data in base_grid.items():
         if hex_data.get('is_city'):
             # Major city - add city-specific data
-            city_data = hex_data['city_data']
+            # The lore dict stays server-side; the map only needs the name and summary
+            city_data = hex_data.pop('city_data')
             hex_data.update({
                 'terrain': normalize_terrain_name(hex_data['terrain']),
                 'symbol': '◆',
@@ -1189,14 +1837,13 @@ def generate_ascii_map_data():
             })
         else:
             # Regular terrain - check for generated content
-            terrain = terrain_system.get_terrain_for_hex(hex_code, lore_db)
+            terrain = terrain_grid.get(hex_code) or terrain_system.get_terrain_for_hex(hex_code, lore_db)
             hex_file_exists = (config.paths.output_path / "hexes" / f"hex_{hex_code}.md").exists()
             has_loot = False
             content_type = None
             
             if hex_file_exists:
-                with open(config.paths.output_path / "hexes" / f"hex_{hex_code}.md", "r", encoding="utf-8") as f:
-                    content = f.read()
+                content = load_markdown(config.paths.output_path / "hexes" / f"hex_{hex_code}.md").content
                 hex_data_content = extract_hex_data(content)
                 terrain = normalize_terrain_name(hex_data_content.get('terrain', 'unknown'))
                 content_type = get_hex_content_type(hex_code)
@@ -1224,7 +1871,7 @@ def get_major_cities_data():
     cities = []
     # Load cities from database manager with current language
     from backend.database_manager import database_manager
-    cities_table = database_manager.get_table('cities', 'major_cities', current_language)
+    cities_table = database_manager.get_table('cities', 'major_cities', translation_system.language)
     
     for city in cities_table:
         if isinstance(city, dict):
@@ -1244,22 +1891,14 @@ def extract_hex_data(content):
     """Extract structured data from hex content."""
     if not content:
         return {}
-    data = {}
-    def extract_field(field):
-        # Matches both 'Field: value' and '**Field:** value' (Markdown bold)
-        pattern = rf'(?:\*\*)?{field}:(?:\*\*)?\s*([^\n]+)'
-        match = re.search(pattern, content, re.IGNORECASE)
-        return match.group(1).strip() if match else None
-    
-    # Extract terrain in both English and Portuguese
-    terrain = extract_field('Terrain')
-    if not terrain:
-        terrain = extract_field('Terreno')
-    data['terrain'] = terrain
-    data['features'] = extract_field('Notable Features?')
-    data['encounters'] = extract_field('Encounters?')
-    data['resources'] = extract_field('Resources?')
-    return data
+    doc = parse_markdown(content)
+    return {
+        # Terrain in both English and Portuguese
+        'terrain': doc.field('Terrain', 'Terreno'),
+        'features': doc.field('Notable Feature', 'Notable Features'),
+        'encounters': doc.field('Encounter', 'Encounters'),
+        'resources': doc.field('Resource', 'Resources'),
+    }
 
 def extract_settlement_data(content):
     """Extract settlement-specific data from content."""
@@ -1281,128 +1920,94 @@ def get_terrain_symbol(terrain):
 
 # Extraction stubs for missing types
 
-def extract_beast_data(content):
-    data = {}
-    beast_type_match = re.search(r'## Beast Details\n\*\*Type:\*\*\s*([^\n]+)', content)
-    if beast_type_match:
-        data['beast_type'] = beast_type_match.group(1).strip()
-    feature_match = re.search(r'## Beast Details\n.*\*\*Feature:\*\*\s*([^\n]+)', content)
-    if feature_match:
-        data['beast_feature'] = feature_match.group(1).strip()
-    behavior_match = re.search(r'## Beast Details\n.*\*\*Behavior:\*\*\s*([^\n]+)', content)
-    if behavior_match:
-        data['beast_behavior'] = behavior_match.group(1).strip()
-    threat_level_match = re.search(r'## Threat Level\n(.+?)(?:\n##|$)', content, re.DOTALL)
-    if threat_level_match:
-        data['threat_level'] = threat_level_match.group(1).strip()
-    territory_match = re.search(r'## Territory\n(.+?)(?:\n##|$)', content, re.DOTALL)
-    if territory_match:
-        data['territory'] = territory_match.group(1).strip()
-    # Use centralized content parser for common fields
-    parsed_sections = parse_content_sections(content)
-    data.update(parsed_sections)
-    
-    # Parse loot and magical effect
+def _section_field_values(doc, section_key, *names):
+    """Values of the given fields of a section, or None unless all are present."""
+    section = doc.section(section_key)
+    if section is None:
+        return None
+    values = [section.field(name) for name in names]
+    return values if all(values) else None
+
+def _add_loot_and_effect(data, content):
     loot_data = parse_loot_section(content)
     if loot_data:
         data['loot'] = loot_data
-    
     magical_effect = parse_magical_effect(content)
     if magical_effect:
         data['magical_effect'] = magical_effect
+
+def extract_beast_data(content):
+    data = {}
+    doc = parse_markdown(content)
+    details = doc.section('beast_details')
+    if details is not None:
+        for field, key in (('Type', 'beast_type'), ('Feature', 'beast_feature'), ('Behavior', 'beast_behavior')):
+            value = details.field(field)
+            if value:
+                data[key] = value
+    for key in ('threat_level', 'territory'):
+        text = doc.section_text(key)
+        if text:
+            data[key] = text
+    # Use centralized content parser for common fields
+    data.update(parse_content_sections(content))
+    _add_loot_and_effect(data, content)
     return data
 
 def extract_dungeon_data(content):
     data = {}
-    dungeon_type_match = re.search(r'## Dungeon Details\n\*\*Type:\*\*\s*([^\n]+)', content)
-    if dungeon_type_match:
-        data['dungeon_type'] = dungeon_type_match.group(1).strip()
-    danger_match = re.search(r'## Dungeon Details\n.*\*\*Danger:\*\*\s*([^\n]+)', content)
-    if danger_match:
-        data['danger'] = danger_match.group(1).strip()
-    treasure_match = re.search(r'## Dungeon Details\n.*\*\*Treasure:\*\*\s*([^\n]+)', content)
-    if treasure_match:
-        data['treasure'] = treasure_match.group(1).strip()
+    doc = parse_markdown(content)
+    details = doc.section('dungeon_details')
+    if details is not None:
+        for field, key in (('Type', 'dungeon_type'), ('Danger', 'danger'), ('Treasure', 'treasure')):
+            value = details.field(field)
+            if value:
+                data[key] = value
     
     # Mörk Borg trap information
-    trap_section_match = re.search(r'## Trap\n\*\*Description:\*\*\s*([^\n]+).*\*\*Effect:\*\*\s*([^\n]+).*\*\*Builder:\*\*\s*([^\n]+)', content, re.DOTALL)
-    if trap_section_match:
-        data['trap_section'] = {
-            'description': trap_section_match.group(1).strip(),
-            'effect': trap_section_match.group(2).strip(),
-            'builder': trap_section_match.group(3).strip()
-        }
+    trap = _section_field_values(doc, 'trap', 'Description', 'Effect', 'Builder')
+    if trap:
+        data['trap_section'] = dict(zip(('description', 'effect', 'builder'), trap))
     
     # Ancient Knowledge
-    ancient_knowledge_match = re.search(r'## Ancient Knowledge\n\*\*Type:\*\*\s*([^\n]+).*\*\*Content:\*\*\s*([^\n]+).*\*\*Effect:\*\*\s*([^\n]+).*\*\*Description:\*\*\s*([^\n]+)', content, re.DOTALL)
-    if ancient_knowledge_match:
-        data['ancient_knowledge'] = {
-            'type': ancient_knowledge_match.group(1).strip(),
-            'content': ancient_knowledge_match.group(2).strip(),
-            'effect': ancient_knowledge_match.group(3).strip(),
-            'description': ancient_knowledge_match.group(4).strip()
-        }
+    knowledge = _section_field_values(doc, 'ancient_knowledge', 'Type', 'Content', 'Effect', 'Description')
+    if knowledge:
+        data['ancient_knowledge'] = dict(zip(('type', 'content', 'effect', 'description'), knowledge))
     # Use centralized content parser for common fields
-    parsed_sections = parse_content_sections(content)
-    data.update(parsed_sections)
-    
-    # Parse loot and magical effect
-    loot_data = parse_loot_section(content)
-    if loot_data:
-        data['loot'] = loot_data
-    
-    magical_effect = parse_magical_effect(content)
-    if magical_effect:
-        data['magical_effect'] = magical_effect
+    data.update(parse_content_sections(content))
+    _add_loot_and_effect(data, content)
     return data
 
-def extract_npc_data(content):
-    data = {}
-    name_match = re.search(r'\*\*Name:\*\*\s*([^\n]+)', content)
-    if name_match:
-        data['name'] = name_match.group(1).strip()
-    type_match = re.search(r'\*\*Type:\*\*\s*([^\n]+)', content)
-    if type_match:
-        data['denizen_type'] = type_match.group(1).strip()
-    
+# '**Field:**' label -> key in the NPC payload
+_NPC_FIELDS = (
+    ('Name', 'name'),
+    ('Type', 'denizen_type'),
     # Mörk Borg NPC fields
-    trait_match = re.search(r'\*\*Trait:\*\*\s*([^\n]+)', content)
-    if trait_match:
-        data['trait'] = trait_match.group(1).strip()
-    concern_match = re.search(r'\*\*Concern:\*\*\s*([^\n]+)', content)
-    if concern_match:
-        data['concern'] = concern_match.group(1).strip()
-    want_match = re.search(r'\*\*Want:\*\*\s*([^\n]+)', content)
-    if want_match:
-        data['want'] = want_match.group(1).strip()
-    apocalypse_attitude_match = re.search(r'\*\*Apocalypse Attitude:\*\*\s*([^\n]+)', content)
-    if apocalypse_attitude_match:
-        data['apocalypse_attitude'] = apocalypse_attitude_match.group(1).strip()
-    secret_match = re.search(r'\*\*Secret:\*\*\s*([^\n]+)', content)
-    if secret_match:
-        data['secret'] = secret_match.group(1).strip()
-    
+    ('Trait', 'trait'),
+    ('Concern', 'concern'),
+    ('Want', 'want'),
+    ('Apocalypse Attitude', 'apocalypse_attitude'),
+    ('Secret', 'secret'),
     # Fallback to old fields if new ones not available
-    motivation_match = re.search(r'\*\*Motivation:\*\*\s*([^\n]+)', content)
-    if motivation_match:
-        data['motivation'] = motivation_match.group(1).strip()
-    feature_match = re.search(r'\*\*Feature:\*\*\s*([^\n]+)', content)
-    if feature_match:
-        data['feature'] = feature_match.group(1).strip()
-    demeanor_match = re.search(r'\*\*Demeanor:\*\*\s*([^\n]+)', content)
-    if demeanor_match:
-        data['demeanor'] = demeanor_match.group(1).strip()
-    
-    location_match = re.search(r'\*\*Location:\*\*\s*([^\n]+)', content)
-    if location_match:
-        data['location'] = location_match.group(1).strip()
-    key_npcs_match = re.search(r'\*\*Key NPCs:\*\*\s*([^\n]+)', content)
-    if key_npcs_match:
-        data['key_npcs'] = [npc.strip() for npc in key_npcs_match.group(1).split(',')]
+    ('Motivation', 'motivation'),
+    ('Feature', 'feature'),
+    ('Demeanor', 'demeanor'),
+    ('Location', 'location'),
+)
+
+def extract_npc_data(content):
+    data = {}
+    doc = parse_markdown(content)
+    for field, key in _NPC_FIELDS:
+        value = doc.field(field)
+        if value:
+            data[key] = value
+    key_npcs = doc.field('Key NPCs')
+    if key_npcs:
+        data['key_npcs'] = [npc.strip() for npc in key_npcs.split(',')]
     
     # Use centralized content parser for common fields
-    parsed_sections = parse_content_sections(content)
-    data.update(parsed_sections)
+    data.update(parse_content_sections(content))
     return data
 
 
@@ -1410,37 +2015,22 @@ def extract_npc_data(content):
 def extract_ruins_data(content):
     """Extract ruins-specific data from content."""
     data = {}
+    doc = parse_markdown(content)
     
     # Parse ruins-specific fields
-    ruins_type_match = re.search(r'\*\*Type:\*\*\s*([^\n]+)', content)
-    if ruins_type_match:
-        data['ruins_type'] = ruins_type_match.group(1).strip()
-    
-    age_match = re.search(r'\*\*Age:\*\*\s*([^\n]+)', content)
-    if age_match:
-        data['age'] = age_match.group(1).strip()
-    
-    builder_match = re.search(r'\*\*Builder:\*\*\s*([^\n]+)', content)
-    if builder_match:
-        data['builder'] = builder_match.group(1).strip()
+    for field, key in (('Type', 'ruins_type'), ('Age', 'age'), ('Builder', 'builder')):
+        value = doc.field(field)
+        if value:
+            data[key] = value
     
     # Use centralized content parser for common fields
-    parsed_sections = parse_content_sections(content)
-    data.update(parsed_sections)
-    
-    # Parse loot and magical effect
-    loot_data = parse_loot_section(content)
-    if loot_data:
-        data['loot'] = loot_data
-    
-    magical_effect = parse_magical_effect(content)
-    if magical_effect:
-        data['magical_effect'] = magical_effect
-    
+    data.update(parse_content_sections(content))
+    _add_loot_and_effect(data, content)
     return data
 
 # Translation API Routes
 @api_bp.route('/translations/ui/<language>', methods=['GET'])
+@conditional(_translations_version, max_age=300)
 def get_ui_translations(language):
     """Get UI translations for the specified language."""
     try:
@@ -6,14 +6,19 @@ S3-based database manager for AWS Lambda deployment.
 
 import os
 import json
+import random
 import sqlite3
-import tempfile
+import threading
+from array import array
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import boto3
 from botocore.exceptions import ClientError
 from backend.database_manager import DatabaseManager
 
+# Prepared statements kept per connection
+STATEMENT_CACHE_SIZE = 128
+
 class S3DatabaseManager(DatabaseManager):
     """S3-based database manager that caches SQLite databases locally."""
     
@@ -31,6 +36,11 @@ class S3DatabaseManager(DatabaseManager):
         self.local_cache_dir = Path('/tmp/hexy_databases')
         self.local_cache_dir.mkdir(parents=True, exist_ok=True)
         self._cache = {}
+        # Long-lived connections and lookup caches, shared by warm invocations
+        self._lock = threading.RLock()
+        self._connections: Dict[str, sqlite3.Connection] = {}
+        self._rowid_cache: Dict[Tuple[str, str], array] = {}
+        self._categories_cache: Dict[str, List[str]] = {}
         
     def _get_s3_key(self, db_name: str) -> str:
         """Get S3 key for database file."""
@@ -79,75 +89,115 @@ class S3DatabaseManager(DatabaseManager):
             
         return self._cache[db_name]
     
+    def _get_connection(self, db_name: str) -> sqlite3.Connection:
+        """
+        Long-lived connection per database (call with self._lock held).
+        
+        Connections stay open across warm invocations, so sqlite3's per-connection
+        statement cache keeps the queries below prepared.
+        """
+        conn = self._connections.get(db_name)
+        if conn is None:
+            local_path = self.get_database_path(db_name)
+            conn = sqlite3.connect(str(local_path), check_same_thread=False,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+            conn.row_factory = sqlite3.Row
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            except sqlite3.DatabaseError as e:
+                print(f"⚠️  WAL not available for {db_name}.db: {e}")
+            self._connections[db_name] = conn
+        return conn
+    
+    def _invalidate_lookups(self, db_name: str) -> None:
+        """Forget cached rowids and categories of a database after a write."""
+        self._categories_cache.pop(db_name, None)
+        for key in [key for key in self._rowid_cache if key[0] == db_name]:
+            del self._rowid_cache[key]
+    
     def execute_query(self, db_name: str, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
         """Execute query on database."""
-        local_path = self.get_database_path(db_name)
-        
-        conn = sqlite3.connect(str(local_path))
-        conn.row_factory = sqlite3.Row
-        
-        try:
-            cursor = conn.execute(query, params)
-            results = [dict(row) for row in cursor.fetchall()]
-            return results
-        finally:
-            conn.close()
+        with self._lock:
+            cursor = self._get_connection(db_name).execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
     
     def execute_insert(self, db_name: str, query: str, params: tuple = ()) -> int:
         """Execute insert query and return last row ID."""
-        local_path = self.get_database_path(db_name)
-        
-        conn = sqlite3.connect(str(local_path))
-        
-        try:
+        with self._lock:
+            conn = self._get_connection(db_name)
             cursor = conn.execute(query, params)
             conn.commit()
+            self._invalidate_lookups(db_name)
             return cursor.lastrowid
-        finally:
-            conn.close()
+    
+    def _checkpoint(self, db_name: str) -> None:
+        """Fold the WAL into the main file so the .db alone is complete."""
+        with self._lock:
+            conn = self._connections.get(db_name)
+            if conn is not None:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
     
     def sync_to_s3(self, db_name: str) -> None:
         """Sync local database changes to S3."""
         if db_name in self._cache:
             local_path = self._cache[db_name]
+            self._checkpoint(db_name)
             self._upload_database(db_name, local_path)
     
     def sync_all_to_s3(self) -> None:
         """Sync all cached databases to S3."""
-        for db_name in self._cache:
+        for db_name in list(self._cache):
             self.sync_to_s3(db_name)
     
-    def get_random_item(self, db_name: str, category: str) -> Optional[Dict[str, Any]]:
-        """Get random item from database category."""
-        local_path = self.get_database_path(db_name)
-        
-        conn = sqlite3.connect(str(local_path))
-        conn.row_factory = sqlite3.Row
-        
-        try:
-            cursor = conn.execute(
-                "SELECT * FROM items WHERE category = ? ORDER BY RANDOM() LIMIT 1",
-                (category,)
+    def _category_rowids(self, db_name: str, category: str) -> array:
+        """Rowids of a category, loaded once until the next write (call with self._lock held)."""
+        key = (db_name, category)
+        rowids = self._rowid_cache.get(key)
+        if rowids is None:
+            cursor = self._get_connection(db_name).execute(
+                "SELECT rowid FROM items WHERE category = ?", (category,)
             )
-            row = cursor.fetchone()
+            rowids = array('q', (row[0] for row in cursor))
+            self._rowid_cache[key] = rowids
+        return rowids
+    
+    def get_random_item(self, db_name: str, category: str) -> Optional[Dict[str, Any]]:
+        """Get random item from database category (one rowid lookup when warm)."""
+        with self._lock:
+            rowids = self._category_rowids(db_name, category)
+            if not rowids:
+                return None
+            row = self._get_connection(db_name).execute(
+                "SELECT * FROM items WHERE rowid = ?", (random.choice(rowids),)
+            ).fetchone()
             return dict(row) if row else None
-        finally:
-            conn.close()
     
     def get_all_categories(self, db_name: str) -> List[str]:
-        """Get all categories from database."""
-        local_path = self.get_database_path(db_name)
-        
-        conn = sqlite3.connect(str(local_path))
-        
-        try:
-            cursor = conn.execute("SELECT DISTINCT category FROM items")
-            return [row[0] for row in cursor.fetchall()]
-        finally:
-            conn.close()
+        """Get all categories from database (cached until the next write)."""
+        with self._lock:
+            categories = self._categories_cache.get(db_name)
+            if categories is None:
+                cursor = self._get_connection(db_name).execute("SELECT DISTINCT category FROM items")
+                categories = [row[0] for row in cursor.fetchall()]
+                self._categories_cache[db_name] = categories
+            return list(categories)
+    
+    def close(self) -> None:
+        """Close all open connections."""
+        with self._lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+            self._rowid_cache.clear()
+            self._categories_cache.clear()
     
     def clear_cache(self) -> None:
         """Clear local database cache."""
+        self.close()
         self._cache.clear()
         if self.local_cache_dir.exists():
             import shutil
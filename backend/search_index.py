@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Full-Text Search Index for The Dying Lands
+Inverted index over hex content with prefix matching and accent folding.
+"""
+
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Keys that identify a hex rather than describe it
+_UNINDEXED_KEYS = {'hex_code', 'terrain', 'exists', 'hex_type', 'content_type', 'raw_markdown'}
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+MIN_TOKEN_LENGTH = 2
+
+
+def fold_text(text: str) -> str:
+    """Lower-case text and strip accents ('Coração' -> 'coracao')."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into folded search tokens."""
+    return [t for t in _TOKEN_PATTERN.findall(fold_text(text)) if len(t) >= MIN_TOKEN_LENGTH]
+
+
+def _iter_strings(value: Any) -> Iterable[str]:
+    """Yield every string nested in a hex dict (loot, scrolls, NPC fields, ...)."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if key not in _UNINDEXED_KEYS:
+                yield from _iter_strings(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _iter_strings(item)
+
+
+class HexSearchIndex:
+    """Inverted index over the hexes of one world directory."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Set[str]] = {}
+        self._doc_tokens: Dict[str, Set[str]] = {}
+        self._doc_meta: Dict[str, Dict[str, Any]] = {}
+        self._sorted_tokens: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._doc_meta)
+
+    def index_hex(self, hex_code: str, hex_dict: Dict[str, Any]) -> None:
+        """Add or replace a hex in the index."""
+        tokens = set()
+        for text in _iter_strings(hex_dict):
+            tokens.update(tokenize(text))
+        with self._lock:
+            self._remove_locked(hex_code)
+            for token in tokens:
+                self._postings.setdefault(token, set()).add(hex_code)
+            self._doc_tokens[hex_code] = tokens
+            self._doc_meta[hex_code] = {
+                'hex_code': hex_code,
+                'hex_type': hex_dict.get('hex_type', 'wilderness'),
+                'terrain': hex_dict.get('terrain', 'unknown'),
+                'name': hex_dict.get('name') or hex_dict.get('encounter') or '',
+            }
+            self._sorted_tokens = None
+
+    def remove_hex(self, hex_code: str) -> None:
+        """Remove a hex from the index."""
+        with self._lock:
+            self._remove_locked(hex_code)
+
+    def _remove_locked(self, hex_code: str) -> None:
+        for token in self._doc_tokens.pop(hex_code, ()):
+            codes = self._postings.get(token)
+            if codes is not None:
+                codes.discard(hex_code)
+                if not codes:
+                    del self._postings[token]
+                    self._sorted_tokens = None
+        self._doc_meta.pop(hex_code, None)
+
+    def _matches_prefix(self, prefix: str) -> Set[str]:
+        """Hex codes containing any token that starts with prefix."""
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._postings)
+        tokens = self._sorted_tokens
+        matches: Set[str] = set()
+        i = bisect_left(tokens, prefix)
+        while i < len(tokens) and tokens[i].startswith(prefix):
+            matches |= self._postings[tokens[i]]
+            i += 1
+        return matches
+
+    def search(self, query: str, hex_type: Optional[str] = None, terrain: Optional[str] = None,
+               offset: int = 0, limit: int = 20) -> Dict[str, Any]:
+        """
+        Find hexes matching every query term (terms match as prefixes).
+
+        Results with more exact-term hits rank first, then by hex code.
+        An empty query lists all hexes passing the filters.
+        """
+        terms = tokenize(query or '')
+        with self._lock:
+            if terms:
+                candidates: Optional[Set[str]] = None
+                for term in terms:
+                    matched = self._matches_prefix(term)
+                    candidates = matched if candidates is None else candidates & matched
+                    if not candidates:
+                        break
+                candidates = candidates or set()
+            else:
+                candidates = set(self._doc_meta)
+
+            hits = []
+            for hex_code in candidates:
+                meta = self._doc_meta[hex_code]
+                if hex_type and meta['hex_type'] != hex_type:
+                    continue
+                if terrain and meta['terrain'] != terrain:
+                    continue
+                exact = sum(1 for term in terms if term in self._doc_tokens[hex_code])
+                hits.append((-exact, hex_code))
+            hits.sort()
+            page = [dict(self._doc_meta[code]) for _, code in hits[offset:offset + limit]]
+        return {'total': len(hits), 'results': page}
+
+
+class SearchIndexRegistry:
+    """One lazily built search index per world directory (i.e. per language)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, HexSearchIndex] = {}
+
+    def get(self, source_dir: Path,
+            loader: Callable[[Path], Iterable[Tuple[str, Dict[str, Any]]]]) -> HexSearchIndex:
+        """Return the index for source_dir, building it with loader on first use."""
+        key = str(source_dir)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = HexSearchIndex()
+                for hex_code, hex_dict in loader(source_dir):
+                    index.index_hex(hex_code, hex_dict)
+                self._indexes[key] = index
+            return index
+
+    def update_hex(self, source_dir: Path, hex_code: str, hex_dict: Optional[Dict[str, Any]]) -> None:
+        """Apply a hex edit to the index of source_dir, if it was built."""
+        index = self._indexes.get(str(source_dir))
+        if index is None:
+            return
+        if hex_dict:
+            index.index_hex(hex_code, hex_dict)
+        else:
+            index.remove_hex(hex_code)
+
+    def invalidate(self) -> None:
+        """Drop all indexes (after regeneration or import)."""
+        with self._lock:
+            self._indexes.clear()
+
+
+# Global registry instance
+search_indexes = SearchIndexRegistry()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Whole-grid terrain for The Dying Lands.
+
+TerrainGrid holds the terrain of every hex as one byte per hex (an index into
+the terrain name list), so distributions, region queries and neighbour
+lookups work on the whole grid at once instead of resolving hex by hex.
+
+Hex geometry follows the map layout: columns x = 1..width, rows y = 1..height,
+and even rows are shifted half a hex to the right (.hex-row:nth-child(even)).
+Distances are true hex distances via cube coordinates. A grid can also cover
+a window of a larger map (one chunk), starting at (x0, y0) in map coordinates.
+"""
+
+from importlib.util import find_spec
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from backend.utils.core_utils import format_hex_code
+
+# numpy is imported by the functions that use it, so importing this module stays cheap
+NUMPY_AVAILABLE = find_spec('numpy') is not None
+
+# (dx, dy) of the six neighbours, for rows that are not shifted (odd y) and shifted (even y)
+_NEIGHBOUR_OFFSETS = (
+    ((1, 0), (0, -1), (-1, -1), (-1, 0), (-1, 1), (0, 1)),
+    ((1, 0), (1, -1), (0, -1), (-1, 0), (0, 1), (1, 1)),
+)
+
+
+# Grid code of a hex; the same XXYY scheme as everywhere else
+hex_code = format_hex_code
+
+
+def parse_hex_code(code: str) -> Tuple[int, int]:
+    half = len(code) // 2
+    if not half:
+        raise ValueError(f"Invalid hex code: {code!r}")
+    return int(code[:half]), int(code[half:])
+
+
+def neighbour_coords(x: int, y: int) -> List[Tuple[int, int]]:
+    """(x, y) of the six hexes adjacent to (x, y), whether or not they are on the map."""
+    offsets = _NEIGHBOUR_OFFSETS[1 if y % 2 == 0 else 0]
+    return [(x + dx, y + dy) for dx, dy in offsets]
+
+
+def _cube(x: int, y: int) -> Tuple[int, int]:
+    """Axial (q, r) of a hex; the third cube coordinate is -q - r."""
+    row = y - 1
+    return (x - 1) - (row - (row & 1)) // 2, row
+
+
+def hex_distance(a: Tuple[int, int], b: Tuple[int, int]) -> int:
+    """Number of steps between two hexes given as (x, y)."""
+    aq, ar = _cube(*a)
+    bq, br = _cube(*b)
+    dq, dr = aq - bq, ar - br
+    return (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+
+
+class TerrainGrid:
+    """Terrain codes for a width x height hex grid starting at (x0, y0), stored row-major."""
+
+    def __init__(self, width: int, height: int, names: Sequence[str], codes: bytearray,
+                 x0: int = 1, y0: int = 1, digits: int = 2):
+        if len(codes) != width * height:
+            raise ValueError(f"Expected {width * height} terrain codes, got {len(codes)}")
+        self.width = width
+        self.height = height
+        self.x0 = x0
+        self.y0 = y0
+        self.digits = digits
+        self.names: List[str] = list(names)
+        self.codes = codes
+        self._axial = None
+
+    @classmethod
+    def build(cls, width: int, height: int, names: Sequence[str],
+              resolve: Callable[[str], str], x0: int = 1, y0: int = 1, digits: int = 2) -> 'TerrainGrid':
+        """Resolve every hex once; terrains missing from names are appended."""
+        names = list(names)
+        index = {name: i for i, name in enumerate(names)}
+        codes = bytearray(width * height)
+        for row in range(height):
+            base = row * width
+            for col in range(width):
+                terrain = resolve(hex_code(x0 + col, y0 + row, digits))
+                code = index.get(terrain)
+                if code is None:
+                    code = index[terrain] = len(names)
+                    names.append(terrain)
+                codes[base + col] = code
+        return cls(width, height, names, codes, x0, y0, digits)
+
+    @classmethod
+    def from_terrains(cls, width: int, height: int, names: Sequence[str], terrains: Sequence[str],
+                      x0: int = 1, y0: int = 1, digits: int = 2) -> 'TerrainGrid':
+        """Grid from terrain names listed row-major."""
+        names = list(names)
+        index = {name: i for i, name in enumerate(names)}
+        codes = bytearray(len(terrains))
+        for i, terrain in enumerate(terrains):
+            code = index.get(terrain)
+            if code is None:
+                code = index[terrain] = len(names)
+                names.append(terrain)
+            codes[i] = code
+        return cls(width, height, names, codes, x0, y0, digits)
+
+    # ----- lookups -----
+
+    def contains(self, x: int, y: int) -> bool:
+        return self.x0 <= x < self.x0 + self.width and self.y0 <= y < self.y0 + self.height
+
+    def terrain_at(self, x: int, y: int) -> str:
+        return self.names[self.codes[(y - self.y0) * self.width + (x - self.x0)]]
+
+    def get(self, code: str, default: Optional[str] = None) -> Optional[str]:
+        try:
+            x, y = parse_hex_code(code)
+        except (ValueError, IndexError):
+            return default
+        return self.terrain_at(x, y) if self.contains(x, y) else default
+
+    def __getitem__(self, code: str) -> str:
+        terrain = self.get(code)
+        if terrain is None:
+            raise KeyError(code)
+        return terrain
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """(hex_code, terrain) column by column, the order generators walk the map."""
+        names, codes, width, digits = self.names, self.codes, self.width, self.digits
+        for col in range(width):
+            for row in range(self.height):
+                yield hex_code(self.x0 + col, self.y0 + row, digits), names[codes[row * width + col]]
+
+    def to_dict(self) -> Dict[str, str]:
+        return dict(self.items())
+
+    def as_array(self):
+        """(height, width) uint8 array of terrain codes (a view, not a copy)."""
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError('numpy is required for as_array()')
+        import numpy as np
+        return np.frombuffer(self.codes, dtype=np.uint8).reshape(self.height, self.width)
+
+    # ----- whole-grid queries -----
+
+    def distribution(self, indexes: Optional[Sequence[int]] = None) -> Dict[str, int]:
+        """Hex count per terrain, over the whole grid or the given flat indexes."""
+        if NUMPY_AVAILABLE:
+            import numpy as np
+            values = np.frombuffer(self.codes, dtype=np.uint8)
+            if indexes is not None:
+                values = values[np.asarray(indexes, dtype=np.intp)]
+            counts = np.bincount(values, minlength=len(self.names)).tolist()
+        else:
+            counts = [0] * len(self.names)
+            for i in (range(len(self.codes)) if indexes is None else indexes):
+                counts[self.codes[i]] += 1
+        return {name: count for name, count in zip(self.names, counts) if count}
+
+    def neighbours(self, x: int, y: int) -> List[Tuple[int, int]]:
+        """The up to six adjacent hexes inside the grid."""
+        return [(nx, ny) for nx, ny in neighbour_coords(x, y) if self.contains(nx, ny)]
+
+    def within(self, x: int, y: int, radius: int) -> List[int]:
+        """Flat indexes of hexes at hex distance <= radius from (x, y)."""
+        q0, r0 = _cube(x, y)
+        if NUMPY_AVAILABLE:
+            import numpy as np
+            q, r = self._axial_arrays()
+            dq = q - q0
+            dr = r - r0
+            distance = (np.abs(dq) + np.abs(dr) + np.abs(dq + dr)) // 2
+            return np.flatnonzero(distance <= radius).tolist()
+        found = []
+        x_end, y_end = self.x0 + self.width - 1, self.y0 + self.height - 1
+        for cy in range(max(self.y0, y - radius), min(y_end, y + radius) + 1):
+            for cx in range(max(self.x0, x - radius - 1), min(x_end, x + radius + 1) + 1):
+                if hex_distance((cx, cy), (x, y)) <= radius:
+                    found.append((cy - self.y0) * self.width + (cx - self.x0))
+        return found
+
+    def hexes_within(self, x: int, y: int, radius: int) -> List[str]:
+        return [hex_code(i % self.width + self.x0, i // self.width + self.y0, self.digits)
+                for i in self.within(x, y, radius)]
+
+    def region_distribution(self, x: int, y: int, radius: int) -> Dict[str, int]:
+        """Terrain counts of the hexes within radius of (x, y)."""
+        return self.distribution(self.within(x, y, radius))
+
+    def _axial_arrays(self):
+        if self._axial is None:
+            import numpy as np
+            rows, cols = np.indices((self.height, self.width))
+            # Map coordinates, so row parity (and the half-hex shift) stays global
+            r = rows.ravel() + (self.y0 - 1)
+            q = cols.ravel() + (self.x0 - 1) - (r - (r & 1)) // 2
+            self._axial = (q, r)
+        return self._axial
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Deterministic coherent terrain for The Dying Lands.
+
+Fractal value noise over the hex grid, computed for the whole grid in one
+vectorized pass. Each region's hexes are ranked by noise and split into
+terrain bands by the region's terrain_bias weights, so every region gets its
+configured proportions. Neighbouring hexes have similar noise, so the bands
+form contiguous biomes. The same seed gives the same map in every process.
+
+Chunked maps cannot rank a whole region at once, so assign_terrain_window()
+maps noise through a fixed quantile table instead: any window of the map (a
+chunk) is assigned on its own, and neighbouring chunks agree at their borders.
+
+numpy is used when available; the pure-Python path produces identical output.
+"""
+
+import math
+import os
+from bisect import bisect_right
+from itertools import accumulate
+from importlib.util import find_spec
+from typing import Callable, Dict, List, Sequence
+
+from backend.utils.core_utils import format_hex_code
+
+# numpy is imported by the functions that use it, so importing this module stays cheap
+NUMPY_AVAILABLE = find_spec('numpy') is not None
+
+DEFAULT_SEED = int(os.getenv('HEXY_TERRAIN_SEED', '0'))
+# Hexes per noise cell at the coarsest octave (roughly the biome size)
+DEFAULT_SCALE = 6.0
+DEFAULT_OCTAVES = 3
+PERSISTENCE = 0.5
+
+# Low noise maps to the start of this list, high noise to the end, so bands
+# border their natural neighbours (coast next to swamp, forest next to mountain)
+ELEVATION_ORDER = ('sea', 'coast', 'swamp', 'desert', 'plains', 'forest', 'mountain', 'snow')
+
+# Rows are laid out with even rows shifted half a column right (.hex-row:nth-child(even))
+ROW_SHIFT = 0.5
+ROW_PITCH = math.sqrt(3) / 2
+
+_MASK = 0xFFFFFFFF
+
+
+def _hash_scalar(ix: int, iy: int, salt: int) -> float:
+    h = (ix * 374761393 + iy * 668265263 + salt * 1442695041) & _MASK
+    h = ((h ^ (h >> 13)) * 1274126177) & _MASK
+    h ^= h >> 16
+    return h / 4294967296.0
+
+
+def _hash_array(ix, iy, salt: int):
+    import numpy as np
+    ix = ix.astype(np.uint32)
+    iy = iy.astype(np.uint32)
+    h = ix * np.uint32(374761393) + iy * np.uint32(668265263) + np.uint32((salt * 1442695041) & _MASK)
+    h = (h ^ (h >> np.uint32(13))) * np.uint32(1274126177)
+    h ^= h >> np.uint32(16)
+    return h.astype(np.float64) / 4294967296.0
+
+
+def _salt(seed: int, octave: int) -> int:
+    return (seed * 7919 + octave * 104729) & _MASK
+
+
+def _hex_positions(x0: int, y0: int, width: int, height: int):
+    """Cartesian centres of hexes (x, y) in x0..x0+width-1, y0..y0+height-1, row-major."""
+    xs, ys = [], []
+    for y in range(y0, y0 + height):
+        shift = ROW_SHIFT if y % 2 == 0 else 0.0
+        for x in range(x0, x0 + width):
+            xs.append(x + shift)
+            ys.append(y * ROW_PITCH)
+    return xs, ys
+
+
+def noise_grid(width: int, height: int, seed: int = DEFAULT_SEED,
+               scale: float = DEFAULT_SCALE, octaves: int = DEFAULT_OCTAVES) -> List[float]:
+    """Fractal value noise in [0, 1) for every hex, row-major (index (y-1)*width + (x-1))."""
+    return noise_window(1, 1, width, height, seed, scale, octaves)
+
+
+def noise_window(x0: int, y0: int, width: int, height: int, seed: int = DEFAULT_SEED,
+                 scale: float = DEFAULT_SCALE, octaves: int = DEFAULT_OCTAVES) -> List[float]:
+    """Noise of the hexes of a window of the map, row-major from (x0, y0)."""
+    xs, ys = _hex_positions(x0, y0, width, height)
+    if NUMPY_AVAILABLE:
+        import numpy as np
+        px = np.array(xs)
+        py = np.array(ys)
+        total = np.zeros(px.shape)
+        amplitude, norm = 1.0, 0.0
+        for octave in range(octaves):
+            frequency = (2 ** octave) / scale
+            fx = px * frequency
+            fy = py * frequency
+            x0 = np.floor(fx)
+            y0 = np.floor(fy)
+            tx = fx - x0
+            ty = fy - y0
+            sx = tx * tx * (3.0 - 2.0 * tx)
+            sy = ty * ty * (3.0 - 2.0 * ty)
+            salt = _salt(seed, octave)
+            v00 = _hash_array(x0, y0, salt)
+            v10 = _hash_array(x0 + 1, y0, salt)
+            v01 = _hash_array(x0, y0 + 1, salt)
+            v11 = _hash_array(x0 + 1, y0 + 1, salt)
+            top = v00 + (v10 - v00) * sx
+            bottom = v01 + (v11 - v01) * sx
+            total = total + (top + (bottom - top) * sy) * amplitude
+            norm += amplitude
+            amplitude *= PERSISTENCE
+        return (total / norm).tolist()
+
+    values = [0.0] * len(xs)
+    amplitude, norm = 1.0, 0.0
+    for octave in range(octaves):
+        frequency = (2 ** octave) / scale
+        salt = _salt(seed, octave)
+        for i, (px, py) in enumerate(zip(xs, ys)):
+            fx = px * frequency
+            fy = py * frequency
+            x0 = math.floor(fx)
+            y0 = math.floor(fy)
+            tx = fx - x0
+            ty = fy - y0
+            sx = tx * tx * (3.0 - 2.0 * tx)
+            sy = ty * ty * (3.0 - 2.0 * ty)
+            v00 = _hash_scalar(x0, y0, salt)
+            v10 = _hash_scalar(x0 + 1, y0, salt)
+            v01 = _hash_scalar(x0, y0 + 1, salt)
+            v11 = _hash_scalar(x0 + 1, y0 + 1, salt)
+            top = v00 + (v10 - v00) * sx
+            bottom = v01 + (v11 - v01) * sx
+            values[i] = values[i] + (top + (bottom - top) * sy) * amplitude
+        norm += amplitude
+        amplitude *= PERSISTENCE
+    return [v / norm for v in values]
+
+
+def _bands(bias: Dict[str, float]):
+    """Terrains in elevation order with their cumulative weight boundaries."""
+    terrains = sorted((t for t, w in bias.items() if w > 0),
+                      key=lambda t: (ELEVATION_ORDER.index(t) if t in ELEVATION_ORDER else len(ELEVATION_ORDER), t))
+    weights = [bias[t] for t in terrains]
+    total = sum(weights)
+    return terrains, [c / total for c in accumulate(weights)]
+
+
+def assign_terrain(width: int, height: int, region_for: Callable[[int, int], str],
+                   biases: Dict[str, Dict[str, float]], seed: int = DEFAULT_SEED,
+                   default: str = 'plains') -> Dict[str, str]:
+    """
+    Terrain for every hex of the grid, keyed by hex code.
+
+    region_for(x, y) names the region of a hex; biases maps region names to
+    {terrain: weight}. Hexes of regions without a bias get default.
+    """
+    values = noise_grid(width, height, seed)
+    members: Dict[str, List[int]] = {}
+    for y in range(1, height + 1):
+        for x in range(1, width + 1):
+            members.setdefault(region_for(x, y), []).append((y - 1) * width + (x - 1))
+
+    result: List[str] = [default] * (width * height)
+    for region, indexes in members.items():
+        bias = biases.get(region) or {}
+        if not any(w > 0 for w in bias.values()):
+            continue
+        terrains, bounds = _bands(bias)
+        ranked = _rank(values, indexes)
+        n = len(ranked)
+        for rank, index in enumerate(ranked):
+            band = bisect_right(bounds, (rank + 0.5) / n)
+            result[index] = terrains[min(band, len(terrains) - 1)]
+    return {format_hex_code(i % width + 1, i // width + 1): terrain for i, terrain in enumerate(result)}
+
+
+def _rank(values: Sequence[float], indexes: List[int]) -> List[int]:
+    """indexes ordered by ascending noise (ties by index)."""
+    if NUMPY_AVAILABLE:
+        import numpy as np
+        idx = np.asarray(indexes)
+        return idx[np.argsort(np.asarray(values)[idx], kind='stable')].tolist()
+    return sorted(indexes, key=values.__getitem__)
+
+
+# Noise is stationary, so its distribution is estimated once from a reference
+# window and reused for every chunk of the map
+_QUANTILE_WINDOW = 128
+_QUANTILE_STEPS = 1024
+_quantile_tables: Dict[tuple, List[float]] = {}
+
+
+def noise_quantiles(seed: int = DEFAULT_SEED) -> List[float]:
+    """Noise values at evenly spaced quantiles (0..1) of a reference window."""
+    key = (seed, DEFAULT_SCALE, DEFAULT_OCTAVES)
+    table = _quantile_tables.get(key)
+    if table is None:
+        values = sorted(noise_window(1, 1, _QUANTILE_WINDOW, _QUANTILE_WINDOW, seed))
+        last = len(values) - 1
+        table = [values[round(i * last / _QUANTILE_STEPS)] for i in range(_QUANTILE_STEPS + 1)]
+        _quantile_tables[key] = table
+    return table
+
+
+def assign_terrain_window(x0: int, y0: int, width: int, height: int,
+                          region_for: Callable[[int, int], str], biases: Dict[str, Dict[str, float]],
+                          seed: int = DEFAULT_SEED, default: str = 'plains') -> List[str]:
+    """
+    Terrain of the hexes of a window of the map, row-major from (x0, y0).
+
+    Like assign_terrain, but the bands are cut at fixed noise quantiles rather
+    than by ranking the region, so the result for a hex does not depend on
+    which window it was computed in.
+    """
+    values = noise_window(x0, y0, width, height, seed)
+    table = noise_quantiles(seed)
+    steps = len(table) - 1
+    if NUMPY_AVAILABLE:
+        import numpy as np
+        levels = (np.searchsorted(np.asarray(table), np.asarray(values), side='right') / (steps + 1)).tolist()
+    else:
+        levels = [bisect_right(table, v) / (steps + 1) for v in values]
+
+    bands: Dict[str, tuple] = {}
+    result: List[str] = [default] * (width * height)
+    i = 0
+    for y in range(y0, y0 + height):
+        for x in range(x0, x0 + width):
+            region = region_for(x, y)
+            band = bands.get(region)
+            if band is None:
+                bias = biases.get(region) or {}
+                band = bands[region] = _bands(bias) if any(w > 0 for w in bias.values()) else ((), [])
+            terrains, bounds = band
+            if terrains:
+                result[i] = terrains[min(bisect_right(bounds, levels[i]), len(terrains) - 1)]
+            i += 1
+    return result
+
+
+def region_biases(lore_db) -> Dict[str, Dict[str, float]]:
+    """terrain_bias of every region in the lore database."""
+    regions = getattr(lore_db, 'regional_lore', {}) or {}
+    return {name: dict(data.get('terrain_bias') or {}) for name, data in regions.items()}
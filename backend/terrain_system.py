@@ -4,17 +4,29 @@ Unified Terrain System for The Dying Lands
 Handles all terrain detection, analysis, and generation.
 """
 
-try:
-    import cv2  # type: ignore
-except Exception:  # OpenCV is optional in Lambda
-    cv2 = None  # type: ignore
 import os
-import random
-from typing import Dict, Tuple, Optional
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple, Optional
 from enum import Enum
 import json
 import math
+from importlib.util import find_spec
+
+# numpy is imported by the functions that use it, so importing this module stays cheap
+NUMPY_AVAILABLE = find_spec('numpy') is not None
+
+from backend.config import get_config
 from backend.image_analyzer import ImageAnalyzer
+from backend.terrain_noise import DEFAULT_SEED, assign_terrain, assign_terrain_window, region_biases
+from backend.terrain_grid import TerrainGrid, hex_code as format_grid_code, parse_hex_code
+from backend.world_chunks import ChunkLayout
+from backend.utils.metrics import timed
+
+# Chunk terrain grids kept in memory (a 32x32 chunk is 1 KiB of codes)
+CHUNK_CACHE_SIZE = 256
+# Map size the regions of the lore database are laid out for; larger maps are scaled onto it
+REGION_FRAME = (30, 60)
 
 class TerrainType(Enum):
     """Enumeration of terrain types."""
@@ -33,14 +45,17 @@ class TerrainSystem:
     Handles terrain assignment using (in order):
     - Locked/hardcoded hexes
     - Image analysis
-    - Coordinate-based fallback
-    All logic is config-driven and supports any map size.
+    - Coordinate-based fallback (seeded regional noise, see backend.terrain_noise)
+    All logic is config-driven and supports any map size. With a chunk_size the
+    map is chunked: terrain is resolved one chunk at a time (no image analysis)
+    and only recently used chunks are kept.
     """
-    def __init__(self, map_width: int, map_height: int, image_path: Optional[str] = None, mapping_mode: str = "letterbox", debug: bool = False):
+    def __init__(self, map_width: int, map_height: int, image_path: Optional[str] = None, mapping_mode: str = "letterbox", debug: bool = False,
+                 seed: int = DEFAULT_SEED, chunk_size: Optional[int] = None):
         # If image analysis is enabled and image is available, auto-set grid size to match image aspect ratio (flat-topped hexes)
         self.image_analyzer = None
         self.use_image_analysis = False
-        if image_path:
+        if image_path and not chunk_size:
             temp_width = map_width
             temp_height = map_height
             self.image_analyzer = ImageAnalyzer(image_path, temp_width, temp_height, mapping_mode=mapping_mode, debug=debug)
@@ -72,8 +87,22 @@ class TerrainSystem:
         ]
         self.terrain_cache: Dict[str, str] = {}
         self.debug = debug
+        self.seed = seed
+        # Fallback terrain for the whole grid, per lore database
+        self._noise_terrain: Optional[Dict[str, str]] = None
+        self._noise_terrain_source = None
+        self._grid: Optional[TerrainGrid] = None
+        self._grid_source = None
+        self.layout: Optional[ChunkLayout] = ChunkLayout(map_width, map_height, chunk_size) if chunk_size else None
+        self.digits = self.layout.digits if self.layout else 2
+        self._chunk_grids: 'OrderedDict[Tuple[int, int], TerrainGrid]' = OrderedDict()
+        self._chunk_source = None
+        self._chunk_lock = threading.Lock()
 
+    @timed('terrain_resolve')
     def get_terrain_for_hex(self, hex_code: str, lore_db=None) -> str:
+        if self.layout is not None:
+            return self._get_chunk_terrain(hex_code, lore_db)
         if hex_code in self.terrain_cache:
             return self.terrain_cache[hex_code]
         # 1. Locked/hardcoded hexes
@@ -109,28 +138,26 @@ class TerrainSystem:
         if not self.use_image_analysis or not self.image_analyzer:
             print("[TerrainSystem] Image analysis not available.")
             return
+        if not NUMPY_AVAILABLE:
+            print("[TerrainSystem] numpy is required for image color analysis.")
+            return
         import collections
+        import numpy as np
+        analyzer = self.image_analyzer
+        # Mean color of every hex from one summed-area table, then the closest
+        # palette entry (L1 distance) for all hexes at once
+        averages = analyzer.average_color_grid()[:self.map_height, :self.map_width]
+        palette, owners, names = analyzer.palette_arrays()
+        flat = averages.reshape(-1, 3)
+        distances = np.abs(flat[:, None, :] - palette[None, :, :]).sum(axis=2)
+        best = owners[distances.argmin(axis=1)].reshape(averages.shape[:2])
         region_color_counts = collections.defaultdict(lambda: collections.Counter())
         region_terrain_counts = collections.defaultdict(lambda: collections.Counter())
-        for x in range(1, self.map_width + 1):
-            for y in range(1, self.map_height + 1):
-                hex_code = f"{x:02d}{y:02d}"
-                avg_color = self.image_analyzer.get_average_color_for_hex(x, y)
-                # Find closest terrain by color
-                best_terrain = 'unknown'
-                best_dist = float('inf')
-                for terrain, color_list in self.image_analyzer.terrain_colors.items():
-                    for tcolor in color_list:
-                        dist = sum(abs(c1 - c2) for c1, c2 in zip(avg_color, tcolor))
-                        if dist < best_dist:
-                            best_dist = dist
-                            best_terrain = terrain
-                if lore_db:
-                    region = lore_db.get_regional_bias(x, y)
-                else:
-                    region = 'all'
-                region_color_counts[region][avg_color] += 1
-                region_terrain_counts[region][best_terrain] += 1
+        for y in range(1, averages.shape[0] + 1):
+            for x in range(1, averages.shape[1] + 1):
+                region = lore_db.get_regional_bias(x, y) if lore_db else 'all'
+                region_color_counts[region][tuple(int(c) for c in averages[y - 1, x - 1])] += 1
+                region_terrain_counts[region][names[best[y - 1, x - 1]]] += 1
         # Print summary and suggested biases
         for region in region_terrain_counts:
             total = sum(region_terrain_counts[region].values())
@@ -138,37 +165,25 @@ class TerrainSystem:
             for terrain, count in region_terrain_counts[region].most_common():
                 weight = round(count / total, 2) if total else 0
                 print(f"  {terrain}: {count} ({weight})")
-            print(f"  Suggested bias: {{ {', '.join(f'\'{t}\': {round(c/total,2)}' for t,c in region_terrain_counts[region].items())} }}")
+            suggested = ', '.join(f"'{t}': {round(c / total, 2)}" for t, c in region_terrain_counts[region].items())
+            print(f"  Suggested bias: {{ {suggested} }}")
         return region_terrain_counts
 
     def _get_coordinate_based_terrain(self, hex_code: str, lore_db=None) -> str:
-        import random
         try:
-            x, y = int(hex_code[:2]), int(hex_code[2:])
+            x, y = parse_hex_code(hex_code)
         except (ValueError, IndexError):
             return 'plains'
         if x < 1 or x > self.map_width or y < 1 or y > self.map_height:
             return 'sea'
-        # Use image color-based bias if available
-        # if self.use_image_analysis and self.image_analyzer:
-        #     avg_color = self.image_analyzer.get_average_color_for_hex(x, y)
-        #     best_terrain = 'unknown'
-        #     best_dist = float('inf')
-        #     for terrain, color_list in self.image_analyzer.terrain_colors.items():
-        #         for tcolor in color_list:
-        #             dist = sum(abs(c1 - c2) for c1, c2 in zip(avg_color, tcolor))
-        #             if dist < best_dist:
-        #                 best_dist = dist
-        #                 best_terrain = terrain
-        #     return best_terrain
-        # Otherwise, use regional bias if available
-        if lore_db:
-            region = lore_db.get_regional_bias(x, y)
-            bias = getattr(lore_db, 'regional_lore', {}).get(region, {}).get('terrain_bias', {})
-            if bias:
-                terrains, weights = zip(*bias.items())
-                return random.choices(terrains, weights=weights, k=1)[0]
-        return 'plains'
+        if not lore_db:
+            return 'plains'
+        # The grid is computed in one pass and is the same in every process
+        if self._noise_terrain is None or self._noise_terrain_source is not lore_db:
+            self._noise_terrain = assign_terrain(self.map_width, self.map_height, lore_db.get_regional_bias,
+                                                 region_biases(lore_db), seed=self.seed)
+            self._noise_terrain_source = lore_db
+        return self._noise_terrain.get(hex_code, 'plains')
 
     def get_terrain_symbol(self, terrain: str) -> str:
         """Get ASCII symbol for terrain type."""
@@ -191,49 +206,143 @@ class TerrainSystem:
     def get_map_dimensions(self) -> Tuple[int, int]:
         return self.map_width, self.map_height
     
-    def create_terrain_overview_map(self) -> Dict[str, str]:
-        overview = {}
-        for x in range(1, self.map_width + 1):
-            for y in range(1, self.map_height + 1):
-                hex_code = f"{x:02d}{y:02d}"
-                overview[hex_code] = self.get_terrain_for_hex(hex_code)
-        return overview
-    
-    def get_terrain_distribution(self) -> Dict[str, int]:
+    def get_terrain_grid(self, lore_db=None) -> TerrainGrid:
+        """Terrain of the whole map, resolved once per lore database."""
+        if self._grid is None or self._grid_source is not lore_db:
+            self._grid = TerrainGrid.build(self.map_width, self.map_height, self.terrain_types,
+                                           lambda code: self.get_terrain_for_hex(code, lore_db),
+                                           digits=self.digits)
+            self._grid_source = lore_db
+        return self._grid
+
+    # ----- chunked maps -----
+
+    def get_chunk_grid(self, cx: int, cy: int, lore_db=None) -> TerrainGrid:
+        """Terrain of one chunk of a chunked map, computed on first use."""
+        if self.layout is None:
+            raise ValueError('Map is not chunked')
+        key = (cx, cy)
+        with self._chunk_lock:
+            if self._chunk_source is not lore_db:
+                self._chunk_grids.clear()
+                self._chunk_source = lore_db
+            grid = self._chunk_grids.get(key)
+            if grid is not None:
+                self._chunk_grids.move_to_end(key)
+                return grid
+        grid = self._build_chunk_grid(cx, cy, lore_db)
+        with self._chunk_lock:
+            if self._chunk_source is lore_db:
+                self._chunk_grids[key] = grid
+                while len(self._chunk_grids) > CHUNK_CACHE_SIZE:
+                    self._chunk_grids.popitem(last=False)
+        return grid
+
+    def _build_chunk_grid(self, cx: int, cy: int, lore_db=None) -> TerrainGrid:
+        x0, y0, width, height = self.layout.bounds(cx, cy)
+        if not lore_db:
+            terrains = ['plains'] * (width * height)
+        else:
+            terrains = assign_terrain_window(x0, y0, width, height, self._region_for(lore_db),
+                                             region_biases(lore_db), seed=self.seed)
+            # Locked hexes override the noise, as in get_terrain_for_hex
+            for row in range(height):
+                for col in range(width):
+                    hardcoded = lore_db.get_hardcoded_hex(self.layout.hex_code(x0 + col, y0 + row))
+                    if hardcoded and hardcoded.get('locked', False):
+                        terrains[row * width + col] = hardcoded.get('terrain', 'plains')
+        return TerrainGrid.from_terrains(width, height, self.terrain_types, terrains, x0, y0, self.digits)
+
+    def _region_for(self, lore_db) -> Callable[[int, int], str]:
+        """Region lookup for map coordinates, scaled onto the lore database's region frame."""
+        frame_w, frame_h = REGION_FRAME
+        width, height = self.map_width, self.map_height
+        return lambda x, y: lore_db.get_regional_bias(1 + (x - 1) * frame_w // width,
+                                                      1 + (y - 1) * frame_h // height)
+
+    def _get_chunk_terrain(self, hex_code: str, lore_db=None) -> str:
+        try:
+            x, y = self.layout.parse(hex_code)
+        except ValueError:
+            return 'plains'
+        if not self.layout.contains(x, y):
+            return 'sea'
+        return self.get_chunk_grid(*self.layout.chunk_of(x, y), lore_db).terrain_at(x, y)
+
+    def get_window_grid(self, x0: int, y0: int, width: int, height: int, lore_db=None) -> TerrainGrid:
+        """Terrain of a rectangle of the map, copied from the whole-map or chunk grids."""
+        x1, y1 = x0 + width - 1, y0 + height - 1
+        if self.layout is None:
+            sources = [self.get_terrain_grid(lore_db)]
+        else:
+            sources = [self.get_chunk_grid(cx, cy, lore_db)
+                       for cx, cy in self.layout.chunks_in_rect(x0, y0, x1, y1)]
+        names = list(self.terrain_types)
+        codes = bytearray(width * height)
+        for source in sources:
+            # Sources may have appended terrains of their own; translate their codes
+            remap = bytearray(256)
+            for code, name in enumerate(source.names):
+                if name not in names:
+                    names.append(name)
+                remap[code] = names.index(name)
+            sx0, sy0 = max(x0, source.x0), max(y0, source.y0)
+            sx1 = min(x1, source.x0 + source.width - 1)
+            sy1 = min(y1, source.y0 + source.height - 1)
+            for y in range(sy0, sy1 + 1):
+                start = (y - source.y0) * source.width + (sx0 - source.x0)
+                row = source.codes[start:start + sx1 - sx0 + 1].translate(remap)
+                offset = (y - y0) * width + (sx0 - x0)
+                codes[offset:offset + len(row)] = row
+        return TerrainGrid(width, height, names, codes, x0, y0, self.digits)
+
+    def _grid_around(self, x: int, y: int, radius: int, lore_db=None) -> TerrainGrid:
+        """A grid holding every hex within radius of (x, y)."""
+        if self.layout is None:
+            return self.get_terrain_grid(lore_db)
+        x0, y0 = max(1, x - radius - 1), max(1, y - radius)
+        x1, y1 = min(self.map_width, x + radius + 1), min(self.map_height, y + radius)
+        return self.get_window_grid(x0, y0, x1 - x0 + 1, y1 - y0 + 1, lore_db)
+
+    def create_terrain_overview_map(self, lore_db=None) -> Dict[str, str]:
+        return self.get_terrain_grid(lore_db).to_dict()
+
+    def get_terrain_distribution(self, lore_db=None) -> Dict[str, int]:
         dist = {t: 0 for t in self.terrain_types}
-        for x in range(1, self.map_width + 1):
-            for y in range(1, self.map_height + 1):
-                hex_code = f"{x:02d}{y:02d}"
-                terrain = self.get_terrain_for_hex(hex_code)
-                if terrain in dist:
-                    dist[terrain] += 1
-                else:
-                    dist[terrain] = 1
+        if self.layout is None:
+            dist.update(self.get_terrain_grid(lore_db).distribution())
+            return dist
+        # Chunk by chunk, so the whole map is never held at once
+        for cx, cy in self.layout.chunks():
+            for terrain, count in self.get_chunk_grid(cx, cy, lore_db).distribution().items():
+                dist[terrain] = dist.get(terrain, 0) + count
         return dist
-    
-    def analyze_region(self, center_hex: str, radius: int = 3) -> Dict[str, int]:
-        """Analyze terrain distribution in a region around a hex."""
+
+    def analyze_region(self, center_hex: str, radius: int = 3, lore_db=None) -> Dict[str, int]:
+        """Terrain distribution of the hexes within radius steps of a hex."""
         try:
-            center_x, center_y = int(center_hex[:2]), int(center_hex[2:])
+            center_x, center_y = parse_hex_code(center_hex)
         except (ValueError, IndexError):
             return {}
-        
-        region_terrain = {}
-        
-        for dx in range(-radius, radius + 1):
-            for dy in range(-radius, radius + 1):
-                x = center_x + dx
-                y = center_y + dy
-                
-                if 1 <= x <= self.map_width and 1 <= y <= self.map_height:
-                    hex_code = f"{x:02d}{y:02d}"
-                    terrain = self.get_terrain_for_hex(hex_code)
-                    region_terrain[terrain] = region_terrain.get(terrain, 0) + 1
-        
-        return region_terrain
-    
+        if not (1 <= center_x <= self.map_width and 1 <= center_y <= self.map_height):
+            return {}
+        return self._grid_around(center_x, center_y, radius, lore_db).region_distribution(center_x, center_y, radius)
+
+    def get_neighbours(self, hex_code: str, lore_db=None) -> Dict[str, str]:
+        """Terrain of the up to six hexes adjacent to a hex, keyed by hex code."""
+        try:
+            x, y = parse_hex_code(hex_code)
+        except (ValueError, IndexError):
+            return {}
+        grid = self._grid_around(x, y, 1, lore_db)
+        return {format_grid_code(nx, ny, self.digits): grid.terrain_at(nx, ny) for nx, ny in grid.neighbours(x, y)}
+
     def clear_cache(self):
         self.terrain_cache.clear()
+        self._grid = None
+        self._grid_source = None
+        with self._chunk_lock:
+            self._chunk_grids.clear()
     
     def get_terrain_description(self, terrain: str, language: str = 'en') -> str:
         """Get a description of the terrain type."""
@@ -259,5 +368,7 @@ class TerrainSystem:
         }
         return descriptions.get(language, descriptions['en']).get(terrain, 'Unknown terrain')
 
-# Global terrain system instance
-terrain_system = TerrainSystem(map_width=30, map_height=60) 
\ No newline at end of file
+# Global terrain system instance, sized by the map configuration
+_map_config = get_config().map
+terrain_system = TerrainSystem(map_width=_map_config.width, map_height=_map_config.height,
+                               chunk_size=_map_config.chunk_size if _map_config.chunked else None) 
\ No newline at end of file
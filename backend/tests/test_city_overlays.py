@@ -0,0 +1,59 @@
+"""Overlay pregeneration seeding and the per-language overlay layout."""
+
+import json
+import random
+
+import pytest
+
+from backend.city_overlay_analyzer import CityOverlayAnalyzer, pregenerate_city_overlays
+
+CITY = 'galgenbeck'
+
+
+def read_overlay(directory, language='en', city=CITY):
+    return json.loads((directory / language / f'{city}_overlay.json').read_text(encoding='utf-8'))
+
+
+def test_pregeneration_is_seeded_per_city_and_version(tmp_path):
+    first, second, other = tmp_path / 'a', tmp_path / 'b', tmp_path / 'c'
+
+    counts = pregenerate_city_overlays(str(first), ['en'], 'v1')
+    random.seed(1234)  # the global generator must not matter
+    pregenerate_city_overlays(str(second), ['en'], 'v1')
+    pregenerate_city_overlays(str(other), ['en'], 'v2')
+
+    assert counts['en'] > 0
+    assert read_overlay(first) == read_overlay(second)
+    assert read_overlay(first) != read_overlay(other)
+    assert (first / 'en' / f'{CITY}_context.json').exists()
+
+
+def test_pregeneration_leaves_the_global_random_alone(tmp_path):
+    random.seed(99)
+    expected = [random.random() for _ in range(3)]
+
+    random.seed(99)
+    pregenerate_city_overlays(str(tmp_path), ['en'])
+
+    assert [random.random() for _ in range(3)] == expected
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    return CityOverlayAnalyzer('en', output_directory=str(tmp_path))
+
+
+def test_overlays_are_stored_per_language(analyzer, tmp_path):
+    analyzer.generate_city_overlay(CITY)
+
+    assert analyzer.get_overlay_path(CITY) == str(tmp_path / 'en' / f'{CITY}_overlay.json')
+    assert read_overlay(tmp_path)['name'] == CITY
+
+
+def test_flat_layout_overlays_are_migrated_on_load(analyzer, tmp_path):
+    legacy = {'name': CITY, 'hex_grid': {}, 'total_hexes': 0}
+    (tmp_path / f'{CITY}_overlay.json').write_text(json.dumps(legacy), encoding='utf-8')
+
+    assert analyzer.load_overlay_data(CITY) == legacy
+    assert read_overlay(tmp_path) == legacy
+    assert (tmp_path / f'{CITY}_overlay.json').exists()
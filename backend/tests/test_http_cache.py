@@ -0,0 +1,93 @@
+"""ETag validation of the conditional() view decorator."""
+
+import pytest
+from flask import Flask
+
+from backend.utils.http_cache import build_etag, conditional, encoded_etag
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    state = {'version': 1, 'calls': 0}
+
+    @app.route('/item/<name>')
+    @conditional(lambda name: None if name == 'live' else ('item', name, state['version']))
+    def item(name):
+        state['calls'] += 1
+        return f'{name} v{state["version"]}'
+
+    @app.route('/missing')
+    @conditional(lambda: ('missing',))
+    def missing():
+        return 'gone', 404
+
+    @app.route('/cached')
+    @conditional(lambda: ('cached',), max_age=60)
+    def cached():
+        return 'cached'
+
+    client = app.test_client()
+    client.state = state
+    return client
+
+
+def test_response_carries_etag_of_version_parts(client):
+    response = client.get('/item/a')
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] == f'"{build_etag(("item", "a", 1))}"'
+    assert response.headers['Cache-Control'] == 'public, no-cache'
+
+
+def test_matching_etag_is_answered_without_calling_the_view(client):
+    etag = client.get('/item/a').headers['ETag']
+
+    response = client.get('/item/a', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+    assert client.state['calls'] == 1
+
+
+def test_new_version_invalidates_etag(client):
+    etag = client.get('/item/a').headers['ETag']
+    client.state['version'] = 2
+
+    response = client.get('/item/a', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.get_data(as_text=True) == 'a v2'
+    assert response.headers['ETag'] != etag
+
+
+def test_compressed_etag_is_echoed(client):
+    gz_etag = encoded_etag(build_etag(('item', 'a', 1)), 'gzip')
+
+    response = client.get('/item/a', headers={'If-None-Match': f'"other", "{gz_etag}"'})
+
+    assert response.status_code == 304
+    assert response.headers['ETag'] == f'"{gz_etag}"'
+
+
+def test_star_matches_any_version(client):
+    assert client.get('/item/a', headers={'If-None-Match': '*'}).status_code == 304
+
+
+def test_none_version_skips_validation(client):
+    response = client.get('/item/live', headers={'If-None-Match': '*'})
+
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+
+
+def test_errors_are_not_tagged(client):
+    response = client.get('/missing')
+
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
+
+
+def test_max_age(client):
+    assert client.get('/cached').headers['Cache-Control'] == 'public, max-age=60'
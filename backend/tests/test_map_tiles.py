@@ -0,0 +1,106 @@
+"""Tile addressing and the TileCodec encoding round-trip."""
+
+import json
+
+import pytest
+
+from backend.map_tiles import (FLAG_CITY, FLAG_CONTENT, FLAG_PENDING, FLAG_SETTLEMENT, MAX_ZOOM, TileCodec)
+from backend.terrain_grid import TerrainGrid
+
+TERRAINS = ['plains', 'forest', 'mountain', 'unknown']
+
+
+def make_hexes(width, height, digits=2):
+    hexes = {}
+    for y in range(1, height + 1):
+        for x in range(1, width + 1):
+            terrain = TERRAINS[(x * 7 + y * 3) % 3]
+            entry = {'symbol': terrain[0], 'css_class': f'hex-cell terrain-{terrain}', 'has_content': (x + y) % 4 == 0}
+            if (x, y) == (5, 6):
+                entry.update({'is_city': True, 'city_name': 'Galgenbeck', 'symbol': '◆', 'css_class': 'major-city'})
+            if (x, y) == (7, 2):
+                entry.update({'content_type': 'settlement', 'css_class': 'settlement terrain-forest'})
+            hexes[f'{x:0{digits}d}{y:0{digits}d}'] = entry
+    return hexes
+
+
+def decode(codec, tile):
+    """Cells of a tile back to {(x, y): (symbol, class, flags)}, the way the client reads them."""
+    tile = json.loads(json.dumps(tile))
+    cells = {}
+    for i, symbol in enumerate(tile['symbols']):
+        x = tile['x0'] + (i % tile['width']) * tile['step']
+        y = tile['y0'] + (i // tile['width']) * tile['step']
+        cells[(x, y)] = (symbol, codec.classes[tile['classes'][i]], tile['flags'][i])
+    return cells, {int(i): name for i, name in tile['cities'].items()}
+
+
+def test_addressing_clips_at_the_map_edge():
+    codec = TileCodec(40, 20, TERRAINS, tile_size=16)
+
+    assert codec.tile_counts(0) == (3, 2)
+    assert codec.tile_counts(1) == (2, 1)
+    assert codec.hex_rect(0, 2, 1) == (33, 17, 40, 20)
+    assert codec.contains_tile(0, 2, 1)
+    assert not codec.contains_tile(0, 3, 0)
+    assert not codec.contains_tile(MAX_ZOOM + 1, 0, 0)
+
+
+def test_classes_table_has_unknown_first_and_no_duplicates():
+    codec = TileCodec(10, 10, TERRAINS)
+
+    assert codec.classes == ['terrain-unknown', 'terrain-plains', 'terrain-forest', 'terrain-mountain',
+                             'settlement', 'major-city']
+    assert codec.class_index('hex-cell terrain-forest') == 2
+    assert codec.class_index('no-such-class') == 0
+
+
+@pytest.mark.parametrize('tile', [(0, 0), (1, 0), (1, 1)])
+def test_zoom0_round_trip(tile):
+    codec = TileCodec(20, 12, TERRAINS, tile_size=8)
+    hexes = make_hexes(20, 12)
+
+    encoded = codec.encode_hexes(*tile, hexes)
+    cells, cities = decode(codec, encoded)
+
+    x0, y0, x1, y1 = codec.hex_rect(0, *tile)
+    assert set(cells) == {(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)}
+    for (x, y), (symbol, css_class, flags) in cells.items():
+        entry = hexes[codec.hex_code(x, y)]
+        assert symbol == entry['symbol']
+        assert css_class in entry['css_class'].split()
+        assert bool(flags & FLAG_CONTENT) == entry['has_content']
+    city_cells = [i for i, f in enumerate(encoded['flags']) if f & FLAG_CITY]
+    settlement_cells = [i for i, f in enumerate(encoded['flags']) if f & FLAG_SETTLEMENT]
+    if tile == (0, 0):
+        assert cities == {city_cells[0]: 'Galgenbeck'}
+        assert cells[(5, 6)][1] == 'major-city'
+        assert len(settlement_cells) == 1 and cells[(7, 2)][1] == 'settlement'
+    else:
+        assert cities == {} and city_cells == [] and settlement_cells == []
+
+
+def test_missing_hexes_are_pending():
+    codec = TileCodec(200, 200, TERRAINS, digits=3, tile_size=4)
+    hexes = {'001001': {'symbol': '^', 'css_class': 'terrain-mountain'}}
+
+    cells, _ = decode(codec, codec.encode_hexes(0, 0, hexes))
+
+    assert cells[(1, 1)] == ('^', 'terrain-mountain', 0)
+    assert cells[(2, 1)] == ('?', 'terrain-unknown', FLAG_PENDING)
+
+
+def test_overview_round_trip():
+    codec = TileCodec(20, 12, TERRAINS, tile_size=4)
+    terrains = ['forest' if x <= 10 else 'mountain' for y in range(1, 13) for x in range(1, 21)]
+    grid = TerrainGrid.from_terrains(20, 12, [], terrains)
+
+    encoded = codec.encode_overview(1, 1, 0, grid, lambda t: t[0], cities={(12, 3): 'Schleswig'})
+    cells, cities = decode(codec, encoded)
+
+    assert (encoded['width'], encoded['height'], encoded['step']) == (4, 4, 2)
+    assert set(cells) == {(x, y) for x in (9, 11, 13, 15) for y in (1, 3, 5, 7)}
+    assert cells[(9, 1)] == ('f', 'terrain-forest', 0)
+    assert cells[(13, 5)] == ('m', 'terrain-mountain', 0)
+    assert cells[(11, 3)] == ('◆', 'major-city', FLAG_CITY | FLAG_CONTENT)
+    assert cities == {5: 'Schleswig'}
@@ -0,0 +1,69 @@
+"""Single-pass hex markdown tokenizer and its document cache."""
+
+import os
+
+from backend.utils.markdown_tokenizer import load_markdown, parse_markdown, tokenize_markdown
+
+HEX = """# Hex 0101
+
+**Terrain:** Forest
+
+## Settlement
+⌂ **Galgenbeck**
+**Population:** 200
+**Population:** 250
+Gallows everywhere.
+
+## Loot Found
+**Type:** weapon
+```
+1d6 silver
+```
+
+## Loot Found
+**Type:** armor
+"""
+
+
+def test_sections_fields_and_code_blocks():
+    doc = tokenize_markdown(HEX)
+
+    assert doc.preamble.field('Terrain') == 'Forest'
+    assert [s.key for s in doc.section_list] == ['settlement', 'loot_found', 'loot_found']
+    assert doc.section('settlement').fields['population'] == ['200', '250']
+    assert doc.section('settlement').field('Population') == '200'
+    assert doc.section('settlement').raw == '⌂ **Galgenbeck**\nGallows everywhere.'
+    assert doc.code_blocks == ['1d6 silver']
+
+
+def test_document_fields_and_repeated_sections_keep_the_first():
+    doc = tokenize_markdown(HEX)
+
+    assert doc.field('Missing', 'Type') == 'weapon'
+    assert doc.section('loot_found').field('type') == 'weapon'
+    assert doc.section_list[2].field('type') == 'armor'
+
+
+def test_fence_hides_headers_and_fields():
+    doc = tokenize_markdown("## Notes\n```\n## Not a header\n**Key:** no\n")
+
+    assert [s.key for s in doc.section_list] == ['notes']
+    assert doc.fields == {}
+    assert doc.code_blocks == ['## Not a header\n**Key:** no\n']
+
+
+def test_parse_is_cached_by_content():
+    assert parse_markdown(HEX) is parse_markdown(HEX)
+
+
+def test_load_is_cached_until_the_file_changes(tmp_path):
+    path = tmp_path / 'hex_0101.md'
+    path.write_text(HEX, encoding='utf-8')
+
+    first = load_markdown(path)
+    assert load_markdown(path) is first
+
+    path.write_text(HEX.replace('Forest', 'Swamp'), encoding='utf-8')
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert load_markdown(path).field('Terrain') == 'Swamp'
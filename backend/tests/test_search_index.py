@@ -0,0 +1,69 @@
+"""Tokenizer and inverted index behind /api/search."""
+
+import pytest
+
+from backend.search_index import HexSearchIndex, fold_text, tokenize
+
+
+def test_fold_text_strips_accents_and_case():
+    assert fold_text('Coração de PEDRA') == 'coracao de pedra'
+
+
+def test_tokenize_drops_punctuation_and_short_tokens():
+    assert tokenize("Galgenbeck's Tower, 3 floors - a ruin") == ['galgenbeck', 'tower', 'floors', 'ruin']
+
+
+@pytest.fixture
+def index():
+    index = HexSearchIndex()
+    index.index_hex('0101', {'hex_type': 'settlement', 'terrain': 'forest', 'name': 'Galgenbeck',
+                             'description': 'A city of gallows', 'loot': {'name': 'Rusty Sword'}})
+    index.index_hex('0102', {'hex_type': 'dungeon', 'terrain': 'swamp', 'name': 'Gallows Pit',
+                             'description': 'Bones and a sword'})
+    index.index_hex('0201', {'hex_type': 'wilderness', 'terrain': 'forest', 'encounter': 'Coração Negro'})
+    return index
+
+
+def codes(result):
+    return [hit['hex_code'] for hit in result['results']]
+
+
+def test_terms_match_as_prefixes_and_all_terms_are_required(index):
+    assert sorted(codes(index.search('gall'))) == ['0101', '0102']
+    assert codes(index.search('gall sword pit')) == ['0102']
+    assert index.search('gall dragon')['total'] == 0
+
+
+def test_nested_values_are_indexed_but_identity_keys_are_not(index):
+    assert codes(index.search('rusty')) == ['0101']
+    assert index.search('swamp')['total'] == 0
+
+
+def test_accented_queries_match_folded_content(index):
+    assert codes(index.search('coração')) == ['0201']
+    assert index.search('coracao')['results'][0]['name'] == 'Coração Negro'
+
+
+def test_exact_hits_rank_before_prefix_hits(index):
+    assert codes(index.search('gallows')) == ['0101', '0102']
+    assert codes(index.search('sword')) == ['0101', '0102']
+    index.index_hex('0301', {'name': 'Swordfish Inn'})
+    assert codes(index.search('sword'))[-1] == '0301'
+
+
+def test_filters_and_paging(index):
+    assert codes(index.search('', terrain='forest')) == ['0101', '0201']
+    assert codes(index.search('', hex_type='dungeon')) == ['0102']
+    page = index.search('', offset=1, limit=1)
+    assert page['total'] == 3
+    assert codes(page) == ['0102']
+
+
+def test_reindex_and_remove_update_postings(index):
+    index.index_hex('0101', {'name': 'Schleswig'})
+    assert codes(index.search('galgenbeck')) == []
+    assert codes(index.search('schles')) == ['0101']
+
+    index.remove_hex('0101')
+    assert index.search('schles')['total'] == 0
+    assert len(index) == 2
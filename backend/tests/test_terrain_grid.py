@@ -0,0 +1,82 @@
+"""Hex geometry and whole-grid region queries of TerrainGrid."""
+
+import pytest
+
+from backend import terrain_grid
+from backend.terrain_grid import TerrainGrid, hex_distance, neighbour_coords
+
+
+def checkerboard(width, height, x0=1, y0=1):
+    terrains = ['forest' if (x + y) % 2 else 'plains'
+                for y in range(y0, y0 + height) for x in range(x0, x0 + width)]
+    return TerrainGrid.from_terrains(width, height, [], terrains, x0, y0)
+
+
+@pytest.mark.parametrize('y', [4, 5])
+def test_neighbours_are_one_step_away(y):
+    neighbours = neighbour_coords(6, y)
+
+    assert len(set(neighbours)) == 6
+    assert all(hex_distance((6, y), n) == 1 for n in neighbours)
+
+
+def test_even_rows_are_shifted_right():
+    # Row 2 sits half a hex right of rows 1 and 3
+    assert set(neighbour_coords(3, 2)) == {(2, 2), (4, 2), (3, 1), (4, 1), (3, 3), (4, 3)}
+    assert set(neighbour_coords(3, 3)) == {(2, 3), (4, 3), (2, 2), (3, 2), (2, 4), (3, 4)}
+
+
+def test_distance():
+    assert hex_distance((1, 1), (1, 1)) == 0
+    assert hex_distance((1, 1), (6, 1)) == 5
+    assert hex_distance((1, 1), (1, 5)) == 4
+    assert hex_distance((2, 3), (9, 7)) == hex_distance((9, 7), (2, 3))
+
+
+def test_grid_neighbours_are_clipped_to_the_grid():
+    grid = checkerboard(5, 5)
+
+    assert len(grid.neighbours(3, 3)) == 6
+    assert set(grid.neighbours(1, 1)) == {(2, 1), (1, 2)}
+
+
+@pytest.mark.parametrize('radius', [0, 1, 2, 3])
+def test_interior_region_is_a_hexagon(radius):
+    grid = checkerboard(15, 15)
+
+    hexes = grid.hexes_within(8, 8, radius)
+
+    assert len(hexes) == 1 + 3 * radius * (radius + 1)
+    assert all(hex_distance((8, 8), (int(c[:2]), int(c[2:]))) <= radius for c in hexes)
+
+
+def test_region_distribution():
+    grid = checkerboard(9, 9)
+
+    assert grid.region_distribution(5, 5, 1) == {'plains': 3, 'forest': 4}
+    assert grid.distribution() == {'plains': 41, 'forest': 40}
+
+
+@pytest.mark.parametrize('origin', [(1, 1), (4, 7), (33, 18)])
+def test_region_query_pure_python_matches_numpy(monkeypatch, origin):
+    pytest.importorskip('numpy')
+    x0, y0 = origin
+    grid = checkerboard(12, 10, x0, y0)
+    centres = [(x0, y0), (x0 + 5, y0 + 4), (x0 + 11, y0 + 9), (x0 + 3, y0 + 8)]
+    expected = [(grid.within(x, y, r), grid.region_distribution(x, y, r)) for x, y in centres for r in (1, 2, 4)]
+
+    monkeypatch.setattr(terrain_grid, 'NUMPY_AVAILABLE', False)
+    grid = checkerboard(12, 10, x0, y0)
+
+    actual = [(sorted(grid.within(x, y, r)), grid.region_distribution(x, y, r)) for x, y in centres for r in (1, 2, 4)]
+    assert actual == expected
+
+
+def test_window_lookups_use_map_coordinates():
+    grid = checkerboard(4, 4, x0=10, y0=20)
+
+    assert grid.get('1020') == 'plains'
+    assert grid.get('1120') == 'forest'
+    assert grid.get('0101') is None
+    with pytest.raises(KeyError):
+        grid['0101']
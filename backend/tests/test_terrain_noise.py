@@ -0,0 +1,89 @@
+"""Seeded terrain noise: determinism, numpy/pure-Python parity and chunk agreement."""
+
+from collections import Counter
+
+import pytest
+
+from backend import terrain_noise
+from backend.terrain_noise import assign_terrain, assign_terrain_window, noise_grid, noise_window
+
+BIASES = {
+    'north': {'forest': 2, 'mountain': 1, 'snow': 1},
+    'south': {'plains': 3, 'swamp': 1, 'coast': 0},
+}
+
+
+def region_for(x, y):
+    return 'north' if y <= 12 else 'south'
+
+
+@pytest.fixture
+def pure_python(monkeypatch):
+    monkeypatch.setattr(terrain_noise, 'NUMPY_AVAILABLE', False)
+
+
+def test_noise_is_deterministic_per_seed():
+    first = noise_grid(20, 15, seed=7)
+
+    assert noise_grid(20, 15, seed=7) == first
+    assert noise_grid(20, 15, seed=8) != first
+    assert all(0.0 <= v < 1.0 for v in first)
+
+
+def test_neighbouring_hexes_have_similar_noise():
+    values = noise_grid(40, 1, seed=3)
+
+    steps = [abs(a - b) for a, b in zip(values, values[1:])]
+    assert max(steps) < 0.25
+
+
+def test_window_matches_the_grid():
+    grid = noise_grid(20, 15, seed=5)
+    window = noise_window(4, 6, 5, 3, seed=5)
+
+    assert window == [grid[(y - 1) * 20 + (x - 1)] for y in range(6, 9) for x in range(4, 9)]
+
+
+def test_region_proportions_follow_the_bias():
+    terrain = assign_terrain(20, 24, region_for, BIASES, seed=11)
+
+    north = Counter(t for code, t in terrain.items() if int(code[2:]) <= 12)
+    south = Counter(t for code, t in terrain.items() if int(code[2:]) > 12)
+    assert north == {'forest': 120, 'mountain': 60, 'snow': 60}
+    assert south == {'plains': 180, 'swamp': 60}
+
+
+def test_regions_without_bias_get_the_default():
+    terrain = assign_terrain(4, 4, lambda x, y: 'unknown', BIASES, default='plains')
+
+    assert set(terrain.values()) == {'plains'}
+
+
+def test_chunk_windows_agree_with_a_single_window():
+    whole = assign_terrain_window(1, 1, 16, 16, region_for, BIASES, seed=2)
+    chunks = {}
+    for cy in range(2):
+        for cx in range(2):
+            values = assign_terrain_window(1 + cx * 8, 1 + cy * 8, 8, 8, region_for, BIASES, seed=2)
+            for i, value in enumerate(values):
+                chunks[(1 + cx * 8 + i % 8, 1 + cy * 8 + i // 8)] = value
+
+    assert [chunks[(x, y)] for y in range(1, 17) for x in range(1, 17)] == whole
+
+
+def test_pure_python_matches_numpy(monkeypatch):
+    pytest.importorskip('numpy')
+    noise = noise_window(3, 2, 12, 9, seed=9)
+    terrain = assign_terrain(12, 24, region_for, BIASES, seed=9)
+    window = assign_terrain_window(30, 40, 10, 10, region_for, BIASES, seed=9)
+
+    monkeypatch.setattr(terrain_noise, 'NUMPY_AVAILABLE', False)
+    monkeypatch.setattr(terrain_noise, '_quantile_tables', {})
+
+    assert noise_window(3, 2, 12, 9, seed=9) == pytest.approx(noise, abs=1e-12)
+    assert assign_terrain(12, 24, region_for, BIASES, seed=9) == terrain
+    assert assign_terrain_window(30, 40, 10, 10, region_for, BIASES, seed=9) == window
+
+
+def test_pure_python_is_deterministic(pure_python):
+    assert assign_terrain(10, 10, region_for, BIASES, seed=4) == assign_terrain(10, 10, region_for, BIASES, seed=4)
@@ -0,0 +1,100 @@
+"""Hex code formats and chunk geometry of chunked maps."""
+
+import pytest
+
+from backend.config import MapConfig
+from backend.utils.core_utils import hex_code_digits, parse_hex_coordinates, validate_hex_code
+from backend.world_chunks import CHUNKS_DIR, ChunkLayout, ChunkStore, hex_file_path
+
+
+@pytest.mark.parametrize('side, digits, code', [
+    (30, 2, '0307'),
+    (99, 2, '0307'),
+    (100, 3, '003007'),
+    (999, 3, '003007'),
+    (1000, 4, '00030007'),
+    (9999, 4, '00030007'),
+])
+def test_code_digits_follow_the_map_size(side, digits, code):
+    layout = ChunkLayout(side, side)
+
+    assert layout.digits == hex_code_digits(side) == digits
+    assert layout.hex_code(3, 7) == code
+    assert validate_hex_code(code)
+    assert layout.parse(code) == parse_hex_coordinates(code) == (3, 7)
+
+
+def test_maps_beyond_four_digits_are_rejected():
+    with pytest.raises(ValueError):
+        hex_code_digits(10000)
+    with pytest.raises(ValueError):
+        MapConfig(width=10000, height=10)
+
+
+@pytest.mark.parametrize('code', ['0307', '0030007', '00307', 'ab0307'])
+def test_codes_of_another_width_are_rejected(code):
+    with pytest.raises(ValueError):
+        ChunkLayout(200, 200).parse(code)
+
+
+def test_chunks_are_clipped_to_the_map():
+    layout = ChunkLayout(70, 40, chunk_size=32)
+
+    assert (layout.chunks_x, layout.chunks_y, layout.chunk_count) == (3, 2, 6)
+    assert layout.bounds(0, 0) == (1, 1, 32, 32)
+    assert layout.bounds(2, 1) == (65, 33, 6, 8)
+    with pytest.raises(ValueError):
+        layout.bounds(3, 0)
+
+
+def test_hexes_map_to_their_chunk():
+    layout = ChunkLayout(200, 200, chunk_size=32)
+
+    assert layout.chunk_of(1, 1) == (0, 0)
+    assert layout.chunk_of(32, 33) == (0, 1)
+    assert layout.chunk_of_code('033065') == (1, 2)
+    codes = list(layout.hex_codes(6, 6))
+    assert len(codes) == 8 * 8
+    assert codes[:2] == ['193193', '193194']
+    assert all(layout.chunk_of_code(c) == (6, 6) for c in codes)
+
+
+def test_chunks_in_rect():
+    layout = ChunkLayout(100, 100, chunk_size=32)
+
+    assert layout.chunks_in_rect(30, 30, 34, 34) == [(0, 0), (1, 0), (0, 1), (1, 1)]
+    assert layout.chunks_in_rect(-5, -5, 10, 10) == [(0, 0)]
+    assert layout.chunks_in_rect(200, 200, 300, 300) == []
+
+
+def test_store_index_round_trip(tmp_path):
+    layout = ChunkLayout(200, 200, chunk_size=32)
+    store = ChunkStore(tmp_path, layout)
+
+    assert store.hex_path('033065') == tmp_path / CHUNKS_DIR / '1_2' / 'hex_033065.md'
+    assert store.load_index(1, 2) is None
+    assert not store.update_entry('033065', {'terrain': 'forest'})
+
+    store.write_index(1, 2, {'033065': {'terrain': 'plains'}})
+    store.write_index(0, 0, {})
+    assert store.update_entry('033065', {'terrain': 'forest'})
+    assert store.load_index(1, 2)['bounds'] == [33, 65, 32, 32]
+    assert store.generated_chunks() == [(0, 0), (1, 2)]
+    assert list(store.iter_entries()) == [('033065', {'terrain': 'forest'})]
+
+    assert store.update_entry('033065', None)
+    assert list(store.iter_entries()) == []
+
+
+def test_manifest_round_trip(tmp_path):
+    store = ChunkStore(tmp_path, ChunkLayout(300, 120, chunk_size=64))
+
+    assert store.load_manifest() is None
+    store.write_manifest()
+    assert store.load_manifest() == {'version': 1, 'map_width': 300, 'map_height': 120, 'chunk_size': 64,
+                                     'code_digits': 3, 'chunks_x': 5, 'chunks_y': 2}
+
+
+def test_hex_file_path_layouts(tmp_path):
+    assert hex_file_path(tmp_path, '0307', ChunkLayout(200, 200)) == tmp_path / 'hexes' / 'hex_0307.md'
+    assert hex_file_path(tmp_path, '003007', ChunkLayout(200, 200)) == tmp_path / CHUNKS_DIR / '0_0' / 'hex_003007.md'
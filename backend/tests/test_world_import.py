@@ -0,0 +1,87 @@
+"""Validation of uploaded world archives (inspect_archive)."""
+
+import zipfile
+
+import pytest
+
+from backend.world_import import EXPORT_ROOT, ImportValidationError, inspect_archive
+
+
+def make_zip(path, files, compression=zipfile.ZIP_DEFLATED):
+    with zipfile.ZipFile(path, 'w', compression) as zf:
+        for name, data in files.items():
+            zf.writestr(name, data)
+    return path
+
+
+def test_export_layout_is_accepted(tmp_path):
+    archive = make_zip(tmp_path / 'world.zip', {
+        f'{EXPORT_ROOT}/hexes/hex_0101.md': '# Hex 0101',
+        f'{EXPORT_ROOT}/hexes/hex_0102.md': '# Hex 0102',
+        f'{EXPORT_ROOT}/version.json': '{}',
+    })
+
+    inspection = inspect_archive(archive)
+
+    assert inspection['prefix'] == f'{EXPORT_ROOT}/'
+    assert inspection['hexes'] == 2
+    assert not inspection['chunked']
+    assert len(inspection['members']) == 3
+
+
+def test_chunked_world_without_generated_chunks_is_accepted(tmp_path):
+    archive = make_zip(tmp_path / 'world.zip', {'chunks/manifest.json': '{}'})
+
+    inspection = inspect_archive(archive)
+
+    assert inspection['chunked']
+    assert inspection['hexes'] == 0
+
+
+def test_chunk_hexes_are_counted(tmp_path):
+    archive = make_zip(tmp_path / 'world.zip', {
+        'chunks/manifest.json': '{}',
+        'chunks/0_0/index.json': '{}',
+        'chunks/0_0/hex_000000.md': '# Hex',
+    })
+
+    assert inspect_archive(archive)['hexes'] == 1
+
+
+@pytest.mark.parametrize('name', ['../evil.md', '/etc/evil.md', 'hexes/../../evil.md', 'hexes\\..\\evil.md'])
+def test_zip_slip_paths_are_rejected(tmp_path, name):
+    archive = make_zip(tmp_path / 'world.zip', {'hexes/hex_0101.md': '# Hex', name: 'x'})
+
+    with pytest.raises(ImportValidationError, match='Unsafe path'):
+        inspect_archive(archive)
+
+
+def test_compression_bombs_are_rejected(tmp_path):
+    archive = make_zip(tmp_path / 'world.zip', {'hexes/hex_0101.md': '0' * 1_000_000})
+
+    with pytest.raises(ImportValidationError, match='compression ratio'):
+        inspect_archive(archive)
+
+
+def test_extracted_size_limit(tmp_path):
+    archive = make_zip(tmp_path / 'world.zip', {'hexes/hex_0101.md': 'x' * 600, 'hexes/hex_0102.md': 'y' * 600},
+                       compression=zipfile.ZIP_STORED)
+
+    inspect_archive(archive, max_bytes=1200)
+    with pytest.raises(ImportValidationError, match='expands to more than'):
+        inspect_archive(archive, max_bytes=1000)
+
+
+def test_archive_without_hexes_is_rejected(tmp_path):
+    archive = make_zip(tmp_path / 'world.zip', {'notes.txt': 'hello', 'hexes/readme.md': 'x'})
+
+    with pytest.raises(ImportValidationError, match='no hexes'):
+        inspect_archive(archive)
+
+
+def test_non_zip_is_rejected(tmp_path):
+    path = tmp_path / 'world.zip'
+    path.write_bytes(b'not a zip')
+
+    with pytest.raises(ImportValidationError, match='not a ZIP'):
+        inspect_archive(path)
@@ -5,20 +5,51 @@ Handles all translation and localization functionality.
 Loads translations from JSON files to maintain consistency.
 """
 
+import hashlib
 import json
 import os
-from typing import Dict, Any, Optional, List
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Any, Iterator, Optional, List
 from pathlib import Path
 
+# Language of the current request/task; unset means the process default
+_active_language: ContextVar[Optional[str]] = ContextVar('hexy_language', default=None)
+
 class TranslationSystem:
     """Unified translation system for The Dying Lands."""
     
     def __init__(self, language: str = 'en', base_path: Optional[str] = None):
-        self.language = language
+        self.default_language = language
         self.base_path = base_path or self._get_default_base_path()
         self.translations: Dict[str, Dict[str, Any]] = {}
+        self.revision = ''
         self._load_all_translations()
     
+    @property
+    def language(self) -> str:
+        """Language of the current context (request), else the process default."""
+        return _active_language.get() or self.default_language
+    
+    def activate(self, language: str) -> Token:
+        """Use language for the current context only; pass the token to deactivate()."""
+        if language not in self.translations:
+            language = 'en'
+        return _active_language.set(language)
+    
+    def deactivate(self, token: Token) -> None:
+        """Restore the language that was active before activate()."""
+        _active_language.reset(token)
+    
+    @contextmanager
+    def use_language(self, language: str) -> Iterator[str]:
+        """Context manager form of activate()/deactivate()."""
+        token = self.activate(language)
+        try:
+            yield self.language
+        finally:
+            self.deactivate(token)
+    
     def _get_default_base_path(self) -> str:
         """Get the default path to translation files."""
         current_dir = Path(__file__).parent
@@ -33,6 +64,9 @@ class TranslationSystem:
             else:
                 print(f"⚠️  Warning: Language directory not found: {language_path}")
                 self.translations[language_code] = {}
+        # Content hash of the loaded translations (stable across processes; used for ETags)
+        serialized = json.dumps(self.translations, sort_keys=True, ensure_ascii=False)
+        self.revision = hashlib.sha1(serialized.encode('utf-8')).hexdigest()[:12]
     
     def _load_language_files(self, language_path: Path) -> Dict[str, Any]:
         """Load all JSON files for a specific language."""
@@ -138,12 +172,12 @@ class TranslationSystem:
         return result if isinstance(result, list) else []
     
     def set_language(self, language: str) -> None:
-        """Set the current language."""
+        """Set the process-wide default language (CLI use; requests use activate())."""
         if language in self.translations:
-            self.language = language
+            self.default_language = language
         else:
             print(f"⚠️  Language '{language}' not supported, using 'en'")
-            self.language = 'en'
+            self.default_language = 'en'
     
     def get_supported_languages(self) -> List[str]:
         """Get list of supported languages."""
@@ -18,6 +18,8 @@ from .core_utils import (
     validate_hex_code,
     parse_hex_coordinates,
     format_hex_code,
+    hex_code_digits,
+    output_dir_for_language,
     safe_file_write,
     safe_file_read,
     weighted_choice,
@@ -75,6 +77,13 @@ from .ascii_processor import (
     parse_loot_section_from_ascii
 )
 
+from .markdown_tokenizer import (
+    MarkdownDocument,
+    tokenize_markdown,
+    parse_markdown,
+    load_markdown
+)
+
 from .markdown_parser import (
     parse_content_sections,
     parse_loot_section,
@@ -113,6 +122,10 @@ from .response_helpers import (
     handle_exception_response
 )
 
+from .lazy import LazyObject
+
+from .metrics import timed, registry as metrics_registry
+
 __all__ = [
     # Core utilities
     'setup_project_paths',
@@ -120,6 +133,8 @@ __all__ = [
     'validate_hex_code',
     'parse_hex_coordinates',
     'format_hex_code',
+    'hex_code_digits',
+    'output_dir_for_language',
     'safe_file_write',
     'safe_file_read',
     'weighted_choice',
@@ -171,6 +186,10 @@ __all__ = [
     'parse_loot_section_from_ascii',
     
     # Markdown parsing
+    'MarkdownDocument',
+    'tokenize_markdown',
+    'parse_markdown',
+    'load_markdown',
     'parse_content_sections',
     'parse_loot_section',
     'parse_magical_effect',
@@ -201,5 +220,12 @@ __all__ = [
     
     # Response helpers
     'create_overlay_response',
-    'handle_exception_response'
+    'handle_exception_response',
+    
+    # Lazy singletons
+    'LazyObject',
+    
+    # Metrics
+    'timed',
+    'metrics_registry'
 ] 
\ No newline at end of file
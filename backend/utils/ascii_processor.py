@@ -3,6 +3,8 @@ ASCII art processing utilities for parsing and handling ASCII art blocks in cont
 """
 from typing import Dict, Any, List, Optional
 
+from .markdown_tokenizer import parse_markdown
+
 
 def process_ascii_blocks(content: str) -> Dict[str, Any]:
     """
@@ -26,70 +28,31 @@ def process_ascii_blocks(content: str) -> Dict[str, Any]:
         'tavern_details': None
     }
     
-    current_section = None
-    section_content = []
-    in_ascii = False
-    ascii_lines = []
-    
-    lines = content.split('\n')
+    doc = parse_markdown(content)
     
-    for i, line in enumerate(lines):
+    # Lines before the first section: a bold line is the title, the first other line the description
+    for line in doc.preamble.text_lines:
         line = line.strip()
         if not line:
             continue
-            
-        # ASCII art block detection
-        if line == '```':
-            in_ascii = not in_ascii
-            if not in_ascii:
-                # End of ASCII art block
-                if ascii_lines:
-                    data['settlement_art'] = '\n'.join(ascii_lines)
-                    ascii_lines = []
-            continue
-            
-        if in_ascii:
-            ascii_lines.append(line)
-            continue
-            
-        # Section header detection
-        if line.startswith('## '):
-            # Save previous section
-            if current_section and section_content:
-                section_text = '\n'.join(section_content).strip()
-                if current_section in data:
-                    if current_section == 'tavern_details':
-                        # Don't overwrite tavern_details with string content
-                        pass
-                    else:
-                        data[current_section] = section_text
-                section_content = []
-            
-            # Start new section
-            current_section = line[3:].lower().replace(' ', '_')
+        if line.startswith('**') and line.endswith('**'):
+            data['name'] = line.strip('*')
+        elif not data.get('description'):
+            data['description'] = line
+    
+    for section in doc.section_list:
+        # tavern_details is structured; never overwrite it with section text
+        if section.key not in data or section.key == 'tavern_details':
             continue
-            
-        # Content line
-        if current_section:
-            section_content.append(line)
-        else:
-            # Handle lines before first section
-            if line.startswith('**') and line.endswith('**'):
-                # This might be a title
-                data['name'] = line.strip('*')
-            elif not data.get('description'):
-                # First non-empty line might be description
-                data['description'] = line
-    
-    # Save last section
-    if current_section and section_content:
-        section_text = '\n'.join(section_content).strip()
-        if current_section in data:
-            if current_section == 'tavern_details':
-                # Don't overwrite tavern_details with string content
-                pass
-            else:
-                data[current_section] = section_text
+        section_lines = [line.strip() for line in section.text_lines if line.strip()]
+        if section_lines:
+            data[section.key] = '\n'.join(section_lines)
+    
+    # The last non-empty code block is the art
+    for block in doc.code_blocks:
+        ascii_lines = [line.strip() for line in block.split('\n') if line.strip()]
+        if ascii_lines:
+            data['settlement_art'] = '\n'.join(ascii_lines)
     
     return data
 
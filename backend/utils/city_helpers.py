@@ -37,7 +37,8 @@ def create_fallback_district_data(
     get_city_encounters_func,
     get_city_atmospheres_func,
     get_city_random_table_func,
-    generate_district_random_table_func
+    generate_district_random_table_func,
+    rng: Optional[random.Random] = None
 ) -> Dict[str, Any]:
     """
     Create fallback district data when specific district information is not available.
@@ -49,10 +50,12 @@ def create_fallback_district_data(
         get_city_atmospheres_func: Function to get city atmospheres
         get_city_random_table_func: Function to get city random table
         generate_district_random_table_func: Function to generate district random table
+        rng: Random generator to draw from (default: the global random module)
         
     Returns:
         Dictionary containing fallback district data
     """
+    rng = rng or random
     fallback_content = get_fallback_district_content()
     
     districts = get_city_content_list_func(city_data, 'districts', fallback_content['districts'])
@@ -60,18 +63,18 @@ def create_fallback_district_data(
     atmospheres = get_city_atmospheres_func(city_data, fallback_content['atmospheres'])
     random_table = get_city_random_table_func(city_data, 'district', generate_district_random_table_func)
     
-    name = random.choice(districts)
-    encounter = random.choice(encounters) if encounters else "Atividades misteriosas no bairro"
-    atmosphere = random.choice(atmospheres) if atmospheres else "Sombrio e ameaçador"
+    name = rng.choice(districts)
+    encounter = rng.choice(encounters) if encounters else "Atividades misteriosas no bairro"
+    atmosphere = rng.choice(atmospheres) if atmospheres else "Sombrio e ameaçador"
     
     return {
         'name': name,
-        'description': f"Um bairro onde {random.choice(['os ricos uma vez viveram', 'os mercadores uma vez prosperaram', 'os eruditos uma vez estudaram', 'os pobres lutam para sobreviver'])}.",
+        'description': f"Um bairro onde {rng.choice(['os ricos uma vez viveram', 'os mercadores uma vez prosperaram', 'os eruditos uma vez estudaram', 'os pobres lutam para sobreviver'])}.",
         'encounter': encounter,
         'atmosphere': atmosphere,
         'random_table': random_table,
         'notable_features': [
-            random.choice(["Mansões em ruínas", "Becos estreitos", "Estatuas antigas", "Fontes quebradas"]),
-            random.choice(["Lojas abandonadas", "Janelas tapadas", "Paredes com grafites", "Jardins abandonados"])
+            rng.choice(["Mansões em ruínas", "Becos estreitos", "Estatuas antigas", "Fontes quebradas"]),
+            rng.choice(["Lojas abandonadas", "Janelas tapadas", "Paredes com grafites", "Jardins abandonados"])
         ]
     } 
\ No newline at end of file
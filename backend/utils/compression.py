@@ -0,0 +1,185 @@
+"""
+Response compression for static assets and large JSON payloads.
+
+Static assets are precompressed at build time (``python -m backend.utils.compression``)
+and the matching ``.br``/``.gz`` sibling is served by Accept-Encoding. Large
+JSON responses are compressed on the fly; responses carrying an ETag are
+versioned, so their compressed bytes are cached, and the compressed body gets
+its own ETag (backend.utils.http_cache.encoded_etag).
+"""
+import gzip
+import mimetypes
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from flask import Flask, request, send_from_directory
+
+from backend.utils.http_cache import encoded_etag
+
+# Optional brotli support (gzip is always available)
+try:
+    import brotli  # type: ignore
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+# Text-like assets worth compressing; media (webm, png, ...) is already compressed
+COMPRESSIBLE_SUFFIXES = ('.js', '.css', '.html', '.json', '.svg', '.ttf', '.otf', '.txt', '.webmanifest')
+VARIANT_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+MIN_COMPRESS_BYTES = int(os.getenv('HEXY_COMPRESS_MIN_BYTES', '1024'))
+_COMPRESSED_CACHE_ENTRIES = 64
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    """Compress data with the given content-coding ('br' or 'gzip')."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def available_encodings() -> tuple:
+    """Content-codings this process can produce, preferred first."""
+    return ('br', 'gzip') if BROTLI_AVAILABLE else ('gzip',)
+
+
+def negotiate_encoding(encodings=None) -> Optional[str]:
+    """Pick the best content-coding accepted by the current request."""
+    accepted = request.accept_encodings
+    for encoding in encodings or available_encodings():
+        if accepted[encoding]:
+            return encoding
+    return None
+
+
+def precompress_static(static_dir: Path, min_size: int = MIN_COMPRESS_BYTES) -> Dict[str, int]:
+    """
+    Write .gz (and .br when brotli is installed) siblings for static assets.
+
+    Variants newer than their source are left alone, so repeated builds are cheap.
+    Returns the number of variants written per encoding.
+    """
+    written = {encoding: 0 for encoding in available_encodings()}
+    for path in Path(static_dir).rglob('*'):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        if path.stat().st_size < min_size:
+            continue
+        data = None
+        for encoding in written:
+            variant = path.with_name(path.name + VARIANT_SUFFIXES[encoding])
+            if variant.exists() and variant.stat().st_mtime >= path.stat().st_mtime:
+                continue
+            if data is None:
+                data = path.read_bytes()
+            variant.write_bytes(compress_bytes(data, encoding))
+            written[encoding] += 1
+    return written
+
+
+class CompressedBytesCache:
+    """Small LRU of compressed bodies keyed by (ETag, encoding)."""
+
+    def __init__(self, max_entries: int = _COMPRESSED_CACHE_ENTRIES):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self.max_entries = max_entries
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: tuple, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _variant_is_fresh(source: str, variant: str) -> bool:
+    try:
+        return os.path.getmtime(variant) >= os.path.getmtime(source)
+    except OSError:
+        return False
+
+
+def init_compression(app: Flask, compress_json: bool = True, min_size: int = MIN_COMPRESS_BYTES) -> None:
+    """
+    Serve precompressed static variants and compress large JSON responses.
+    
+    Args:
+        app: Flask application
+        compress_json: Compress JSON on the fly (disable when a CDN/gateway compresses)
+        min_size: Smallest body worth compressing, in bytes
+    """
+    static_folder = app.static_folder
+    compressed_cache = CompressedBytesCache()
+
+    def serve_static(filename):
+        encoding = negotiate_encoding(('br', 'gzip'))
+        if encoding and static_folder:
+            variant = filename + VARIANT_SUFFIXES[encoding]
+            # Ignore variants older than their source (e.g. during `build:web:watch`)
+            if _variant_is_fresh(os.path.join(static_folder, filename), os.path.join(static_folder, variant)):
+                mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                response = send_from_directory(static_folder, variant, mimetype=mimetype)
+                response.headers['Content-Encoding'] = encoding
+                response.vary.add('Accept-Encoding')
+                return response
+        response = app.send_static_file(filename)
+        response.vary.add('Accept-Encoding')
+        return response
+
+    if 'static' in app.view_functions:
+        app.view_functions['static'] = serve_static
+
+    if not compress_json:
+        return
+
+    @app.after_request
+    def compress_json_response(response):
+        try:
+            if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                    or 'Content-Encoding' in response.headers
+                    or response.mimetype != 'application/json'):
+                return response
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            encoding = negotiate_encoding()
+            if not encoding:
+                return response
+            etag, weak = response.get_etag()
+            cache_key = (etag, encoding)
+            body = compressed_cache.get(cache_key) if etag else None
+            if body is None:
+                body = compress_bytes(data, encoding)
+                if etag:
+                    compressed_cache.put(cache_key, body)
+            response.set_data(body)
+            if etag:
+                response.set_etag(encoded_etag(etag, encoding), weak=weak)
+            response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+        except Exception as e:
+            print(f"Warning: Response compression skipped: {e}")
+        return response
+
+
+def main():
+    """Precompress static assets (run after `npm run build:web`)."""
+    static_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).resolve().parent.parent / 'web' / 'static'
+    written = precompress_static(static_dir)
+    print(f"Precompressed static assets in {static_dir}: {written}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,8 @@ Content type detection utilities for identifying hex content types from markdown
 import os
 from typing import Optional
 
+from .markdown_tokenizer import load_markdown
+
 
 def get_hex_content_type(hex_code: str) -> Optional[str]:
     """
@@ -20,13 +22,13 @@ def get_hex_content_type(hex_code: str) -> Optional[str]:
         # Use configurable path from config system
         from backend.config import get_config
         config = get_config()
-        hex_file_path = config.paths.output_path / "hexes" / f"hex_{hex_code}.md"
+        from backend.world_chunks import hex_file_path as resolve_hex_file
+        hex_file_path = resolve_hex_file(config.paths.output_path, hex_code)
         
         if not hex_file_path.exists():
             return None
             
-        with open(hex_file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = load_markdown(hex_file_path).content
             
         # Use centralized markdown parser for more robust detection
         from backend.utils.markdown_parser import determine_hex_type
@@ -55,13 +57,13 @@ def check_hex_has_loot(hex_code: str) -> bool:
         # Use configurable path from config system
         from backend.config import get_config
         config = get_config()
-        hex_file_path = config.paths.output_path / "hexes" / f"hex_{hex_code}.md"
+        from backend.world_chunks import hex_file_path as resolve_hex_file
+        hex_file_path = resolve_hex_file(config.paths.output_path, hex_code)
         
         if not hex_file_path.exists():
             return False
             
-        with open(hex_file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = load_markdown(hex_file_path).content
             
         # Use centralized markdown parser for more robust detection
         from backend.utils.markdown_parser import parse_loot_section
@@ -13,7 +13,14 @@ import json
 import time
 from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
-from backend.config import get_config
+from backend.config import MAX_MAP_DIMENSION, get_config
+
+# Digits per coordinate in hex codes: XXYY up to XXXXYYYY
+MIN_CODE_DIGITS = 2
+MAX_CODE_DIGITS = len(str(MAX_MAP_DIMENSION))
+_HEX_CODE_PATTERN = re.compile(
+    '^(' + '|'.join(rf'\d{{{2 * n}}}' for n in range(MIN_CODE_DIGITS, MAX_CODE_DIGITS + 1)) + ')$'
+)
 
 def setup_project_paths() -> None:
     """Add project root to Python path for imports."""
@@ -22,22 +29,35 @@ def setup_project_paths() -> None:
         sys.path.insert(0, str(project_root))
 
 def validate_hex_code(hex_code: str) -> bool:
-    """Validate hex code format (XXYY)."""
+    """Validate hex code format (XXYY, XXXYYY or XXXXYYYY)."""
     if not isinstance(hex_code, str):
         return False
-    return bool(re.match(r'^\d{4}$', hex_code))
+    return bool(_HEX_CODE_PATTERN.match(hex_code))
 
 def parse_hex_coordinates(hex_code: str) -> Tuple[int, int]:
-    """Parse hex code to x, y coordinates."""
+    """Parse hex code to x, y coordinates (the first half of the digits is x)."""
     if not validate_hex_code(hex_code):
         raise ValueError(f"Invalid hex code format: {hex_code}")
-    x = int(hex_code[:2])
-    y = int(hex_code[2:])
+    half = len(hex_code) // 2
+    x = int(hex_code[:half])
+    y = int(hex_code[half:])
     return x, y
 
-def format_hex_code(x: int, y: int) -> str:
-    """Format x, y coordinates to hex code."""
-    return f"{x:02d}{y:02d}"
+def hex_code_digits(max_coordinate: int) -> int:
+    """Digits per coordinate needed for a map whose largest coordinate is max_coordinate."""
+    if max_coordinate > MAX_MAP_DIMENSION:
+        raise ValueError(f"Maps are limited to {MAX_MAP_DIMENSION} hexes per side, got {max_coordinate}")
+    return max(MIN_CODE_DIGITS, len(str(max_coordinate)))
+
+def format_hex_code(x: int, y: int, digits: int = 2) -> str:
+    """Format x, y coordinates to hex code, zero-padding each to digits."""
+    return f"{x:0{digits}d}{y:0{digits}d}"
+
+def output_dir_for_language(lang: str, base: Optional[Path] = None) -> Path:
+    """World directory served for a language: <output>/<lang>/ when it exists, else <output>."""
+    base = Path(base) if base is not None else get_config().paths.output_path
+    lang_dir = base / lang
+    return lang_dir if lang_dir.exists() else base
 
 def safe_file_write(file_path: Path, content: str, encoding: str = 'utf-8') -> None:
     """Safely write content to file with proper error handling."""
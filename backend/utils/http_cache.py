@@ -0,0 +1,138 @@
+"""
+HTTP conditional request helpers.
+
+Read endpoints describe the exact version of the resource they serve
+(generation version, language, file revision, ...). Those parts are hashed
+into a strong ETag; a matching If-None-Match is answered with 304 before the
+view does any work. Compressed bodies are a different representation, so
+they get their own ETag: the identity one with the encoding appended inside
+the quotes ("<tag>-gz", "<tag>-br").
+"""
+import functools
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from flask import Response, make_response, request
+
+# ETag suffix per content-coding (see backend.utils.compression)
+ENCODING_ETAG_SUFFIXES = {'gzip': '-gz', 'br': '-br'}
+
+
+class RevisionRegistry:
+    """Per-process revision counters for resources edited through the API."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revisions: Dict[str, int] = {}
+
+    def get(self, key: str) -> int:
+        """Current revision of a resource (0 if never bumped)."""
+        return self._revisions.get(key, 0)
+
+    def bump(self, key: str) -> int:
+        """Invalidate a resource by advancing its revision."""
+        with self._lock:
+            self._revisions[key] = self._revisions.get(key, 0) + 1
+            return self._revisions[key]
+
+
+class VersionedCache:
+    """Keeps one value per key and rebuilds it when the key's version changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Any, tuple] = {}
+
+    def get_or_build(self, key: Any, version: Any, builder: Callable[[], Any]) -> Any:
+        """Return the cached value for (key, version), building it on a miss."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        value = builder()
+        with self._lock:
+            self._entries[key] = (version, value)
+        return value
+
+    def invalidate(self) -> None:
+        """Drop every cached value."""
+        with self._lock:
+            self._entries.clear()
+
+
+def file_revision(path: Path) -> str:
+    """Cheap revision of a file from its mtime and size ('missing' if absent)."""
+    try:
+        st = path.stat()
+    except OSError:
+        return 'missing'
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+def build_etag(parts: Sequence[Any]) -> str:
+    """Strong ETag value for the given version parts."""
+    raw = '\x1f'.join(str(p) for p in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:24]
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of the representation of etag compressed with the given content-coding."""
+    return etag + ENCODING_ETAG_SUFFIXES[encoding]
+
+
+def _matching_etag(etag: str) -> Optional[str]:
+    """The If-None-Match entry naming this version in any encoding, or None."""
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag:
+        return etag
+    for candidate in if_none_match.as_set():
+        for suffix in ('',) + tuple(ENCODING_ETAG_SUFFIXES.values()):
+            if candidate == etag + suffix:
+                return candidate
+    return None
+
+
+def _apply_cache_headers(response: Response, etag: str, max_age: int) -> None:
+    response.set_etag(etag)
+    if max_age > 0:
+        response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    else:
+        # Stored but revalidated every time; a 304 costs almost nothing
+        response.headers['Cache-Control'] = 'public, no-cache'
+    response.headers.pop('Pragma', None)
+    response.headers.pop('Expires', None)
+
+
+def conditional(version_parts: Callable[..., Optional[Sequence[Any]]], max_age: int = 0):
+    """
+    Decorate a GET view with ETag validation.
+
+    Args:
+        version_parts: Called with the view's arguments; returns the parts that
+            identify the representation, or None to skip caching.
+        max_age: Seconds the response may be reused without revalidation.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            parts = version_parts(*args, **kwargs)
+            if parts is None:
+                return view(*args, **kwargs)
+            etag = build_etag(parts)
+            matched = _matching_etag(etag)
+            if matched:
+                # Echo the client's tag, so a compressed copy stays validated as compressed
+                not_modified = Response(status=304)
+                _apply_cache_headers(not_modified, matched, max_age)
+                return not_modified
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                _apply_cache_headers(response, etag, max_age)
+            return response
+        return wrapper
+    return decorator
+
+
+# Global registry instance
+revision_registry = RevisionRegistry()
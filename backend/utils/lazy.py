@@ -0,0 +1,50 @@
+"""
+Lazy singletons.
+
+Module-level service instances are wrapped in LazyObject so importing a
+module stays cheap; the instance is built on first attribute access.
+"""
+
+import threading
+from typing import Any, Callable
+
+_UNSET = object()
+
+
+class LazyObject:
+    """Proxy that builds its target with factory() on first use (thread-safe)."""
+
+    __slots__ = ('_factory', '_target', '_lock')
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_target', _UNSET)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _resolve(self) -> Any:
+        target = object.__getattribute__(self, '_target')
+        if target is _UNSET:
+            with object.__getattribute__(self, '_lock'):
+                target = object.__getattribute__(self, '_target')
+                if target is _UNSET:
+                    target = object.__getattribute__(self, '_factory')()
+                    object.__setattr__(self, '_target', target)
+        return target
+
+    @property
+    def is_initialized(self) -> bool:
+        return object.__getattribute__(self, '_target') is not _UNSET
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._resolve(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._resolve(), name)
+
+    def __repr__(self) -> str:
+        if not self.is_initialized:
+            return f"<LazyObject (not initialized) of {object.__getattribute__(self, '_factory')!r}>"
+        return repr(self._resolve())
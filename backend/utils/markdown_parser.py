@@ -2,9 +2,18 @@
 Markdown parsing utilities for extracting structured data from hex content.
 """
 
-import re
 from typing import Dict, Any, Optional
 
+from .markdown_tokenizer import parse_markdown
+
+_COMMON_SECTIONS = (
+    ('encounter', 'encounter'),
+    ('denizen', 'denizen'),
+    ('notable_feature', 'notable_feature'),
+    ('atmosphere', 'atmosphere'),
+    ('npc_details', 'description'),
+)
+
 
 def parse_content_sections(content: str) -> Dict[str, Any]:
     """
@@ -17,27 +26,13 @@ def parse_content_sections(content: str) -> Dict[str, Any]:
         Dictionary containing parsed sections
     """
     data = {}
+    doc = parse_markdown(content)
     
-    # Parse common sections
-    encounter_match = re.search(r'## Encounter\n(.+?)(?:\n##|$)', content, re.DOTALL)
-    if encounter_match:
-        data['encounter'] = encounter_match.group(1).strip()
-    
-    denizen_match = re.search(r'## Denizen\n(.+?)(?:\n##|$)', content, re.DOTALL)
-    if denizen_match:
-        data['denizen'] = denizen_match.group(1).strip()
-    
-    notable_feature_match = re.search(r'## Notable Feature\n(.+?)(?:\n##|$)', content, re.DOTALL)
-    if notable_feature_match:
-        data['notable_feature'] = notable_feature_match.group(1).strip()
-    
-    atmosphere_match = re.search(r'## Atmosphere\n(.+?)(?:\n##|$)', content, re.DOTALL)
-    if atmosphere_match:
-        data['atmosphere'] = atmosphere_match.group(1).strip()
-    
-    description_match = re.search(r'## NPC Details\n(.+?)(?:\n##|$)', content, re.DOTALL)
-    if description_match:
-        data['description'] = description_match.group(1).strip()
+    # Parse common sections (the NPC Details section is the description)
+    for section_key, data_key in _COMMON_SECTIONS:
+        text = doc.section_text(section_key)
+        if text:
+            data[data_key] = text
     
     return data
 
@@ -52,9 +47,8 @@ def parse_loot_section(content: str) -> Optional[Dict[str, str]]:
     Returns:
         Dictionary containing loot data or None if not found
     """
-    loot_match = re.search(r'## Loot Found\n(.+?)(?:\n##|$)', content, re.DOTALL)
-    if loot_match:
-        loot_content = loot_match.group(1).strip()
+    loot_content = parse_markdown(content).section_text('loot_found')
+    if loot_content:
         return {
             'type': 'Unknown',
             'item': 'Unknown item',
@@ -74,10 +68,7 @@ def parse_magical_effect(content: str) -> Optional[str]:
     Returns:
         Magical effect string or None if not found
     """
-    effect_match = re.search(r'## Magical Effect\n(.+?)(?:\n##|$)', content, re.DOTALL)
-    if effect_match:
-        return effect_match.group(1).strip()
-    return None
+    return parse_markdown(content).section_text('magical_effect') or None
 
 
 def extract_title_from_content(content: str) -> str:
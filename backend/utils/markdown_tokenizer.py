@@ -0,0 +1,216 @@
+"""
+Single-pass tokenizer for hex markdown documents.
+
+A hex file is split once into its preamble, ``## Section`` blocks,
+``**Key:** value`` fields and fenced code blocks. Documents are cached by
+content and, for files, by revision (mtime and size), so every parser that
+looks at the same hex shares one tokenization per edit.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .metrics import timed
+
+_HEADER_PATTERN = re.compile(r'^##\s+(.+)$')
+_FIELD_PATTERN = re.compile(r'^\*\*(.+?):\*\*\s*(.+)$')
+_FENCE = '```'
+_CACHE_ENTRIES = 512
+
+
+def normalize_key(label: str) -> str:
+    """'Loot Found' -> 'loot_found'."""
+    return label.strip().lower().replace(' ', '_')
+
+
+@dataclass(slots=True)
+class MarkdownSection:
+    """One ``## Title`` block (the preamble is a section with an empty key)."""
+    title: str
+    key: str
+    lines: List[str] = field(default_factory=list)
+    text_lines: List[str] = field(default_factory=list)
+    fields: Dict[str, Any] = field(default_factory=dict)
+    code_blocks: List[str] = field(default_factory=list)
+    raw_lines: List[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        """Section body as written, stripped."""
+        return '\n'.join(self.lines).strip()
+
+    @property
+    def raw(self) -> str:
+        """Section body without fields and code blocks, stripped."""
+        return '\n'.join(self.raw_lines).strip()
+
+    def field(self, name: str) -> Optional[str]:
+        """First value of a ``**Name:**`` field in this section."""
+        value = self.fields.get(normalize_key(name))
+        return value[0] if isinstance(value, list) else value
+
+
+@dataclass(slots=True)
+class MarkdownDocument:
+    """Tokenized hex document."""
+    content: str
+    preamble: MarkdownSection
+    section_list: List[MarkdownSection]
+    sections: Dict[str, MarkdownSection]
+    fields: Dict[str, str]
+
+    def section(self, key: str) -> Optional[MarkdownSection]:
+        return self.sections.get(key)
+
+    def section_text(self, key: str, default: str = '') -> str:
+        section = self.sections.get(key)
+        return section.text if section else default
+
+    def field(self, *names: str) -> Optional[str]:
+        """First value of a ``**Name:**`` field anywhere in the document."""
+        for name in names:
+            value = self.fields.get(normalize_key(name))
+            if value is not None:
+                return value
+        return None
+
+    @property
+    def code_blocks(self) -> List[str]:
+        """All code blocks in document order."""
+        blocks = list(self.preamble.code_blocks)
+        for section in self.section_list:
+            blocks.extend(section.code_blocks)
+        return blocks
+
+
+@timed('markdown_parse')
+def tokenize_markdown(content: str) -> MarkdownDocument:
+    """Split a hex document into sections, fields and code blocks in one pass."""
+    preamble = MarkdownSection(title='', key='')
+    section_list: List[MarkdownSection] = []
+    sections: Dict[str, MarkdownSection] = {}
+    doc_fields: Dict[str, str] = {}
+    current = preamble
+    in_code = False
+    code_lines: List[str] = []
+
+    for line in content.split('\n'):
+        stripped = line.strip()
+        if stripped.startswith(_FENCE):
+            if in_code:
+                current.code_blocks.append('\n'.join(code_lines))
+                code_lines = []
+            in_code = not in_code
+            current.lines.append(line)
+            continue
+        if in_code:
+            code_lines.append(line)
+            current.lines.append(line)
+            continue
+        header = _HEADER_PATTERN.match(line)
+        if header:
+            title = header.group(1).strip()
+            current = MarkdownSection(title=title, key=normalize_key(title))
+            section_list.append(current)
+            # Repeated headings (e.g. two Loot Found blocks): lookups get the first
+            sections.setdefault(current.key, current)
+            continue
+        current.lines.append(line)
+        current.text_lines.append(line)
+        match = _FIELD_PATTERN.match(stripped)
+        if match:
+            key = normalize_key(match.group(1))
+            value = match.group(2).strip()
+            existing = current.fields.get(key)
+            if existing is None:
+                current.fields[key] = value
+            elif isinstance(existing, list):
+                existing.append(value)
+            else:
+                current.fields[key] = [existing, value]
+            doc_fields.setdefault(key, value)
+        else:
+            current.raw_lines.append(line)
+
+    if in_code and code_lines:
+        # Unterminated fence: keep what was collected
+        current.code_blocks.append('\n'.join(code_lines))
+
+    return MarkdownDocument(
+        content=content,
+        preamble=preamble,
+        section_list=section_list,
+        sections=sections,
+        fields=doc_fields,
+    )
+
+
+class _DocumentCache:
+    """LRU of tokenized documents by content and by file revision."""
+
+    def __init__(self, max_entries: int = _CACHE_ENTRIES):
+        self._lock = threading.Lock()
+        self._by_content: "OrderedDict[str, MarkdownDocument]" = OrderedDict()
+        self._by_path: "OrderedDict[str, Tuple[Tuple[int, int], MarkdownDocument]]" = OrderedDict()
+        self.max_entries = max_entries
+
+    def _put(self, entries: OrderedDict, key: Any, value: Any) -> None:
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def parse(self, content: str) -> MarkdownDocument:
+        with self._lock:
+            doc = self._by_content.get(content)
+            if doc is not None:
+                self._by_content.move_to_end(content)
+                return doc
+        doc = tokenize_markdown(content)
+        with self._lock:
+            self._put(self._by_content, content, doc)
+        return doc
+
+    def load(self, path: Path, encoding: str = 'utf-8') -> MarkdownDocument:
+        key = os.fspath(path)
+        st = os.stat(key)
+        revision = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._by_path.get(key)
+            if entry is not None and entry[0] == revision:
+                self._by_path.move_to_end(key)
+                return entry[1]
+        with timed('file_read'), open(key, 'r', encoding=encoding) as f:
+            content = f.read()
+        doc = self.parse(content)
+        with self._lock:
+            self._put(self._by_path, key, (revision, doc))
+        return doc
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_content.clear()
+            self._by_path.clear()
+
+
+_document_cache = _DocumentCache()
+
+
+def parse_markdown(content: str) -> MarkdownDocument:
+    """Tokenized document for content (cached by content)."""
+    return _document_cache.parse(content)
+
+
+def load_markdown(path: Path) -> MarkdownDocument:
+    """Read and tokenize a hex file (cached until the file changes)."""
+    return _document_cache.load(path)
+
+
+def clear_markdown_cache() -> None:
+    """Drop every cached document."""
+    _document_cache.clear()
@@ -0,0 +1,193 @@
+"""
+Timing instrumentation with Prometheus-style histograms.
+
+Enabled with HEXY_METRICS=1 (read at import). When disabled, ``timed`` returns
+decorated functions unchanged and a shared no-op context manager, so
+instrumented hot paths cost nothing.
+
+    @timed('generate_content', content_type='sea')
+    def _generate_sea_content(...): ...
+
+    with timed('hex_file_write'):
+        ...
+
+Histograms are exposed at /api/metrics in the Prometheus text format.
+"""
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask, g, request
+
+METRICS_ENABLED = os.getenv('HEXY_METRICS', '0').lower() in ('1', 'true', 'yes')
+METRIC_PREFIX = 'hexy_'
+
+# Seconds; from sub-millisecond hex lookups up to full-map generation
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds."""
+
+    __slots__ = ('buckets', 'counts', 'total', 'count', '_lock')
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += seconds
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.total, self.count
+
+
+class MetricsRegistry:
+    """Histograms keyed by metric name and label set."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelSet, Histogram]] = {}
+
+    def histogram(self, name: str, labels: Optional[Dict[str, str]] = None) -> Histogram:
+        label_set: LabelSet = tuple(sorted((labels or {}).items()))
+        series = self._histograms.get(name)
+        if series is not None:
+            hist = series.get(label_set)
+            if hist is not None:
+                return hist
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            return series.setdefault(label_set, Histogram())
+
+    def observe(self, name: str, seconds: float, labels: Optional[Dict[str, str]] = None) -> None:
+        self.histogram(name, labels).observe(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def render_prometheus(self) -> str:
+        """All histograms in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            families = {name: dict(series) for name, series in sorted(self._histograms.items())}
+        for name, series in families.items():
+            metric = f"{METRIC_PREFIX}{name}_seconds"
+            lines.append(f"# HELP {metric} Duration of {name.replace('_', ' ')} in seconds.")
+            lines.append(f"# TYPE {metric} histogram")
+            for label_set, hist in sorted(series.items()):
+                counts, total, count = hist.snapshot()
+                base = [f'{k}="{_escape(v)}"' for k, v in label_set]
+                cumulative = 0
+                for bound, n in zip(list(hist.buckets) + [float('inf')], counts):
+                    cumulative += n
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    bucket_labels = ','.join(base + ['le="%s"' % le])
+                    lines.append(f"{metric}_bucket{{{bucket_labels}}} {cumulative}")
+                suffix = f"{{{','.join(base)}}}" if base else ''
+                lines.append(f"{metric}_sum{suffix} {total:.6f}")
+                lines.append(f"{metric}_count{suffix} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Timer:
+    """Context manager and decorator recording one histogram sample per use."""
+
+    __slots__ = ('name', 'labels', '_start')
+
+    def __init__(self, name: str, labels: Dict[str, str]):
+        self.name = name
+        self.labels = labels
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registry.observe(self.name, time.perf_counter() - self._start, self.labels)
+        return False
+
+    def __call__(self, func):
+        hist = registry.histogram(self.name, self.labels)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                hist.observe(time.perf_counter() - start)
+        return wrapper
+
+
+class _NullTimer:
+    """Stand-in used when metrics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __call__(self, func):
+        return func
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timed(name: str, **labels: str):
+    """Time a block or function into the histogram ``hexy_<name>_seconds``."""
+    if not METRICS_ENABLED:
+        return _NULL_TIMER
+    return _Timer(name, labels)
+
+
+def init_metrics(app: Flask) -> None:
+    """Record the duration of every request by route, method and status."""
+    if not METRICS_ENABLED:
+        return
+
+    @app.before_request
+    def _start_request_timer():
+        g.hexy_request_start = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        start = g.pop('hexy_request_start', None)
+        if start is not None:
+            # Route templates, not raw paths, keep label cardinality bounded
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            registry.observe('http_request', time.perf_counter() - start, {
+                'route': route,
+                'method': request.method,
+                'status': str(response.status_code),
+            })
+        return response
+
+
+# Global registry instance
+registry = MetricsRegistry()
@@ -0,0 +1,234 @@
+"""
+Opt-in per-request profiling with cProfile.
+
+Selected requests run under cProfile; the top-N functions of each run are kept
+in a per-endpoint ring buffer and the full stats can be dumped as .pstats files
+(readable with ``python -m pstats`` or snakeviz). Profiling can be switched on,
+off and re-targeted at runtime through the admin endpoints, without a restart.
+
+    HEXY_PROFILE=1                          # start with profiling enabled
+    HEXY_PROFILE_ROUTES=/,/api/city-context/*   # fnmatch patterns (route rule or path)
+    HEXY_PROFILE_TOP=30                     # functions kept per run
+    HEXY_PROFILE_KEEP=20                    # runs kept per endpoint
+    HEXY_PROFILE_DIR=/tmp/hexy-profiles     # where dumps are written
+
+cProfile only sees the request thread; work handed to thread pools is counted
+as time spent waiting on it.
+"""
+
+import cProfile
+import itertools
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+from collections import deque
+from fnmatch import fnmatchcase
+from typing import Any, Deque, Dict, List, Optional
+
+from flask import Flask, g, request
+
+ENV_TRUE = ('1', 'true', 'yes')
+ENV_FALSE = ('0', 'false', 'no')
+
+
+def _parse_flag(value: Any) -> bool:
+    """A JSON boolean or one of the HEXY_PROFILE strings; anything else is rejected."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        if value.strip().lower() in ENV_TRUE:
+            return True
+        if value.strip().lower() in ENV_FALSE:
+            return False
+    raise ValueError(f"enabled must be true or false, not {value!r}")
+
+
+def _env_patterns(value: str) -> List[str]:
+    return [p.strip() for p in value.split(',') if p.strip()]
+
+
+class RequestProfiler:
+    """Profiles matching requests and keeps recent results per endpoint."""
+
+    def __init__(self):
+        self.enabled = os.getenv('HEXY_PROFILE', '0').lower() in ENV_TRUE
+        self.patterns: List[str] = _env_patterns(os.getenv('HEXY_PROFILE_ROUTES', ''))
+        self.top_n = int(os.getenv('HEXY_PROFILE_TOP', '30'))
+        self.keep = int(os.getenv('HEXY_PROFILE_KEEP', '20'))
+        self.dump_dir = os.getenv('HEXY_PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'hexy-profiles')
+        self._lock = threading.Lock()
+        self._runs: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._ids = itertools.count(1)
+
+    # ----- configuration -----
+
+    def configure(self, enabled: Optional[bool] = None, routes: Optional[List[str]] = None,
+                  top_n: Optional[int] = None, keep: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Change settings at runtime; unspecified values are left alone.
+
+        Raises ValueError (changing nothing) when a value is invalid.
+        """
+        # Validate everything first so a bad value never leaves half-applied settings
+        if enabled is not None:
+            enabled = _parse_flag(enabled)
+        if routes is not None:
+            routes = [str(p) for p in routes if str(p).strip()]
+        if top_n is not None:
+            top_n = max(1, int(top_n))
+        if keep is not None:
+            keep = max(1, int(keep))
+        with self._lock:
+            if enabled is not None:
+                self.enabled = enabled
+            if routes is not None:
+                self.patterns = routes
+            if top_n is not None:
+                self.top_n = top_n
+            if keep is not None and keep != self.keep:
+                self.keep = keep
+                self._runs = {key: deque(runs, maxlen=self.keep) for key, runs in self._runs.items()}
+        return self.settings()
+
+    def settings(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'routes': list(self.patterns),
+            'top_n': self.top_n,
+            'keep': self.keep,
+            'dump_dir': self.dump_dir,
+        }
+
+    def should_profile(self, rule: Optional[str], path: str) -> bool:
+        if not self.enabled:
+            return False
+        if not self.patterns:
+            return True
+        return any(fnmatchcase(path, p) or (rule is not None and fnmatchcase(rule, p)) for p in self.patterns)
+
+    # ----- recording -----
+
+    def record(self, endpoint: str, profile: cProfile.Profile, path: str,
+               status: int, duration: float) -> Dict[str, Any]:
+        stats = pstats.Stats(profile)
+        stats.sort_stats('cumulative')
+        top = []
+        for func in stats.fcn_list[:self.top_n]:
+            primitive, ncalls, tottime, cumtime, _ = stats.stats[func]
+            filename, line, name = func
+            top.append({
+                'function': f"{_short_path(filename)}:{line}({name})",
+                'ncalls': ncalls if ncalls == primitive else f"{ncalls}/{primitive}",
+                'tottime': round(tottime, 6),
+                'cumtime': round(cumtime, 6),
+            })
+        run = {
+            'id': next(self._ids),
+            'endpoint': endpoint,
+            'path': path,
+            'status': status,
+            'duration_ms': round(duration * 1000, 3),
+            'timestamp': time.time(),
+            'total_calls': stats.total_calls,
+            'top': top,
+            '_stats': stats.stats,
+        }
+        with self._lock:
+            self._runs.setdefault(endpoint, deque(maxlen=self.keep)).append(run)
+        return run
+
+    def runs(self, endpoint: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Recorded runs per endpoint (newest last), without the raw stats."""
+        with self._lock:
+            selected = {key: list(runs) for key, runs in self._runs.items()
+                        if endpoint is None or key == endpoint}
+        return {key: [_public(run) for run in runs] for key, runs in selected.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._runs.clear()
+
+    def dump(self, endpoint: Optional[str] = None, run_id: Optional[int] = None) -> List[str]:
+        """Write matching runs as .pstats files and return their paths."""
+        with self._lock:
+            selected = [run for key, runs in self._runs.items() for run in runs
+                        if (endpoint is None or key == endpoint) and (run_id is None or run['id'] == run_id)]
+        os.makedirs(self.dump_dir, exist_ok=True)
+        paths = []
+        for run in selected:
+            name = run['endpoint'] + ('index' if run['endpoint'].endswith('/') else '')
+            slug = '_'.join(part for part in re.split(r'[^A-Za-z0-9]+', name) if part)
+            path = os.path.join(self.dump_dir, f"{run['id']:06d}_{slug}.pstats")
+            stats = pstats.Stats()
+            stats.stats = run['_stats']
+            stats.dump_stats(path)
+            paths.append(path)
+        return paths
+
+
+def _public(run: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in run.items() if not k.startswith('_')}
+
+
+def _short_path(filename: str) -> str:
+    """Trim file paths to the package-relative part for readability."""
+    for marker in (os.sep + 'backend' + os.sep, os.sep + 'site-packages' + os.sep):
+        index = filename.rfind(marker)
+        if index != -1:
+            return filename[index + 1:]
+    return filename
+
+
+def init_profiling(app: Flask) -> None:
+    """Profile matching requests.
+
+    The hooks are always installed, so profiling can be switched on at runtime
+    however the app was started; while it is off they return after one check
+    (RequestProfiler.should_profile). Only the admin endpoints need HEXY_ADMIN_TOKEN.
+    """
+    @app.before_request
+    def _start_profile():
+        rule = request.url_rule.rule if request.url_rule is not None else None
+        if not profiler.should_profile(rule, request.path):
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return
+        g.hexy_profile = (profile, time.perf_counter())
+
+    def _finish(status: int) -> Optional[Dict[str, Any]]:
+        active = g.pop('hexy_profile', None)
+        if active is None:
+            return None
+        profile, start = active
+        profile.disable()
+        duration = time.perf_counter() - start
+        rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        try:
+            return profiler.record(f"{request.method} {rule}", profile, request.path, status, duration)
+        except Exception as e:
+            print(f"⚠️  Failed to record profile for {request.path}: {e}")
+            return None
+
+    @app.after_request
+    def _stop_profile(response):
+        run = _finish(response.status_code)
+        if run is not None:
+            response.headers['X-Hexy-Profile-Id'] = str(run['id'])
+        return response
+
+    @app.teardown_request
+    def _abort_profile(exc):
+        # after_request is skipped on unhandled errors
+        if exc is not None:
+            _finish(500)
+
+
+# Global profiler instance
+profiler = RequestProfiler()
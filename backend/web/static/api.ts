@@ -1,5 +1,5 @@
 // web/static/api.ts
-import { apiGet, apiPost, apiPut, handleApiError } from './utils/apiUtils.js';
+import { apiGet, apiGetCached, apiPost, apiPut, handleApiError } from './utils/apiUtils.js';
 import { SandboxStore } from './utils/sandboxStore.js';
 import { DataStore } from './utils/dataStore.js';
 import { getCurrentLanguage } from './translations.js';
@@ -27,7 +27,7 @@ export async function getHex(hexCode: string): Promise<any> {
       };
     }
     // Fallback: fetch once from API, then store markdown if present
-    const server = await apiGet<any>(`api/hex/${hexCode}`);
+    const server = await apiGetCached<any>(`api/hex/${hexCode}`);
     if (server && typeof server.raw_markdown === 'string') {
       await DataStore.setHexMarkdown(lang, hexCode, server.raw_markdown);
     }
@@ -53,7 +53,7 @@ export async function getCity(hexCode: string): Promise<any> {
     const lang = getCurrentLanguage();
     const cached = await DataStore.getCity(lang, hexCode);
     if (cached) return cached;
-    const data = await apiGet(`api/city/${hexCode}`);
+    const data = await apiGetCached(`api/city/${hexCode}`);
     await DataStore.setCity(lang, hexCode, data);
     return data;
   } catch (error) {
@@ -66,7 +66,7 @@ export async function getSettlement(hexCode: string): Promise<any> {
     const lang = getCurrentLanguage();
     const cached = await DataStore.getSettlement(lang, hexCode);
     if (cached) return cached;
-    const data = await apiGet(`api/settlement/${hexCode}`);
+    const data = await apiGetCached(`api/settlement/${hexCode}`);
     await DataStore.setSettlement(lang, hexCode, data);
     return data;
   } catch (error) {
@@ -138,6 +138,15 @@ export async function importZip(file: File): Promise<any> {
   return res.json();
 }
 
+// Map tiles: compact symbol/class/flag arrays for one square of the map (see backend/map_tiles.py)
+export async function getMapTile(z: number, x: number, y: number): Promise<any> {
+  const data: any = await apiGetCached(`api/map/tiles/${z}/${x}/${y}`);
+  if (!data || !data.success) {
+    throw new Error(data?.error || `Failed to load map tile ${z}/${x}/${y}`);
+  }
+  return data;
+}
+
 // City Overlay API Functions
 export async function getCityOverlays(): Promise<any> {
   try {
@@ -150,7 +159,7 @@ export async function getCityOverlays(): Promise<any> {
 
 export async function getCityOverlay(overlayName: string): Promise<any> {
   try {
-    return await apiGet(`api/city-overlay/${overlayName}`);
+    return await apiGetCached(`api/city-overlay/${overlayName}`);
   } catch (error) {
     console.error('Error fetching city overlay:', error);
     throw error;
@@ -159,7 +168,7 @@ export async function getCityOverlay(overlayName: string): Promise<any> {
 
 export async function getCityOverlayAscii(overlayName: string): Promise<any> {
   try {
-    return await apiGet(`api/city-overlay/${overlayName}/ascii`);
+    return await apiGetCached(`api/city-overlay/${overlayName}/ascii`);
   } catch (error) {
     console.error('Error fetching city overlay ASCII:', error);
     throw error;
@@ -168,7 +177,7 @@ export async function getCityOverlayAscii(overlayName: string): Promise<any> {
 
 export async function getCityContext(cityName: string): Promise<any> {
   try {
-    return await apiGet(`api/city-context/${cityName}`);
+    return await apiGetCached(`api/city-context/${cityName}`);
   } catch (error) {
     console.error('Error fetching city context:', error);
     throw error;
@@ -177,7 +186,7 @@ export async function getCityContext(cityName: string): Promise<any> {
 
 export async function getCityOverlayHex(overlayName: string, hexId: string): Promise<any> {
   try {
-    return await apiGet(`api/city-overlay/${overlayName}/hex/${hexId}`);
+    return await apiGetCached(`api/city-overlay/${overlayName}/hex/${hexId}`);
   } catch (error) {
     console.error('Error fetching city overlay hex:', error);
     throw error;
@@ -1,8 +1,9 @@
 // web/static/main.ts
 import { getCityOverlay, getCityOverlayHex, updateHex } from "./api.js"
-import { apiGet, apiPost } from './utils/apiUtils.js'
+import { apiGetCached, apiPost } from './utils/apiUtils.js'
 import { showHexDetails as renderHexDetails, showCityDetails, showSettlementDetails } from "./hexViewer.js"
 import { renderMap } from "./mapRenderer.js"
+import type { MapTilesMeta } from "./mapRenderer.js"
 import { initializeControls } from "./controls.js"
 import { showNotification, showError } from "./uiUtils.js"
 import { showCityOverlayGrid } from './cityOverlays.js';
@@ -53,6 +54,7 @@ class DyingLandsApp {
   public mapData: { [key: string]: HexData } = {}
   public mapWidth = 30
   public mapHeight = 25
+  public mapTiles: MapTilesMeta | null = null
   private currentView: "world" | "city" = "world"
   private currentCityOverlay: CityOverlayData | null = null
   private selectedCityHex: string | null = null
@@ -88,6 +90,17 @@ class DyingLandsApp {
       }
     }
 
+    // Tile metadata: when present the map is loaded tile by tile for the viewport
+    const mapTilesElement = document.getElementById("map-tiles")
+    if (mapTilesElement) {
+      try {
+        const meta = JSON.parse(mapTilesElement.textContent || "null")
+        if (meta && meta.tiles) this.mapTiles = meta
+      } catch (error) {
+        console.error("❌ Failed to parse map tile metadata:", error)
+      }
+    }
+
     // Initialize components
     this.initializeEventListeners()
     // Try to hydrate map from sandbox; fallback to server-rendered mapData
@@ -203,7 +216,7 @@ class DyingLandsApp {
       console.log('🔍 showCityHexDetails called with:', { overlayName, hexId });
       
       // Call the API directly to get enriched hex data
-      const data: any = await apiGet(`api/city-overlay/${overlayName}/hex/${hexId}`);
+      const data: any = await apiGetCached(`api/city-overlay/${overlayName}/hex/${hexId}`);
       console.log('📦 API response:', data);
       
       if (data.success && data.hex) {
@@ -936,8 +949,10 @@ The world is dying, but adventure lives on.
 
   private renderWorldMap(): void {
     renderMap(this)
-    // Persist the current map locally for sandboxing
-    void SandboxStore.saveWorldMap(this.mapData)
+    // Persist the current map locally for sandboxing (tiled maps fill mapData as tiles load)
+    if (Object.keys(this.mapData).length) {
+      void SandboxStore.saveWorldMap(this.mapData)
+    }
   }
 
   public showCityDetailsInMap(hexCode: string): void {
@@ -964,7 +979,12 @@ The world is dying, but adventure lives on.
         console.log("Saved content preview:", savedContent.substring(0, 100));
         
         // Check if the saved content is just hex grid content or full zoom container content
-        if (savedContent.includes('<div class="hex-row">')) {
+        if (savedContent.includes('class="hex-tile"')) {
+          console.log("Detected tiled map content, re-rendering visible tiles");
+          // Tiles are positioned for the live grid, so rebuild it rather than restoring markup
+          mapZoomContainer.innerHTML = `<div class="hex-grid" id="hexGrid" aria-label="Hex Map Grid"></div>`;
+          this.renderWorldMap();
+        } else if (savedContent.includes('<div class="hex-row">')) {
           console.log("Detected hex grid content");
           // It's hex grid content, so we need to wrap it properly
           const hexGrid = mapZoomContainer.querySelector('#hexGrid');
@@ -1031,7 +1051,7 @@ The world is dying, but adventure lives on.
     const ensureMarkdownBlock = async (): Promise<HTMLElement | null> => {
       if (markdownContent) return markdownContent;
       try {
-        const data: any = await apiGet(`api/hex/${hexCode}`);
+        const data: any = await apiGetCached(`api/hex/${hexCode}`);
         if (data && data.raw_markdown) {
           const block = document.createElement('div');
           block.className = 'markdown-content';
@@ -1472,6 +1492,8 @@ const ZOOM_STEP = 0.1;
       // Use transform3d for hardware acceleration
       mapZoomContainer.style.transform = `scale3d(${currentZoom}, ${currentZoom}, 1)`;
       mapZoomContainer.style.transformOrigin = 'top left';
+      // Lets the tiled map renderer load tiles that zooming out brought into view
+      mapZoomContainer.dispatchEvent(new Event('mapzoom'));
     }
     // Update global zoom state
     (window as any).currentZoom = currentZoom;
@@ -1,7 +1,53 @@
 // web/static/mapRenderer.ts
 import { DyingLandsApp, HexData } from './main.js';
+import { getMapTile } from './api.js';
 
-export { renderMapGrid as renderMap };
+export { renderWorld as renderMap };
+
+interface MapTilesMeta {
+  map_width: number
+  map_height: number
+  code_digits: number
+  tile_size: number
+  max_zoom: number
+  tiles: { [zoom: string]: [number, number] }
+  classes: string[]
+  flags: { content: number; city: number; settlement: number; pending: number }
+}
+
+interface MapTile {
+  z: number
+  x: number
+  y: number
+  x0: number
+  y0: number
+  step: number
+  width: number
+  height: number
+  symbols: string
+  classes: number[]
+  flags: number[]
+  cities: { [cell: string]: string }
+}
+
+export type { MapTilesMeta, MapTile };
+
+// Room above the first row for floating city name labels
+const LABEL_SPACE = 30;
+// Tiles around the visible ones that are loaded ahead of scrolling
+const TILE_MARGIN = 1;
+
+/**
+ * Render the world map: tile by tile for the visible part of the map when the
+ * page provides tile metadata, otherwise the whole grid from app.mapData.
+ */
+export function renderWorld(app: DyingLandsApp) {
+  if (app.mapTiles) {
+    renderTiledMap(app, app.mapTiles);
+  } else {
+    renderMapGrid(app);
+  }
+}
 
 export function renderMapGrid(app: DyingLandsApp) {
   const grid = document.getElementById('hexGrid');
@@ -13,45 +59,254 @@ export function renderMapGrid(app: DyingLandsApp) {
     rowDiv.className = 'hex-row';
     for (let x = 1; x <= app.mapWidth; x++) {
       const hexCode = x.toString().padStart(2, '0') + y.toString().padStart(2, '0');
-      const hex: HexData = app.mapData[hexCode];
-      
-      // Create hex container for positioning
-      const hexContainer = document.createElement('div');
-      hexContainer.className = 'hex-container';
-      hexContainer.setAttribute('data-hex', hexCode);
-      
-      const span = document.createElement('span');
-      span.className = 'hex-cell';
-      span.setAttribute('data-hex', hexCode);
-      span.tabIndex = 0;
-      
-      if (hex) {
-        hex.css_class.split(' ').forEach((cls: string) => {
-          if (cls) span.classList.add(cls);
-        });
-        if (hex.is_city) span.classList.add('major-city');
-        if (hex.content_type === 'settlement') span.classList.add('settlement');
-        if (hex.has_content) span.classList.add('has-content');
-        span.textContent = hex.symbol;
-        span.title = hex.is_city ? `HEX ${hexCode} - ${hex.city_name}` : `HEX ${hexCode}`;
-        
-        // Add floating city name if it's a city
-        if (hex.is_city && hex.city_name) {
-          const cityName = document.createElement('div');
-          cityName.className = 'city-name-label';
-          cityName.textContent = hex.city_name;
-          cityName.title = hex.city_name;
-          hexContainer.appendChild(cityName);
+      rowDiv.appendChild(createHexContainer(hexCode, app.mapData[hexCode]));
+    }
+    grid.appendChild(rowDiv);
+  }
+}
+
+function createHexContainer(hexCode: string, hex: HexData | undefined): HTMLElement {
+  // Create hex container for positioning
+  const hexContainer = document.createElement('div');
+  hexContainer.className = 'hex-container';
+  hexContainer.setAttribute('data-hex', hexCode);
+
+  const span = document.createElement('span');
+  span.className = 'hex-cell';
+  span.setAttribute('data-hex', hexCode);
+  span.tabIndex = 0;
+
+  if (hex) {
+    hex.css_class.split(' ').forEach((cls: string) => {
+      if (cls) span.classList.add(cls);
+    });
+    if (hex.is_city) span.classList.add('major-city');
+    if (hex.content_type === 'settlement') span.classList.add('settlement');
+    if (hex.has_content) span.classList.add('has-content');
+    span.textContent = hex.symbol;
+    span.title = hex.is_city ? `HEX ${hexCode} - ${hex.city_name}` : `HEX ${hexCode}`;
+
+    // Add floating city name if it's a city
+    if (hex.is_city && hex.city_name) {
+      const cityName = document.createElement('div');
+      cityName.className = 'city-name-label';
+      cityName.textContent = hex.city_name;
+      cityName.title = hex.city_name;
+      hexContainer.appendChild(cityName);
+    }
+  } else {
+    span.classList.add('terrain-unknown', 'no-content');
+    span.textContent = '?';
+    span.title = `HEX ${hexCode}`;
+  }
+
+  hexContainer.appendChild(span);
+  return hexContainer;
+}
+
+// ===== TILED RENDERING =====
+
+interface HexGeometry {
+  pitchX: number     // horizontal distance between hexes of a row
+  shiftX: number     // offset of even rows
+  oddToEven: number  // vertical step from an odd row to the next (even) row
+  evenToOdd: number  // vertical step from an even row to the next (odd) row
+  cellWidth: number
+  cellHeight: number
+}
+
+/**
+ * Measure where the honeycomb CSS puts hexes, from a hidden three-row probe,
+ * so absolutely placed tiles line up exactly with the row layout (including
+ * the tablet and mobile breakpoints).
+ */
+function measureGeometry(): HexGeometry {
+  const probe = document.createElement('div');
+  probe.className = 'hex-grid';
+  probe.style.cssText = 'position:absolute;left:-10000px;top:0;visibility:hidden;';
+  const cells: HTMLElement[][] = [];
+  for (let row = 0; row < 3; row++) {
+    const rowDiv = document.createElement('div');
+    rowDiv.className = 'hex-row';
+    cells.push([]);
+    for (let col = 0; col < 2; col++) {
+      const container = createHexContainer('probe', undefined);
+      rowDiv.appendChild(container);
+      cells[row].push(container);
+    }
+    probe.appendChild(rowDiv);
+  }
+  document.body.appendChild(probe);
+  const rect = (row: number, col: number) => cells[row][col].getBoundingClientRect();
+  const origin = rect(0, 0);
+  const geometry: HexGeometry = {
+    pitchX: rect(0, 1).left - origin.left,
+    shiftX: rect(1, 0).left - origin.left,
+    oddToEven: rect(1, 0).top - origin.top,
+    evenToOdd: rect(2, 0).top - rect(1, 0).top,
+    cellWidth: origin.width,
+    cellHeight: origin.height,
+  };
+  probe.remove();
+  return geometry;
+}
+
+function hexLeft(g: HexGeometry, x: number, y: number): number {
+  return (x - 1) * g.pitchX + (y % 2 === 0 ? g.shiftX : 0);
+}
+
+function hexTop(g: HexGeometry, y: number): number {
+  const pairs = Math.floor((y - 1) / 2);
+  return LABEL_SPACE + pairs * (g.oddToEven + g.evenToOdd) + ((y - 1) % 2 === 1 ? g.oddToEven : 0);
+}
+
+let activeRenderer: TiledMapRenderer | null = null;
+
+export function renderTiledMap(app: DyingLandsApp, meta: MapTilesMeta) {
+  const grid = document.getElementById('hexGrid');
+  if (!grid) return;
+  if (activeRenderer) activeRenderer.detach();
+  activeRenderer = new TiledMapRenderer(app, meta, grid);
+  activeRenderer.update();
+}
+
+/**
+ * Keeps the tiles under the map viewport loaded. Tiles are fetched at zoom 0
+ * (one cell per hex) once and kept; decoded hexes are merged into
+ * app.mapData so hex clicks work as with the inline map.
+ */
+class TiledMapRenderer {
+  private geometry: HexGeometry;
+  private loaded = new Map<string, HTMLElement>();
+  private pending = new Set<string>();
+  private scheduled = false;
+  private viewport: HTMLElement | null;
+  private onChange = () => this.schedule();
+
+  constructor(private app: DyingLandsApp, private meta: MapTilesMeta, private grid: HTMLElement) {
+    this.geometry = measureGeometry();
+    const g = this.geometry;
+    grid.innerHTML = '';
+    grid.classList.add('hex-grid-tiled');
+    grid.style.width = `${hexLeft(g, meta.map_width, 2) + g.cellWidth}px`;
+    grid.style.height = `${hexTop(g, meta.map_height) + g.cellHeight}px`;
+
+    this.viewport = document.getElementById('map-container');
+    const scroller = document.getElementById('map-zoom-container');
+    scroller?.addEventListener('scroll', this.onChange, { passive: true });
+    // Zooming out can bring unloaded tiles into view
+    scroller?.addEventListener('mapzoom', this.onChange);
+    window.addEventListener('resize', this.onChange);
+  }
+
+  detach() {
+    const scroller = document.getElementById('map-zoom-container');
+    scroller?.removeEventListener('scroll', this.onChange);
+    scroller?.removeEventListener('mapzoom', this.onChange);
+    window.removeEventListener('resize', this.onChange);
+  }
+
+  private schedule() {
+    if (this.scheduled) return;
+    this.scheduled = true;
+    requestAnimationFrame(() => {
+      this.scheduled = false;
+      this.update();
+    });
+  }
+
+  /** Load every tile intersecting the visible part of the grid (plus a margin). */
+  update() {
+    // The grid may have been replaced (city overlays swap the map container content)
+    if (!this.grid.isConnected) {
+      this.detach();
+      return;
+    }
+    const view = (this.viewport || this.grid).getBoundingClientRect();
+    const gridRect = this.grid.getBoundingClientRect();
+    const scale = this.grid.offsetWidth ? gridRect.width / this.grid.offsetWidth : 1;
+    const left = (Math.max(view.left, gridRect.left) - gridRect.left) / scale;
+    const right = (Math.min(view.right, gridRect.right) - gridRect.left) / scale;
+    const top = (Math.max(view.top, gridRect.top) - gridRect.top) / scale;
+    const bottom = (Math.min(view.bottom, gridRect.bottom) - gridRect.top) / scale;
+    if (right <= left || bottom <= top) return;
+
+    const g = this.geometry;
+    const rowPitch = (g.oddToEven + g.evenToOdd) / 2;
+    const x0 = Math.max(1, Math.floor((left - g.shiftX) / g.pitchX));
+    const x1 = Math.min(this.meta.map_width, Math.ceil(right / g.pitchX) + 1);
+    const y0 = Math.max(1, Math.floor((top - LABEL_SPACE) / rowPitch));
+    const y1 = Math.min(this.meta.map_height, Math.ceil((bottom - LABEL_SPACE) / rowPitch) + 2);
+
+    const size = this.meta.tile_size;
+    const [tilesX, tilesY] = this.meta.tiles['0'];
+    const tx0 = Math.max(0, Math.floor((x0 - 1) / size) - TILE_MARGIN);
+    const tx1 = Math.min(tilesX - 1, Math.floor((x1 - 1) / size) + TILE_MARGIN);
+    const ty0 = Math.max(0, Math.floor((y0 - 1) / size) - TILE_MARGIN);
+    const ty1 = Math.min(tilesY - 1, Math.floor((y1 - 1) / size) + TILE_MARGIN);
+    for (let ty = ty0; ty <= ty1; ty++) {
+      for (let tx = tx0; tx <= tx1; tx++) {
+        void this.loadTile(tx, ty);
+      }
+    }
+  }
+
+  private async loadTile(tx: number, ty: number) {
+    const key = `${tx}/${ty}`;
+    if (this.loaded.has(key) || this.pending.has(key)) return;
+    this.pending.add(key);
+    try {
+      const tile = await getMapTile(0, tx, ty);
+      this.addTile(key, tile);
+    } catch (error) {
+      console.warn(`Failed to load map tile ${key}:`, error);
+    } finally {
+      this.pending.delete(key);
+    }
+  }
+
+  private addTile(key: string, tile: MapTile) {
+    if (this.loaded.has(key) || !this.grid.isConnected) return;
+    const g = this.geometry;
+    const { flags: bits, classes } = this.meta;
+    const symbols = Array.from(tile.symbols);
+    const tileDiv = document.createElement('div');
+    tileDiv.className = 'hex-tile';
+    tileDiv.setAttribute('data-tile', key);
+    const digits = this.meta.code_digits;
+
+    for (let row = 0; row < tile.height; row++) {
+      for (let col = 0; col < tile.width; col++) {
+        const i = row * tile.width + col;
+        const x = tile.x0 + col;
+        const y = tile.y0 + row;
+        const hexCode = x.toString().padStart(digits, '0') + y.toString().padStart(digits, '0');
+        const flags = tile.flags[i];
+        const cssClass = classes[tile.classes[i]] || 'terrain-unknown';
+        let hex: HexData | undefined;
+        if (flags & bits.pending) {
+          hex = this.app.mapData[hexCode];
+        } else {
+          hex = {
+            x,
+            y,
+            terrain: cssClass.startsWith('terrain-') ? cssClass.slice('terrain-'.length) : 'unknown',
+            symbol: symbols[i],
+            is_city: Boolean(flags & bits.city),
+            city_name: tile.cities[String(i)],
+            has_content: Boolean(flags & bits.content),
+            content_type: flags & bits.settlement ? 'settlement' : undefined,
+            css_class: cssClass,
+          };
+          this.app.mapData[hexCode] = hex;
         }
-      } else {
-        span.classList.add('terrain-unknown', 'no-content');
-        span.textContent = '?';
-        span.title = `HEX ${hexCode}`;
+        const container = createHexContainer(hexCode, hex);
+        container.style.left = `${hexLeft(g, x, y)}px`;
+        container.style.top = `${hexTop(g, y)}px`;
+        tileDiv.appendChild(container);
       }
-      
-      hexContainer.appendChild(span);
-      rowDiv.appendChild(hexContainer);
     }
-    grid.appendChild(rowDiv);
+    this.grid.appendChild(tileDiv);
+    this.loaded.set(key, tileDiv);
   }
-} 
\ No newline at end of file
+}
@@ -85,6 +85,18 @@ export async function apiGet<T>(url: string): Promise<T> {
   return apiCall<T>(`${url}${buster}`);
 }
 
+/**
+ * GET request for versioned resources served with an ETag.
+ * Skips the cache-busting param so the browser can revalidate with
+ * If-None-Match and reuse its copy on 304.
+ *
+ * @param url - API endpoint URL
+ * @returns Promise with response data
+ */
+export async function apiGetCached<T>(url: string): Promise<T> {
+  return apiCall<T>(url, { cache: 'no-cache' });
+}
+
 /**
  * POST request with error handling.
  * 
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Chunked world layout for The Dying Lands.
+
+Large maps are split into chunk_size x chunk_size blocks of hexes. Chunk
+(cx, cy) covers columns 1 + cx * chunk_size .. and rows 1 + cy * chunk_size ..,
+clipped to the map. Each chunk is generated, stored and served on its own:
+
+    <output>/chunks/manifest.json          # map size, chunk size, code digits
+    <output>/chunks/<cx>_<cy>/hex_<code>.md
+    <output>/chunks/<cx>_<cy>/index.json   # terrain and type of every hex
+
+so generating or serving part of the map only reads and writes the chunks it
+touches. Hex codes keep the XXYY scheme, widened to XXXYYY or XXXXYYYY when a
+map dimension needs more than two digits (see backend.utils.core_utils).
+
+Small maps keep the flat hexes/hex_<code>.md layout; hex_file_path() resolves
+a hex code to its file in either layout.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from backend.config import MapConfig, get_config
+from backend.utils.core_utils import format_hex_code, hex_code_digits
+
+CHUNKS_DIR = 'chunks'
+MANIFEST_NAME = 'manifest.json'
+INDEX_NAME = 'index.json'
+LAYOUT_VERSION = 1
+
+
+class ChunkLayout:
+    """Geometry of a chunked map: which chunk holds a hex and which hexes a chunk holds."""
+
+    def __init__(self, width: int, height: int, chunk_size: int = 32, digits: Optional[int] = None):
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        self.digits = digits or hex_code_digits(max(width, height))
+        self.chunks_x = -(-width // chunk_size)
+        self.chunks_y = -(-height // chunk_size)
+
+    @classmethod
+    def from_config(cls, map_config: Optional[MapConfig] = None) -> 'ChunkLayout':
+        map_config = map_config or get_config().map
+        return cls(map_config.width, map_config.height, map_config.chunk_size, map_config.code_digits)
+
+    @property
+    def chunk_count(self) -> int:
+        return self.chunks_x * self.chunks_y
+
+    # ----- hex codes -----
+
+    def hex_code(self, x: int, y: int) -> str:
+        return format_hex_code(x, y, self.digits)
+
+    def parse(self, hex_code: str) -> Tuple[int, int]:
+        """(x, y) of a hex code; raises ValueError for malformed codes."""
+        if len(hex_code) != 2 * self.digits or not hex_code.isdigit():
+            raise ValueError(f"Invalid hex code for a {self.width}x{self.height} map: {hex_code}")
+        return int(hex_code[:self.digits]), int(hex_code[self.digits:])
+
+    def contains(self, x: int, y: int) -> bool:
+        return 1 <= x <= self.width and 1 <= y <= self.height
+
+    # ----- chunks -----
+
+    def contains_chunk(self, cx: int, cy: int) -> bool:
+        return 0 <= cx < self.chunks_x and 0 <= cy < self.chunks_y
+
+    def chunk_of(self, x: int, y: int) -> Tuple[int, int]:
+        return (x - 1) // self.chunk_size, (y - 1) // self.chunk_size
+
+    def chunk_of_code(self, hex_code: str) -> Tuple[int, int]:
+        return self.chunk_of(*self.parse(hex_code))
+
+    def bounds(self, cx: int, cy: int) -> Tuple[int, int, int, int]:
+        """(x0, y0, width, height) of a chunk, clipped to the map."""
+        if not self.contains_chunk(cx, cy):
+            raise ValueError(f"Chunk {cx},{cy} is outside the {self.chunks_x}x{self.chunks_y} chunk grid")
+        x0 = 1 + cx * self.chunk_size
+        y0 = 1 + cy * self.chunk_size
+        return x0, y0, min(self.chunk_size, self.width - x0 + 1), min(self.chunk_size, self.height - y0 + 1)
+
+    def hex_codes(self, cx: int, cy: int) -> Iterator[str]:
+        """Hex codes of a chunk, column by column."""
+        x0, y0, width, height = self.bounds(cx, cy)
+        for x in range(x0, x0 + width):
+            for y in range(y0, y0 + height):
+                yield self.hex_code(x, y)
+
+    def chunks(self) -> Iterator[Tuple[int, int]]:
+        for cy in range(self.chunks_y):
+            for cx in range(self.chunks_x):
+                yield cx, cy
+
+    def chunks_in_rect(self, x0: int, y0: int, x1: int, y1: int) -> List[Tuple[int, int]]:
+        """Chunks overlapping the hex rectangle [x0, x1] x [y0, y1] (inclusive, clipped)."""
+        x0, y0 = max(1, x0), max(1, y0)
+        x1, y1 = min(self.width, x1), min(self.height, y1)
+        if x0 > x1 or y0 > y1:
+            return []
+        (cx0, cy0), (cx1, cy1) = self.chunk_of(x0, y0), self.chunk_of(x1, y1)
+        return [(cx, cy) for cy in range(cy0, cy1 + 1) for cx in range(cx0, cx1 + 1)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': LAYOUT_VERSION,
+            'map_width': self.width,
+            'map_height': self.height,
+            'chunk_size': self.chunk_size,
+            'code_digits': self.digits,
+            'chunks_x': self.chunks_x,
+            'chunks_y': self.chunks_y,
+        }
+
+
+def _write_json_atomic(path: Path, data: Any) -> None:
+    """Write JSON next to path and rename it over, so readers never see half a file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class ChunkStore:
+    """Per-chunk hex files and indexes of one world output directory."""
+
+    def __init__(self, output_dir, layout: ChunkLayout):
+        self.output_dir = Path(output_dir)
+        self.layout = layout
+        self.root = self.output_dir / CHUNKS_DIR
+
+    def chunk_dir(self, cx: int, cy: int) -> Path:
+        return self.root / f"{cx}_{cy}"
+
+    def hex_path(self, hex_code: str) -> Path:
+        return self.chunk_dir(*self.layout.chunk_of_code(hex_code)) / f"hex_{hex_code}.md"
+
+    def index_path(self, cx: int, cy: int) -> Path:
+        return self.chunk_dir(cx, cy) / INDEX_NAME
+
+    def is_generated(self, cx: int, cy: int) -> bool:
+        return self.index_path(cx, cy).exists()
+
+    def load_index(self, cx: int, cy: int) -> Optional[Dict[str, Any]]:
+        """The chunk's index, or None if the chunk has not been generated."""
+        try:
+            with open(self.index_path(cx, cy), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Unreadable chunk index {cx},{cy}: {e}")
+            return None
+
+    def write_index(self, cx: int, cy: int, hexes: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        x0, y0, width, height = self.layout.bounds(cx, cy)
+        index = {
+            'chunk': [cx, cy],
+            'bounds': [x0, y0, width, height],
+            'hexes': hexes,
+        }
+        _write_json_atomic(self.index_path(cx, cy), index)
+        return index
+
+    def update_entry(self, hex_code: str, entry: Optional[Dict[str, Any]]) -> bool:
+        """Replace (or with None, drop) one hex of its chunk's index; False if the chunk has none."""
+        cx, cy = self.layout.chunk_of_code(hex_code)
+        index = self.load_index(cx, cy)
+        if index is None:
+            return False
+        hexes = index.get('hexes', {})
+        if entry is None:
+            hexes.pop(hex_code, None)
+        else:
+            hexes[hex_code] = entry
+        self.write_index(cx, cy, hexes)
+        return True
+
+    def iter_entries(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(hex_code, index entry) of every hex of every generated chunk."""
+        for cx, cy in self.generated_chunks():
+            index = self.load_index(cx, cy) or {}
+            yield from index.get('hexes', {}).items()
+
+    def generated_chunks(self) -> List[Tuple[int, int]]:
+        """Chunks that have an index on disk."""
+        found = []
+        if not self.root.exists():
+            return found
+        for entry in self.root.iterdir():
+            cx, _, cy = entry.name.partition('_')
+            if cx.isdigit() and cy.isdigit() and (entry / INDEX_NAME).exists():
+                found.append((int(cx), int(cy)))
+        return sorted(found, key=lambda c: (c[1], c[0]))
+
+    def write_manifest(self) -> Dict[str, Any]:
+        manifest = self.layout.to_dict()
+        _write_json_atomic(self.root / MANIFEST_NAME, manifest)
+        return manifest
+
+    def load_manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.root / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+def world_layout(map_config: Optional[MapConfig] = None) -> Optional[ChunkLayout]:
+    """The configured chunk layout, or None when the map uses the flat layout."""
+    map_config = map_config or get_config().map
+    return ChunkLayout.from_config(map_config) if map_config.chunked else None
+
+
+def hex_file_path(output_dir, hex_code: str, layout: Optional[ChunkLayout] = None) -> Path:
+    """Markdown file of a hex in the configured layout (chunked or flat hexes/)."""
+    layout = layout or world_layout()
+    if layout is not None:
+        try:
+            return ChunkStore(output_dir, layout).hex_path(hex_code)
+        except ValueError:
+            pass
+    return Path(output_dir) / 'hexes' / f"hex_{hex_code}.md"
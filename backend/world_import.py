@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+World import for The Dying Lands.
+
+An uploaded world ZIP (the layout written by /api/export) is spooled to disk
+in chunks, validated from its central directory, extracted member by member
+into a sibling staging directory and renamed into place. The request only
+spools and validates; extraction, the swap and the rebuild of the in-process
+indexes run as a background ImportJob whose progress can be polled.
+
+    HEXY_IMPORT_MAX_BYTES=536870912    # upload and extracted size limit (default 512 MiB)
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+from backend.world_chunks import CHUNKS_DIR, MANIFEST_NAME
+
+CHUNK_SIZE = 1024 * 1024
+MAX_IMPORT_BYTES = int(os.getenv('HEXY_IMPORT_MAX_BYTES', str(512 * 1024 * 1024)))
+MAX_MEMBERS = 100_000
+# Deflate rarely exceeds ~20:1 on markdown; far beyond that is a zip bomb
+MAX_COMPRESSION_RATIO = 200
+EXPORT_ROOT = 'dying_lands_output'
+JOBS_KEPT = 20
+
+
+class ImportValidationError(ValueError):
+    """The upload is not an importable world archive."""
+
+
+def spool_upload(stream: BinaryIO, dest: Path, max_bytes: int = MAX_IMPORT_BYTES) -> int:
+    """Copy an upload stream to dest in chunks, never holding it in memory."""
+    written = 0
+    with open(dest, 'wb') as out:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > max_bytes:
+                raise ImportValidationError(f'Upload exceeds {max_bytes} bytes')
+            out.write(chunk)
+    if written == 0:
+        raise ImportValidationError('Upload is empty')
+    return written
+
+
+def inspect_archive(zip_path: Path, max_bytes: int = MAX_IMPORT_BYTES) -> Dict[str, Any]:
+    """
+    Validate a world archive from its central directory, without extracting.
+
+    Returns:
+        {'prefix': str, 'members': [ZipInfo, ...], 'hexes': int, 'chunked': bool, 'bytes': int}
+    """
+    if not zipfile.is_zipfile(zip_path):
+        raise ImportValidationError('File is not a ZIP archive')
+    with zipfile.ZipFile(zip_path) as zf:
+        infos = [info for info in zf.infolist() if not info.is_dir()]
+    if not infos:
+        raise ImportValidationError('Archive appears empty')
+    if len(infos) > MAX_MEMBERS:
+        raise ImportValidationError(f'Archive has more than {MAX_MEMBERS} files')
+
+    # Exports nest everything under dying_lands_output/; bare worlds are accepted too
+    prefix = f'{EXPORT_ROOT}/' if all(i.filename.startswith(f'{EXPORT_ROOT}/') for i in infos) else ''
+    members: List[zipfile.ZipInfo] = []
+    total = 0
+    hexes = 0
+    chunked = False
+    for info in infos:
+        relative = PurePosixPath(info.filename[len(prefix):])
+        if relative.is_absolute() or '..' in relative.parts or '\\' in info.filename:
+            raise ImportValidationError(f'Unsafe path in archive: {info.filename}')
+        if info.flag_bits & 0x1:
+            raise ImportValidationError('Encrypted archives are not supported')
+        if info.compress_size and info.file_size / info.compress_size > MAX_COMPRESSION_RATIO:
+            raise ImportValidationError(f'Suspicious compression ratio for {info.filename}')
+        total += info.file_size
+        if total > max_bytes:
+            raise ImportValidationError(f'Archive expands to more than {max_bytes} bytes')
+        parts = relative.parts
+        if relative.name.startswith('hex_') and relative.suffix == '.md' and (
+                (len(parts) == 2 and parts[0] == 'hexes') or (len(parts) == 3 and parts[0] == CHUNKS_DIR)):
+            hexes += 1
+        elif parts == (CHUNKS_DIR, MANIFEST_NAME):
+            chunked = True
+        members.append(info)
+    # A chunked world is valid before any of its chunks has been generated
+    if hexes == 0 and not chunked:
+        raise ImportValidationError(f'Archive contains no hexes/hex_*.md files or {CHUNKS_DIR}/{MANIFEST_NAME}')
+    return {'prefix': prefix, 'members': members, 'hexes': hexes, 'chunked': chunked, 'bytes': total}
+
+
+def extract_archive(zip_path: Path, staging: Path, inspection: Dict[str, Any],
+                    progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """Extract the validated members into staging, reporting (done, total) as it goes."""
+    prefix = inspection['prefix']
+    members = inspection['members']
+    staging_root = staging.resolve()
+    with zipfile.ZipFile(zip_path) as zf:
+        for done, info in enumerate(members, 1):
+            dest = (staging / info.filename[len(prefix):]).resolve()
+            if staging_root not in dest.parents:
+                raise ImportValidationError(f'Unsafe path in archive: {info.filename}')
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            with zf.open(info, 'r') as src, open(dest, 'wb') as dst:
+                copied = 0
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    copied += len(chunk)
+                    # The central directory can lie about sizes
+                    if copied > info.file_size:
+                        raise ImportValidationError(f'{info.filename} is larger than declared')
+                    dst.write(chunk)
+            if progress:
+                progress(done, len(members))
+    return len(members)
+
+
+def swap_into_place(staging: Path, output_dir: Path) -> Optional[Path]:
+    """
+    Rename staging to output_dir, moving the previous world aside as a backup.
+
+    Both renames are within one directory, so no reader ever sees a partly
+    extracted world, but output_dir is briefly missing between them: a read
+    in that window finds no world rather than the old one. The old world is
+    restored if the second rename fails. The caller removes the backup once
+    the new world is in use.
+    """
+    backup = None
+    if output_dir.exists():
+        backup = output_dir.parent / f"{output_dir.name}.bak-{int(time.time())}"
+        os.replace(output_dir, backup)
+    try:
+        os.replace(staging, output_dir)
+    except OSError:
+        if backup is not None:
+            os.replace(backup, output_dir)
+        raise
+    return backup
+
+
+class ImportJob:
+    """Progress of one import: extracting -> swapping -> indexing -> done | failed."""
+
+    def __init__(self, archive: Path, output_dir: Path, inspection: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:12]
+        self.archive = archive
+        self.output_dir = output_dir
+        self.inspection = inspection
+        self.state = 'queued'
+        self.progress = 0.0
+        self.message = ''
+        self.error: Optional[str] = None
+        self.backup: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ('done', 'failed')
+
+    def update(self, state: str, progress: float, message: str = '') -> None:
+        self.state = state
+        self.progress = round(progress, 3)
+        self.message = message
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'state': self.state,
+            'progress': self.progress,
+            'message': self.message,
+            'error': self.error,
+            'files': len(self.inspection['members']),
+            'hexes': self.inspection['hexes'],
+            'bytes': self.inspection['bytes'],
+            'backup': self.backup,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class ImportJobRegistry:
+    """Runs one import at a time in a background thread and remembers recent jobs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: 'OrderedDict[str, ImportJob]' = OrderedDict()
+        self._active: Optional[ImportJob] = None
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        return self._jobs.get(job_id)
+
+    def active(self) -> Optional[ImportJob]:
+        job = self._active
+        return job if job is not None and not job.finished else None
+
+    def start(self, archive: Path, output_dir: Path, inspection: Dict[str, Any],
+              swap_lock: threading.Lock, rebuild: Callable[[Path, ImportJob], None]) -> ImportJob:
+        """
+        Queue an import of a validated archive.
+
+        swap_lock serializes the swap with other writers of output_dir;
+        rebuild(output_dir, job) refreshes in-process state after the swap.
+        """
+        with self._lock:
+            if self.active() is not None:
+                raise RuntimeError('Another import is already running')
+            job = ImportJob(archive, output_dir, inspection)
+            self._jobs[job.id] = job
+            while len(self._jobs) > JOBS_KEPT:
+                self._jobs.popitem(last=False)
+            self._active = job
+        thread = threading.Thread(target=self._run, args=(job, swap_lock, rebuild),
+                                  name=f'hexy-import-{job.id}', daemon=True)
+        thread.start()
+        return job
+
+    def _run(self, job: ImportJob, swap_lock: threading.Lock,
+             rebuild: Callable[[Path, ImportJob], None]) -> None:
+        output_dir = job.output_dir
+        output_dir.parent.mkdir(parents=True, exist_ok=True)
+        staging = output_dir.parent / f"{output_dir.name}.staging-import-{job.id}"
+        try:
+            # Extraction is 0-70%, the rebuild reports 80-100%
+            job.update('extracting', 0.0, 'Extracting archive')
+            extract_archive(job.archive, staging, job.inspection,
+                            lambda done, total: job.update('extracting', 0.7 * done / total,
+                                                           f'Extracted {done}/{total} files'))
+            job.update('swapping', 0.75, 'Replacing world')
+            with swap_lock:
+                backup = swap_into_place(staging, output_dir)
+            job.backup = str(backup) if backup else None
+            job.update('indexing', 0.8, 'Rebuilding indexes')
+            rebuild(output_dir, job)
+            # Only a failed rebuild leaves the previous world behind (reported as job.backup)
+            if backup is not None:
+                shutil.rmtree(backup, ignore_errors=True)
+                job.backup = None
+            job.update('done', 1.0, f"Imported {job.inspection['hexes']} hexes")
+        except Exception as e:
+            job.error = str(e)
+            job.update('failed', job.progress, 'Import failed')
+            print(f"❌ World import {job.id} failed: {e}")
+        finally:
+            job.finished_at = time.time()
+            shutil.rmtree(staging, ignore_errors=True)
+            shutil.rmtree(job.archive.parent, ignore_errors=True)
+
+
+def new_upload_dir() -> Path:
+    """Temporary directory holding one spooled upload (removed when its job ends)."""
+    return Path(tempfile.mkdtemp(prefix='hexy-import-'))
+
+
+# Global registry instance
+import_jobs = ImportJobRegistry()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+World revision shared by every process serving a world directory.
+
+Each gunicorn worker keeps its own view of the world (parsed hexes, the
+search index, rendered map payloads). The process that changes the world on
+disk records the change in <output>/world_revision.json:
+
+    {"world": "5f0c2a9e", "edits": 12}
+
+world is a fresh id whenever a new world is swapped into place (cold boot,
+import, restore from a world store); edits counts hex writes to that world.
+Together with version.json's generation version they make up the revision
+string. Workers compare it with the revision they last loaded (two stats per
+check) and reload when it changed; the map and hex ETags include it, so
+validators change in every worker at once.
+"""
+
+import json
+import os
+import secrets
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+# Serializes edit counters across processes (POSIX only; the desktop app runs one process)
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    fcntl = None
+    FCNTL_AVAILABLE = False
+
+REVISION_NAME = 'world_revision.json'
+VERSION_NAME = 'version.json'
+
+
+def _stamp(path: Path) -> str:
+    # Writes replace the file, so the inode changes even within one mtime tick
+    try:
+        st = path.stat()
+    except OSError:
+        return 'missing'
+    return f"{st.st_ino:x}-{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+def _read_json(path: Path) -> Dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+class WorldRevision:
+    """Revision of the world stored in one output directory."""
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self._lock = threading.Lock()
+        self._cached: Tuple[Tuple[str, str], str] = (('', ''), '')
+
+    @property
+    def path(self) -> Path:
+        return self.output_dir / REVISION_NAME
+
+    def current(self) -> str:
+        """'<generation>:<world>:<edits>' of the world on disk; files are re-read only when they change."""
+        version_file = self.output_dir / VERSION_NAME
+        stamp = (_stamp(version_file), _stamp(self.path))
+        cached_stamp, revision = self._cached
+        if stamp == cached_stamp:
+            return revision
+        generation = str(_read_json(version_file).get('version') or '')
+        state = _read_json(self.path)
+        revision = f"{generation}:{state.get('world', '')}:{int(state.get('edits', 0) or 0)}"
+        self._cached = (stamp, revision)
+        return revision
+
+    def bump(self) -> Tuple[str, str]:
+        """Record a hex write; returns the revisions before and after it."""
+        with self._locked():
+            before = self.current()
+            state = _read_json(self.path)
+            state['edits'] = int(state.get('edits', 0) or 0) + 1
+            self._write(state)
+            return before, self.current()
+
+    def reset(self) -> str:
+        """Record that a new world was swapped into place; returns its revision."""
+        with self._locked():
+            self._write({'world': secrets.token_hex(4), 'edits': 0})
+            return self.current()
+
+    def _write(self, state: Dict) -> None:
+        tmp = self.path.with_name(f".{REVISION_NAME}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(state), encoding='utf-8')
+        os.replace(tmp, self.path)
+
+    def _locked(self):
+        # Next to the world, like the cold-boot lock, so it survives world swaps and stays out of exports
+        lock_file = self.output_dir.parent / f".{self.output_dir.name}.revision.lock"
+        return _FileLock(lock_file, self._lock)
+
+
+class _FileLock:
+    """Thread lock plus an flock on a lock file, so read-modify-write is atomic across workers."""
+
+    def __init__(self, path: Path, thread_lock: threading.Lock):
+        self.path = path
+        self.thread_lock = thread_lock
+        self._file = None
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        if FCNTL_AVAILABLE:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a')
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            except OSError:
+                self._file = None
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+            finally:
+                self._file.close()
+                self._file = None
+        self.thread_lock.release()
+        return False
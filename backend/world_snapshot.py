@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+World Snapshots for The Dying Lands
+A prebuilt world (hexes, city overlays, NPCs, version manifest) packed into a
+single tar.gz, so serverless cold starts extract a world instead of generating one.
+
+Build:   python -m backend.world_snapshot build [--generate] [--output-dir DIR] SNAPSHOT
+Inspect: python -m backend.world_snapshot info SNAPSHOT
+
+Only the standard library is imported here: the Lambda handler restores the
+world before the app (and HexService) is imported.
+"""
+
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import tarfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SNAPSHOT_NAME = 'world_snapshot.tar.gz'
+MANIFEST_NAME = 'snapshot.json'
+# Generation leftovers that must never be packed
+_SKIPPED_PREFIXES = ('.', )
+_SKIPPED_MARKERS = ('.staging-', '.bak-', '.generating')
+# Chunked maps (backend.world_chunks, not imported here) keep hexes in chunks/<cx>_<cy>/
+_CHUNKS_DIR = 'chunks'
+_CHUNK_MANIFEST = 'manifest.json'
+
+
+def snapshot_candidates() -> List[Path]:
+    """Where a snapshot is looked for, in order: HEXY_WORLD_SNAPSHOT, /tmp, the package root."""
+    candidates = []
+    env_path = os.getenv('HEXY_WORLD_SNAPSHOT')
+    if env_path:
+        candidates.append(Path(env_path))
+    candidates.append(Path('/tmp') / SNAPSHOT_NAME)
+    candidates.append(Path(__file__).resolve().parent.parent / SNAPSHOT_NAME)
+    return candidates
+
+
+def find_snapshot() -> Optional[Path]:
+    """First existing snapshot, if any."""
+    for path in snapshot_candidates():
+        if path.is_file():
+            return path
+    return None
+
+
+def world_exists(output_dir: Path) -> bool:
+    """True when output_dir already holds generated hexes or a chunked map."""
+    output_dir = Path(output_dir)
+    hexes_dir = output_dir / 'hexes'
+    try:
+        if hexes_dir.is_dir() and any(hexes_dir.glob('hex_*.md')):
+            return True
+        # Chunks are generated on demand, so a chunked world may not have any hexes yet
+        return (output_dir / _CHUNKS_DIR / _CHUNK_MANIFEST).is_file()
+    except OSError:
+        return False
+
+
+def _count_hexes(output_dir: Path) -> int:
+    """Hex files of the world, in either layout."""
+    return (sum(1 for _ in output_dir.glob('hexes/hex_*.md'))
+            + sum(1 for _ in output_dir.glob(f'{_CHUNKS_DIR}/*/hex_*.md')))
+
+
+def _skip(name: str) -> bool:
+    return name.startswith(_SKIPPED_PREFIXES) or any(marker in name for marker in _SKIPPED_MARKERS)
+
+
+def build_snapshot(output_dir: Path, snapshot_path: Path) -> Dict[str, Any]:
+    """
+    Pack a generated world directory into a snapshot.
+
+    Args:
+        output_dir: World directory (the app's output path)
+        snapshot_path: Archive to write (.tar.gz)
+
+    Returns:
+        The snapshot manifest
+    """
+    output_dir = Path(output_dir)
+    if not world_exists(output_dir):
+        raise FileNotFoundError(f"No generated world in {output_dir}")
+
+    version = {}
+    version_file = output_dir / 'version.json'
+    if version_file.exists():
+        try:
+            version = json.loads(version_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            version = {}
+    manifest = {
+        'format': 1,
+        'created_at': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+        'generation_version': version.get('version'),
+        'hex_count': _count_hexes(output_dir),
+    }
+
+    snapshot_path = Path(snapshot_path)
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_name(snapshot_path.name + '.tmp')
+    with tarfile.open(tmp_path, 'w:gz', compresslevel=6) as tar:
+        data = json.dumps(manifest, indent=2).encode('utf-8')
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        tar.addfile(info, io.BytesIO(data))
+        for child in sorted(output_dir.iterdir()):
+            if not _skip(child.name):
+                tar.add(child, arcname=child.name, filter=lambda info: None if _skip(Path(info.name).name) else info)
+    os.replace(tmp_path, snapshot_path)
+    return manifest
+
+
+def read_manifest(snapshot_path: Path) -> Dict[str, Any]:
+    """Manifest of a snapshot without extracting it."""
+    with tarfile.open(snapshot_path, 'r:gz') as tar:
+        member = tar.extractfile(MANIFEST_NAME)
+        return json.loads(member.read().decode('utf-8')) if member else {}
+
+
+def restore_snapshot(snapshot_path: Path, output_dir: Path) -> Dict[str, Any]:
+    """
+    Extract a snapshot into output_dir.
+
+    The archive is unpacked into a sibling staging directory and renamed into
+    place, so a concurrent reader never sees a half-extracted world.
+    """
+    output_dir = Path(output_dir)
+    output_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = output_dir.parent / f"{output_dir.name}.staging-{os.getpid()}-{int(time.time())}"
+    try:
+        with tarfile.open(snapshot_path, 'r:gz') as tar:
+            if hasattr(tarfile, 'data_filter'):
+                tar.extractall(staging, filter='data')
+            else:
+                tar.extractall(staging)
+        manifest_file = staging / MANIFEST_NAME
+        manifest = json.loads(manifest_file.read_text(encoding='utf-8')) if manifest_file.exists() else {}
+        manifest_file.unlink(missing_ok=True)
+        if output_dir.exists():
+            shutil.rmtree(output_dir, ignore_errors=True)
+        os.replace(staging, output_dir)
+        return manifest
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def ensure_world(output_dir: Path) -> Dict[str, Any]:
+    """
+    Make sure output_dir holds a world, restoring the first snapshot found.
+
+    Returns:
+        {'source': 'existing' | 'snapshot' | 'missing', ...}
+    """
+    output_dir = Path(output_dir)
+    if world_exists(output_dir):
+        return {'source': 'existing', 'output_dir': str(output_dir)}
+    snapshot = find_snapshot()
+    if snapshot is None:
+        return {'source': 'missing', 'output_dir': str(output_dir)}
+    manifest = restore_snapshot(snapshot, output_dir)
+    return {'source': 'snapshot', 'snapshot': str(snapshot), 'output_dir': str(output_dir), **manifest}
+
+
+def _generate_world() -> Path:
+    """Generate a world into the configured output path (the same generation as a cold boot)."""
+    from backend.config import get_config
+    from backend.main_map_generator import generate_world
+    from backend.translation_system import translation_system
+    config = get_config()
+    generate_world(config.paths.output_path, translation_system.language, config.supported_languages)
+    return config.paths.output_path
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Build or inspect world snapshots.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='Pack a generated world into a snapshot')
+    build.add_argument('snapshot', nargs='?', default=SNAPSHOT_NAME)
+    build.add_argument('--output-dir', help='World directory (default: the configured output path)')
+    build.add_argument('--generate', action='store_true', help='Generate a world first if none exists')
+    info = sub.add_parser('info', help='Print the manifest of a snapshot')
+    info.add_argument('snapshot')
+    args = parser.parse_args(argv)
+
+    if args.command == 'info':
+        print(json.dumps(read_manifest(Path(args.snapshot)), indent=2))
+        return 0
+
+    if args.output_dir:
+        output_dir = Path(args.output_dir)
+    elif args.generate:
+        output_dir = _generate_world()
+    else:
+        from backend.config import get_config
+        output_dir = get_config().paths.output_path
+    try:
+        manifest = build_snapshot(output_dir, Path(args.snapshot))
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"✅ Wrote {args.snapshot}: {manifest['hex_count']} hexes (version {manifest['generation_version']})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
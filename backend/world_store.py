@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+World Storage for The Dying Lands
+Pluggable storage for a generated world (hexes, city overlays, NPCs, manifests).
+
+Keys are POSIX paths relative to the world root ('hexes/hex_0101.md',
+'version.json'). Three backends share one interface:
+
+- LocalWorldStore:   a directory on disk (the default output directory)
+- ArchiveWorldStore: a packed, read-only zip (e.g. one made by /api/export)
+- S3WorldStore:      an S3-compatible bucket prefix (AWS, MinIO, moto server)
+
+Every store returned by get_world_store() is wrapped in a read-through memory
+cache, revalidated against the store's revision of each key. The app serves
+from a local directory: on a cold start the world is materialized from a
+shared store instead of being generated, and generated or edited content is
+published back to it. Hex reads go through the store, so an edit made on one
+instance is served by all of them.
+
+Configure with HEXY_WORLD_STORE:
+    local (default)            the configured output directory
+    archive:/path/world.zip    a packed archive
+    s3://bucket/prefix         an S3 bucket (AWS_S3_ENDPOINT_URL for custom endpoints)
+"""
+
+import os
+import shutil
+import threading
+import time
+import zipfile
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional, Tuple
+
+from backend.world_chunks import CHUNKS_DIR, MANIFEST_NAME, ChunkLayout, hex_file_path
+from backend.world_import import swap_into_place
+
+# Generation leftovers that are never part of a world
+_SKIPPED_MARKERS = ('.staging-', '.bak-', '.generating', '.tmp')
+_TRANSFER_WORKERS = 16
+_CACHE_ENTRIES = 4096
+_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Remote revisions cost a request; one checked this recently is trusted
+_REMOTE_REVISION_TTL = float(os.getenv('HEXY_WORLD_STORE_REVALIDATE_SECONDS', '1'))
+
+
+def hex_key(hex_code: str, layout: Optional[ChunkLayout] = None) -> str:
+    """Store key of a hex file, in the configured layout (chunked or flat hexes/)."""
+    return hex_file_path(Path('.'), hex_code, layout).as_posix()
+
+
+def _normalize_key(key: str) -> str:
+    """Reject absolute keys and '..' so a key can never leave the world root."""
+    path = PurePosixPath(key.replace('\\', '/'))
+    if path.is_absolute() or '..' in path.parts:
+        raise ValueError(f"Invalid world key: {key}")
+    return str(path)
+
+
+def _skipped(key: str) -> bool:
+    return any(part.startswith('.') or any(m in part for m in _SKIPPED_MARKERS)
+               for part in PurePosixPath(key).parts)
+
+
+class WorldStore(ABC):
+    """Interface of a world store; subclasses implement the byte-level methods."""
+
+    read_only = False
+
+    @abstractmethod
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Content of key, or None if absent."""
+
+    @abstractmethod
+    def put_bytes(self, key: str, data: bytes) -> None:
+        """Create or replace key."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove key (no error if absent)."""
+
+    @abstractmethod
+    def list_keys(self, prefix: str = '') -> List[str]:
+        """All keys starting with prefix, sorted."""
+
+    @abstractmethod
+    def revision(self, key: str) -> Optional[str]:
+        """Cheap version token of key (changes when its content does), or None if absent."""
+
+    def local_root(self) -> Optional[Path]:
+        """Directory backing this store, if it is a plain local directory."""
+        return None
+
+    # ----- Convenience API -----
+
+    def exists(self, key: str) -> bool:
+        return self.revision(key) is not None
+
+    def get_text(self, key: str) -> Optional[str]:
+        data = self.get_bytes(key)
+        return data.decode('utf-8') if data is not None else None
+
+    def put_text(self, key: str, text: str) -> None:
+        self.put_bytes(key, text.encode('utf-8'))
+
+    def read_hex(self, hex_code: str) -> Optional[str]:
+        """Markdown of a hex, or None if it was never generated."""
+        return self.get_text(hex_key(hex_code))
+
+    def write_hex(self, hex_code: str, content: str) -> None:
+        self.put_text(hex_key(hex_code), content)
+
+    def list_hex_codes(self) -> List[str]:
+        """Codes of the stored hexes, in either layout."""
+        codes = []
+        for key in self.list_keys('hexes/') + self.list_keys(f'{CHUNKS_DIR}/'):
+            name = PurePosixPath(key).name
+            if name.startswith('hex_') and name.endswith('.md'):
+                codes.append(name[len('hex_'):-len('.md')])
+        return codes
+
+    def has_world(self) -> bool:
+        """True when the store holds generated hexes or a chunked map."""
+        return bool(self.list_hex_codes()) or self.exists(f'{CHUNKS_DIR}/{MANIFEST_NAME}')
+
+    # ----- Whole-world transfer -----
+
+    def materialize(self, target_dir: Path) -> int:
+        """
+        Copy the whole world into a local directory; returns the number of files.
+
+        Files are written to a sibling staging directory which is swapped into
+        place like an import (see world_import.swap_into_place), so the target
+        never holds half a world and the old one survives a failed swap.
+        """
+        target_dir = Path(target_dir)
+        root = self.local_root()
+        if root is not None and root.resolve() == target_dir.resolve():
+            return 0
+        keys = [k for k in self.list_keys() if not _skipped(k)]
+        if not keys:
+            return 0
+        staging = target_dir.parent / f"{target_dir.name}.staging-store-{os.getpid()}"
+        shutil.rmtree(staging, ignore_errors=True)
+
+        def fetch(key: str) -> None:
+            data = self.get_bytes(key)
+            if data is None:
+                return
+            dest = staging / key
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_bytes(data)
+
+        try:
+            with ThreadPoolExecutor(max_workers=_TRANSFER_WORKERS) as pool:
+                list(pool.map(fetch, keys))
+            backup = swap_into_place(staging, target_dir)
+            if backup is not None:
+                shutil.rmtree(backup, ignore_errors=True)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return len(keys)
+
+    def publish(self, source_dir: Path, subdir: str = '') -> int:
+        """
+        Copy every file of a local world directory into this store; returns the count.
+
+        subdir limits the copy to one part of the world (a directory such as
+        'chunks/3_4', or a single file).
+        """
+        source_dir = Path(source_dir)
+        if self.read_only:
+            raise PermissionError("World store is read-only")
+        root = self.local_root()
+        if root is not None and root.resolve() == source_dir.resolve():
+            return 0
+        base = source_dir / _normalize_key(subdir) if subdir else source_dir
+        candidates = [base] if base.is_file() else base.rglob('*')
+        files = [p for p in candidates
+                 if p.is_file() and not _skipped(p.relative_to(source_dir).as_posix())]
+
+        def push(path: Path) -> None:
+            self.put_bytes(path.relative_to(source_dir).as_posix(), path.read_bytes())
+
+        with ThreadPoolExecutor(max_workers=_TRANSFER_WORKERS) as pool:
+            list(pool.map(push, files))
+        return len(files)
+
+    def fetch(self, target_dir: Path, subdir: str) -> int:
+        """
+        Copy one part of the world (a directory such as 'chunks/3_4', or a single
+        file) into a local world directory; returns the number of files.
+        """
+        target_dir = Path(target_dir)
+        root = self.local_root()
+        if root is not None and root.resolve() == target_dir.resolve():
+            return 0
+        subdir = _normalize_key(subdir)
+        keys = [k for k in self.list_keys(subdir)
+                if (k == subdir or k.startswith(subdir + '/')) and not _skipped(k)]
+
+        def pull(key: str) -> None:
+            data = self.get_bytes(key)
+            if data is None:
+                return
+            dest = target_dir / key
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_bytes(data)
+
+        with ThreadPoolExecutor(max_workers=_TRANSFER_WORKERS) as pool:
+            list(pool.map(pull, keys))
+        return len(keys)
+
+
+class LocalWorldStore(WorldStore):
+    """World stored as loose files under a directory."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / _normalize_key(key)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return None
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def list_keys(self, prefix: str = '') -> List[str]:
+        if not self.root.exists():
+            return []
+        keys = []
+        for path in self.root.rglob('*'):
+            if path.is_file():
+                key = path.relative_to(self.root).as_posix()
+                if key.startswith(prefix) and not _skipped(key):
+                    keys.append(key)
+        return sorted(keys)
+
+    def revision(self, key: str) -> Optional[str]:
+        try:
+            st = self._path(key).stat()
+        except OSError:
+            return None
+        return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+    def local_root(self) -> Optional[Path]:
+        return self.root
+
+
+class ArchiveWorldStore(WorldStore):
+    """
+    Read-only world packed in a zip.
+
+    Archives made by /api/export keep everything under 'dying_lands_output/';
+    a single top-level directory like that is treated as the world root.
+    """
+
+    read_only = True
+
+    def __init__(self, archive_path: Path):
+        self.archive_path = Path(archive_path)
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(self.archive_path)
+        self._members: Dict[str, zipfile.ZipInfo] = {}
+        names = [info for info in self._zip.infolist() if not info.is_dir()]
+        tops = {info.filename.split('/', 1)[0] for info in names if '/' in info.filename}
+        prefix = ''
+        if len(tops) == 1 and all('/' in info.filename for info in names):
+            candidate = next(iter(tops))
+            if not self._looks_like_world_dir(candidate):
+                prefix = candidate + '/'
+        for info in names:
+            key = info.filename[len(prefix):]
+            if key and not _skipped(key):
+                self._members[key] = info
+
+    @staticmethod
+    def _looks_like_world_dir(name: str) -> bool:
+        return name in ('hexes', CHUNKS_DIR, 'city_overlays', 'npcs')
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        info = self._members.get(_normalize_key(key))
+        if info is None:
+            return None
+        with self._lock:
+            return self._zip.read(info)
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        raise PermissionError("Archive world stores are read-only")
+
+    def delete(self, key: str) -> None:
+        raise PermissionError("Archive world stores are read-only")
+
+    def list_keys(self, prefix: str = '') -> List[str]:
+        return sorted(k for k in self._members if k.startswith(prefix))
+
+    def revision(self, key: str) -> Optional[str]:
+        info = self._members.get(_normalize_key(key))
+        return f"{info.CRC:08x}-{info.file_size:x}" if info is not None else None
+
+
+class S3WorldStore(WorldStore):
+    """World stored as objects under an S3 bucket prefix."""
+
+    def __init__(self, bucket: str, prefix: str = '', region: Optional[str] = None,
+                 endpoint_url: Optional[str] = None):
+        # Imported here so local and archive stores never load boto3 (it is only
+        # installed for Lambda deployments and slow to import)
+        try:
+            import boto3  # type: ignore
+            from botocore.exceptions import ClientError  # type: ignore
+        except ImportError:
+            raise RuntimeError("S3 world store requires boto3")
+        self._client_error = ClientError
+        self.bucket = bucket
+        self.prefix = prefix.strip('/') + '/' if prefix.strip('/') else ''
+        self.s3_client = boto3.client('s3', region_name=region, endpoint_url=endpoint_url)
+
+    def _object_key(self, key: str) -> str:
+        return self.prefix + _normalize_key(key)
+
+    @staticmethod
+    def _missing(error: Exception) -> bool:
+        code = getattr(error, 'response', {}).get('Error', {}).get('Code')
+        return code in ('404', 'NoSuchKey', 'NotFound')
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        try:
+            obj = self.s3_client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self._client_error as e:
+            if self._missing(e):
+                return None
+            raise
+        return obj['Body'].read()
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        self.s3_client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=data)
+
+    def delete(self, key: str) -> None:
+        self.s3_client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def list_keys(self, prefix: str = '') -> List[str]:
+        keys = []
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix + prefix):
+            for obj in page.get('Contents', []):
+                key = obj['Key'][len(self.prefix):]
+                if key and not _skipped(key):
+                    keys.append(key)
+        return sorted(keys)
+
+    def revision(self, key: str) -> Optional[str]:
+        try:
+            head = self.s3_client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self._client_error as e:
+            if self._missing(e):
+                return None
+            raise
+        return head.get('ETag')
+
+
+class CachedWorldStore(WorldStore):
+    """
+    Read-through memory cache in front of another store.
+
+    Reads are cached by key with the inner store's revision of it (bounded by
+    entry count and total bytes), and a cached entry is served only while that
+    revision is unchanged, so writes made by other instances are picked up.
+    Local revisions are a stat; remote ones are rechecked at most every
+    _REMOTE_REVISION_TTL seconds. Writes go through to the inner store.
+    """
+
+    def __init__(self, inner: WorldStore, max_entries: int = _CACHE_ENTRIES,
+                 max_bytes: int = _CACHE_MAX_BYTES):
+        self.inner = inner
+        self.read_only = inner.read_only
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.revision_ttl = 0.0 if inner.local_root() is not None else _REMOTE_REVISION_TTL
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Optional[str], bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._revisions: Dict[str, Tuple[float, Optional[str]]] = {}
+
+    def _store(self, key: str, revision: Optional[str], data: bytes) -> None:
+        with self._lock:
+            self._drop_locked(key)
+            if revision is None or len(data) > self.max_bytes:
+                return
+            self._entries[key] = (revision, data)
+            self._bytes += len(data)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                evicted, (_, evicted_data) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted_data)
+                self._revisions.pop(evicted, None)
+
+    def _drop_locked(self, key: str) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[1])
+        self._revisions.pop(key, None)
+
+    def revision(self, key: str) -> Optional[str]:
+        key = _normalize_key(key)
+        if self.revision_ttl > 0:
+            with self._lock:
+                checked = self._revisions.get(key)
+            if checked is not None and time.monotonic() - checked[0] < self.revision_ttl:
+                return checked[1]
+        revision = self.inner.revision(key)
+        if self.revision_ttl > 0:
+            with self._lock:
+                self._revisions[key] = (time.monotonic(), revision)
+        return revision
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        key = _normalize_key(key)
+        revision = self.revision(key)
+        if revision is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == revision:
+                self._entries.move_to_end(key)
+                return entry[1]
+        data = self.inner.get_bytes(key)
+        if data is not None:
+            self._store(key, revision, data)
+        return data
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        key = _normalize_key(key)
+        self.inner.put_bytes(key, data)
+        with self._lock:
+            self._drop_locked(key)
+        self._store(key, self.revision(key), data)
+
+    def delete(self, key: str) -> None:
+        key = _normalize_key(key)
+        self.inner.delete(key)
+        with self._lock:
+            self._drop_locked(key)
+
+    def list_keys(self, prefix: str = '') -> List[str]:
+        return self.inner.list_keys(prefix)
+
+    def local_root(self) -> Optional[Path]:
+        return self.inner.local_root()
+
+    def materialize(self, target_dir: Path) -> int:
+        # Bulk copies bypass the cache
+        return self.inner.materialize(target_dir)
+
+    def fetch(self, target_dir: Path, subdir: str) -> int:
+        return self.inner.fetch(target_dir, subdir)
+
+    def publish(self, source_dir: Path, subdir: str = '') -> int:
+        count = self.inner.publish(source_dir, subdir)
+        self.invalidate()
+        return count
+
+    def invalidate(self) -> None:
+        """Drop every cached entry (after a regeneration, import or publish)."""
+        with self._lock:
+            self._entries.clear()
+            self._revisions.clear()
+            self._bytes = 0
+
+
+def create_world_store(spec: str, output_path: Path) -> WorldStore:
+    """Build a store from a HEXY_WORLD_STORE value (see module docstring)."""
+    spec = (spec or 'local').strip()
+    if spec == 'local':
+        return LocalWorldStore(output_path)
+    if spec.startswith('local:'):
+        return LocalWorldStore(Path(spec[len('local:'):]))
+    if spec.startswith('archive:'):
+        return ArchiveWorldStore(Path(spec[len('archive:'):]))
+    if spec.startswith('s3://'):
+        bucket, _, prefix = spec[len('s3://'):].partition('/')
+        return S3WorldStore(
+            bucket,
+            prefix,
+            region=os.environ.get('AWS_S3_REGION'),
+            endpoint_url=os.environ.get('AWS_S3_ENDPOINT_URL') or None,
+        )
+    raise ValueError(f"Unknown HEXY_WORLD_STORE: {spec}")
+
+
+# Global instance
+_world_store: Optional[CachedWorldStore] = None
+_world_store_lock = threading.Lock()
+
+
+def get_world_store() -> CachedWorldStore:
+    """Global world store configured by HEXY_WORLD_STORE, behind the memory cache."""
+    global _world_store
+    if _world_store is None:
+        with _world_store_lock:
+            if _world_store is None:
+                from backend.config import get_config
+                _world_store = CachedWorldStore(create_world_store(os.getenv('HEXY_WORLD_STORE', 'local'),
+                                                                   get_config().paths.output_path))
+    return _world_store
+
+
+def is_shared_store(store: WorldStore, output_dir: Path) -> bool:
+    """True when store is not simply the app's own output directory."""
+    root = store.local_root()
+    return root is None or root.resolve() != Path(output_dir).resolve()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+The Dying Lands - WSGI Entry Point
+Production entry point for a WSGI server (see backend/gunicorn_conf.py):
+
+    gunicorn -c backend/gunicorn_conf.py backend.wsgi:app
+
+Runs in server mode (no idle shutdown) and warms the shared tables at import,
+so with preload_app every forked worker inherits them copy-on-write.
+"""
+
+import os
+
+# Served deployments must not exit when the desktop heartbeat stops
+os.environ.setdefault('HEXY_SERVER_MODE', '1')
+
+from backend import create_app
+from backend.utils import setup_project_paths, log_operation
+
+
+def warm_up() -> None:
+    """Load the lore tables, hex index, terrain distribution and search index."""
+    try:
+        from backend.routes import config, _get_output_dir_for_language
+        from backend.hex_service import hex_service
+        from backend.search_index import search_indexes
+        from backend.terrain_system import terrain_system
+        from backend.translation_system import translation_system
+
+        terrain_system.get_terrain_distribution()
+        hex_service.get_hex_statistics()
+        search_indexes.get(_get_output_dir_for_language(translation_system.language), hex_service.iter_hex_dicts)
+        log_operation("wsgi_warm_up", True, f"{len(hex_service.attributes)} hexes from {config.paths.output_path}")
+    except Exception as e:
+        # A cold world is generated on first request; never fail the import
+        log_operation("wsgi_warm_up", False, str(e))
+
+
+setup_project_paths()
+app = create_app()
+if os.getenv('HEXY_WARM_UP', '1') != '0':
+    warm_up()
@@ -0,0 +1,5 @@
+"""
+Benchmark suite for The Dying Lands (generation, parsing and API hot paths).
+
+Run with ``python -m benchmarks``; see benchmarks/runner.py.
+"""
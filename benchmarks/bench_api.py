@@ -0,0 +1,52 @@
+"""
+API latency benchmarks through the Flask test client.
+"""
+
+import time
+from typing import List
+
+from benchmarks.runner import BenchContext, Metric, benchmark, latency_metrics
+
+HEX_REQUESTS = 200
+OVERLAY_REQUESTS = 20
+
+
+def _timed_get(client, url: str, **kwargs) -> float:
+    start = time.perf_counter()
+    response = client.get(url, **kwargs)
+    elapsed = time.perf_counter() - start
+    if response.status_code not in (200, 304):
+        raise RuntimeError(f"GET {url} returned {response.status_code}")
+    return elapsed
+
+
+@benchmark('api.hex', order=60)
+def bench_api_hex(ctx: BenchContext) -> List[Metric]:
+    """GET /api/hex/<code> across the map, then revalidation with If-None-Match."""
+    client = ctx.app.test_client()
+    codes = [f"{x:02d}{y:02d}" for x in range(1, 31) for y in range(1, 61)][:HEX_REQUESTS]
+    client.get(f'/api/hex/{codes[0]}')  # load the world outside the measurement
+    samples = [_timed_get(client, f'/api/hex/{code}') for code in codes]
+
+    etags = {code: client.get(f'/api/hex/{code}').headers.get('ETag') for code in codes}
+    revalidations = [
+        _timed_get(client, f'/api/hex/{code}', headers={'If-None-Match': etags[code]})
+        for code in codes if etags[code]
+    ]
+    metrics = latency_metrics('api.hex', samples)
+    if revalidations:
+        metrics.extend(latency_metrics('api.hex.not_modified', revalidations))
+    return metrics
+
+
+@benchmark('api.city_overlay', order=70)
+def bench_api_city_overlay(ctx: BenchContext) -> List[Metric]:
+    """GET /api/city-overlay/<name> (first request generates, the rest are cached)."""
+    client = ctx.app.test_client()
+    names = [o['name'] for o in client.get('/api/city-overlays').get_json().get('overlays', [])]
+    if not names:
+        return []
+    first = _timed_get(client, f'/api/city-overlay/{names[0]}')
+    samples = [_timed_get(client, f'/api/city-overlay/{names[i % len(names)]}') for i in range(OVERLAY_REQUESTS)]
+    return [Metric('api.city_overlay.first_ms', round(first * 1000, 2), 'ms')] + \
+        latency_metrics('api.city_overlay', samples)
@@ -0,0 +1,67 @@
+"""
+Generation benchmarks: full-map throughput, per-type hex content, overlays.
+"""
+
+import time
+from typing import List
+
+from benchmarks.runner import BenchContext, Metric, benchmark, latency_metrics, time_call
+
+CONTENT_SAMPLES = 500
+TERRAIN = 'forest'
+
+
+@benchmark('generation.full_map', order=0)
+def bench_full_map(ctx: BenchContext) -> List[Metric]:
+    """Generate the whole continent into the run's world directory."""
+    from backend.main_map_generator import MainMapGenerator
+    generator = MainMapGenerator({'language': 'en', 'output_directory': str(ctx.output_dir)})
+    start = time.perf_counter()
+    result = generator.generate_full_map({'skip_existing': False})
+    elapsed = time.perf_counter() - start
+    hexes = result.get('generated_count') or generator.map_width * generator.map_height
+    return [
+        Metric('generation.full_map.seconds', round(elapsed, 3), 's'),
+        Metric('generation.full_map.hexes_per_s', round(hexes / elapsed, 1), 'hexes/s', higher_is_better=True),
+    ]
+
+
+@benchmark('generation.hex_content', order=10)
+def bench_hex_content(ctx: BenchContext) -> List[Metric]:
+    """generate_hex_content for each content type (type forced, terrain fixed)."""
+    from backend.main_map_generator import MainMapGenerator
+    generator = MainMapGenerator({'language': 'en', 'output_directory': str(ctx.output_dir)})
+    denizens = generator.terrain_tables.get(TERRAIN, {}).get('denizen_types', [])
+    generators = {
+        'sea': lambda code: generator._generate_sea_content(code, 'sea'),
+        'settlement': lambda code: generator._generate_settlement_content(code, TERRAIN),
+        'dungeon': lambda code: generator._generate_dungeon_content(code, TERRAIN),
+        'beast': lambda code: generator._generate_beast_content(code, TERRAIN),
+        'npc': lambda code: generator._generate_npc_content(code, TERRAIN, denizens),
+    }
+    metrics = []
+    with generator.translation_system.use_language('en'):
+        metrics.extend(latency_metrics(
+            'generation.hex_content.any',
+            time_call(lambda: generator.generate_hex_content('1010'), repeat=CONTENT_SAMPLES),
+        ))
+        for content_type, generate in generators.items():
+            samples = time_call(lambda: generate('1010'), repeat=CONTENT_SAMPLES)
+            metrics.extend(latency_metrics(f'generation.hex_content.{content_type}', samples))
+    return metrics
+
+
+@benchmark('generation.city_overlay', order=20)
+def bench_city_overlay(ctx: BenchContext) -> List[Metric]:
+    """Generate one major-city overlay from scratch."""
+    from backend.city_overlay_analyzer import CityOverlayAnalyzer
+    overlay_dir = ctx.work_dir / 'bench_overlays'
+    analyzer = CityOverlayAnalyzer('en', output_directory=str(overlay_dir))
+    name = analyzer.get_available_overlays()[0]['name']
+
+    def generate():
+        analyzer.invalidate_cache()
+        analyzer.generate_city_overlay(name)
+
+    samples = time_call(generate, repeat=5)
+    return latency_metrics('generation.city_overlay', samples)
@@ -0,0 +1,72 @@
+"""
+Parsing and analysis benchmarks: image terrain classification, HexService
+cold load, ASCII map data.
+"""
+
+import time
+from pathlib import Path
+from typing import List
+
+from benchmarks.runner import ROOT, BenchContext, Metric, benchmark, time_call
+
+MAP_IMAGE = ROOT / 'data' / 'mork_borg_official_map.jpg'
+
+
+@benchmark('parsing.image_analyzer', order=30)
+def bench_image_analyzer(ctx: BenchContext) -> List[Metric]:
+    """Classify every hex of the default grid from the official map image."""
+    from backend.image_analyzer import PILLOW_AVAILABLE, ImageAnalyzer
+    if not PILLOW_AVAILABLE or not MAP_IMAGE.exists():
+        return []
+    analyzer = ImageAnalyzer(str(MAP_IMAGE), 30, 60, mapping_mode='letterbox')
+    codes = [f"{x:02d}{y:02d}" for x in range(1, 31) for y in range(1, 61)]
+
+    def classify():
+        analyzer.terrain_cache.clear()
+        for code in codes:
+            analyzer.get_terrain_for_hex(code)
+
+    samples = time_call(classify, repeat=1, warmup=0)
+    best = min(samples)
+    return [
+        Metric('parsing.image_analyzer.grid_ms', round(best * 1000, 2), 'ms'),
+        Metric('parsing.image_analyzer.hexes_per_s', round(len(codes) / best, 1), 'hexes/s', higher_is_better=True),
+    ]
+
+
+@benchmark('parsing.hex_service_cold_load', order=40)
+def bench_hex_service_cold_load(ctx: BenchContext) -> List[Metric]:
+    """Build a HexService over the generated world with cold parse caches."""
+    ctx.ensure_world()
+    from backend.hex_model import hex_manager
+    from backend.hex_service import HexService
+    from backend.utils.markdown_tokenizer import clear_markdown_cache
+
+    def cold_load():
+        hex_manager.clear_cache()
+        clear_markdown_cache()
+        return HexService()
+
+    samples = time_call(cold_load, repeat=3, warmup=0)
+    best = min(samples)
+    count = len(list((Path(ctx.output_dir) / 'hexes').glob('hex_*.md')))
+    return [
+        Metric('parsing.hex_service_cold_load.ms', round(best * 1000, 1), 'ms'),
+        Metric('parsing.hex_service_cold_load.hexes_per_s', round(count / best, 1), 'hexes/s', higher_is_better=True),
+    ]
+
+
+@benchmark('parsing.ascii_map_data', order=50)
+def bench_ascii_map_data(ctx: BenchContext) -> List[Metric]:
+    """generate_ascii_map_data over the generated world."""
+    ctx.ensure_world()
+    from backend.routes import generate_ascii_map_data
+    with ctx.app.test_request_context('/'):
+        start = time.perf_counter()
+        generate_ascii_map_data()
+        first = time.perf_counter() - start
+        samples = time_call(generate_ascii_map_data, repeat=3, warmup=0)
+    return [
+        Metric('parsing.ascii_map_data.first_ms', round(first * 1000, 1), 'ms'),
+        Metric('parsing.ascii_map_data.ms', round(min(samples) * 1000, 1), 'ms'),
+    ]
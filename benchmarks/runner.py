@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner for The Dying Lands
+Discovers bench_*.py modules, runs every registered benchmark against a
+throwaway world, writes machine-readable results and, when given a baseline,
+compares them with it. Timings are machine-specific, so baselines are measured
+on the machine that compares against them rather than committed.
+
+    python -m benchmarks                                     # run all, report only
+    python -m benchmarks --only api                          # names containing 'api'
+    python -m benchmarks --update-baseline --baseline b.json # store this run as b.json
+    python -m benchmarks --baseline b.json                   # compare with b.json
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+DEFAULT_OUTPUT = BENCH_DIR / 'results.json'
+DEFAULT_TOLERANCE = 0.25
+SEED = 1234
+# Differences below these are timer noise, whatever the ratio
+NOISE_FLOOR = {'ms': 0.05, 's': 0.05}
+
+
+@dataclass
+class Metric:
+    """One measured value of a benchmark."""
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool = False
+    # Tail latencies are reported but too noisy to gate on
+    gate: bool = True
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable[['BenchContext'], List[Metric]]
+    order: int
+
+
+_registry: List[Benchmark] = []
+
+
+def benchmark(name: str, order: int = 100):
+    """Register a benchmark; the function takes a BenchContext and returns Metrics."""
+    def decorator(func):
+        _registry.append(Benchmark(name, func, order))
+        return func
+    return decorator
+
+
+def time_call(func: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> List[float]:
+    """Wall times of repeated calls, in seconds."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def latency_metrics(prefix: str, samples: List[float]) -> List[Metric]:
+    """p50/p95 in milliseconds from per-call samples in seconds."""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return [
+        Metric(f'{prefix}.p50', round(statistics.median(ordered) * 1000, 3), 'ms'),
+        Metric(f'{prefix}.p95', round(p95 * 1000, 3), 'ms', gate=False),
+    ]
+
+
+class BenchContext:
+    """Shared state for one run: a temporary world directory and lazily built fixtures."""
+
+    def __init__(self, work_dir: Path):
+        self.work_dir = work_dir
+        self.output_dir = work_dir / 'dying_lands_output'
+        self._app = None
+
+    def seed(self) -> None:
+        random.seed(SEED)
+
+    def ensure_world(self) -> Path:
+        """Generate the world once (the full-map benchmark normally does it first)."""
+        if not any((self.output_dir / 'hexes').glob('hex_*.md')):
+            from backend.main_map_generator import MainMapGenerator
+            self.seed()
+            MainMapGenerator({'language': 'en', 'output_directory': str(self.output_dir)}).generate_full_map()
+        return self.output_dir
+
+    @property
+    def app(self):
+        if self._app is None:
+            self.ensure_world()
+            from backend import create_app
+            self._app = create_app()
+        return self._app
+
+
+def discover() -> List[Benchmark]:
+    for path in sorted(BENCH_DIR.glob('bench_*.py')):
+        importlib.import_module(f'benchmarks.{path.stem}')
+    return sorted(_registry, key=lambda b: (b.order, b.name))
+
+
+def run(only: Optional[str] = None, verbose: bool = False) -> Dict[str, Any]:
+    work_dir = Path(tempfile.mkdtemp(prefix='hexy-bench-'))
+    # Must be set before backend.config is imported
+    os.environ['HEXY_OUTPUT_DIR'] = str(work_dir / 'dying_lands_output')
+    os.environ.setdefault('HEXY_IDLE_TIMEOUT', '0')
+    os.chdir(ROOT)
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+
+    ctx = BenchContext(work_dir)
+    results: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    for bench in discover():
+        if only and only not in bench.name:
+            continue
+        ctx.seed()
+        print(f"⏱️  {bench.name}...", file=sys.stderr)
+        try:
+            # The generators are chatty; keep their output out of the report
+            with contextlib.redirect_stdout(sys.stderr if verbose else io.StringIO()):
+                metrics = bench.func(ctx)
+            for metric in metrics:
+                results[metric.name] = asdict(metric)
+        except Exception as e:
+            errors[bench.name] = f"{type(e).__name__}: {e}"
+            print(f"❌ {bench.name} failed: {e}", file=sys.stderr)
+    return {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'metrics': results,
+        'errors': errors,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions beyond tolerance, as readable lines."""
+    regressions = []
+    for name, base in baseline.get('metrics', {}).items():
+        metric = current['metrics'].get(name)
+        if metric is None or not base['value'] or not base.get('gate', True):
+            continue
+        if abs(metric['value'] - base['value']) < NOISE_FLOOR.get(base['unit'], 0):
+            continue
+        ratio = metric['value'] / base['value']
+        worse = ratio < 1 - tolerance if base.get('higher_is_better') else ratio > 1 + tolerance
+        if worse:
+            regressions.append(f"{name}: {metric['value']} {metric['unit']} (baseline {base['value']}, x{ratio:.2f})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Run the Hexy benchmark suite.')
+    parser.add_argument('--only', help='Run benchmarks whose name contains this string')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT, help='Where to write results JSON')
+    parser.add_argument('--baseline', type=Path, help='Baseline to compare against (or write with --update-baseline)')
+    parser.add_argument('--tolerance', type=float,
+                        default=float(os.getenv('HEXY_BENCH_TOLERANCE', DEFAULT_TOLERANCE)),
+                        help='Allowed relative slowdown before failing (default 0.25)')
+    parser.add_argument('--update-baseline', action='store_true', help='Store this run as the baseline')
+    parser.add_argument('--verbose', action='store_true', help='Show output printed by the benchmarked code')
+    args = parser.parse_args(argv)
+    if args.update_baseline and args.baseline is None:
+        parser.error('--update-baseline needs --baseline PATH')
+    output = args.output.resolve()
+    baseline_path = args.baseline.resolve() if args.baseline else None
+
+    current = run(args.only, args.verbose)
+    output.write_text(json.dumps(current, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+    for name, metric in sorted(current['metrics'].items()):
+        print(f"{name:45s} {metric['value']:>12} {metric['unit']}")
+    print(f"Results written to {output}")
+
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(current, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+        print(f"Baseline updated: {baseline_path}")
+        return 0 if not current['errors'] else 1
+
+    status = 0
+    if current['errors']:
+        status = 1
+    if baseline_path is None:
+        print("No baseline given; pass --baseline PATH to compare")
+    elif baseline_path.exists():
+        regressions = compare(current, json.loads(baseline_path.read_text(encoding='utf-8')), args.tolerance)
+        for line in regressions:
+            print(f"❌ Regression: {line}")
+        if regressions:
+            status = 1
+        else:
+            print(f"✅ No regressions beyond {args.tolerance:.0%} of baseline")
+    else:
+        print(f"⚠️  No baseline at {baseline_path}; run with --update-baseline to create one")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,55 +1,110 @@
 #!/usr/bin/env python3
 """
-Simple Lambda handler for Hexy Flask app
+Lambda handler for the Hexy Flask app.
+
+The app is built lazily on the first invocation. Before it is imported, the
+world is restored from a prebuilt snapshot (bundled in the package or on /tmp,
+see backend/world_snapshot.py) so HexService loads it instead of the first
+request generating one. Cold-start phase timings are logged and returned in
+a Server-Timing header on the first response.
 """
 
+import json
 import os
 import sys
 import threading
+import time
 from pathlib import Path
 
 # Add current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-_init_error: Exception | None = None
+# The package directory is read-only on Lambda; the world lives on /tmp.
+# Must be set before backend.config is imported.
+os.environ.setdefault('HEXY_OUTPUT_DIR', '/tmp/hexy_output')
+
+_init_lock = threading.Lock()
+_cold_start_timings: dict[str, float] = {}
+_cold_start_pending = True
 app = None
 
-try:
-    from backend import create_app
-    import serverless_wsgi
 
-    app = create_app()
+def _timed(phase: str, fn):
+    start = time.perf_counter()
+    try:
+        return fn()
+    finally:
+        _cold_start_timings[phase] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def _init_app():
+    """Restore the world snapshot and build the app (first invocation only)."""
+    global app
+    from backend.world_snapshot import ensure_world
+
+    world = _timed('snapshot', lambda: ensure_world(Path(os.environ['HEXY_OUTPUT_DIR'])))
+
+    def _create():
+        from backend import create_app
+        return create_app()
 
-    # Optional background reset on cold start
-    if os.environ.get('AUTO_RESET_ON_COLD_START', '1') == '1':
-        def _bg_reset():
-            try:
-                from backend.routes import reset_continent
-                with app.app_context():
-                    try:
-                        reset_continent()  # generate all languages by default
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-        threading.Thread(target=_bg_reset, daemon=True).start()
+    app = _timed('app', _create)
+    print(json.dumps({
+        'event': 'hexy_cold_start',
+        'world': world.get('source'),
+        'hex_count': world.get('hex_count'),
+        'timings_ms': _cold_start_timings,
+    }))
 
-except Exception as e:  # capture init error for later invocations
-    _init_error = e
+
+def _get_app():
+    """The app, building it if needed; raises if initialization fails.
+
+    Failures are not cached: most are transient (S3, /tmp space, a snapshot
+    being replaced), so the next invocation of this warm container retries.
+    """
+    if app is None:
+        with _init_lock:
+            if app is None:
+                _init_app()
+    return app
+
+
+def _server_timing() -> str:
+    return ', '.join(f"{phase};dur={ms}" for phase, ms in _cold_start_timings.items())
 
 
 def lambda_handler(event, context):
     """AWS Lambda entry point."""
-    if _init_error is not None:
+    global _cold_start_pending
+    try:
+        current_app = _get_app()
+    except Exception as e:  # retried on the next invocation
+        print(json.dumps({'event': 'hexy_init_failed', 'error': str(e), 'timings_ms': _cold_start_timings}))
         return {
             'statusCode': 500,
-            'body': f'Initialization error: {str(_init_error)}'
+            'body': f'Initialization error: {str(e)}'
         }
-    assert app is not None
     try:
-        return serverless_wsgi.handle_request(app, event, context)
+        import serverless_wsgi
+        start = time.perf_counter()
+        response = serverless_wsgi.handle_request(current_app, event, context)
+        if _cold_start_pending:
+            _cold_start_pending = False
+            _cold_start_timings['first_request'] = round((time.perf_counter() - start) * 1000, 1)
+            extra = {'Server-Timing': _server_timing(), 'X-Hexy-Cold-Start': '1'}
+            if 'multiValueHeaders' in response:
+                response['multiValueHeaders'].update({k: [v] for k, v in extra.items()})
+            else:
+                response.setdefault('headers', {}).update(extra)
+            print(json.dumps({'event': 'hexy_first_request', 'timings_ms': _cold_start_timings}))
+        return response
     except Exception as e:  # surface runtime errors
         return {
             'statusCode': 500,
             'body': f'Runtime error: {e}'
         }
+
+
+# Alias for configurations that point at handler
+handler = lambda_handler
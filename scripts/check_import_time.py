@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the backend.
+
+Starts a fresh interpreter, builds the app and answers /api/health, and fails
+if that takes longer than the budget or if a heavy module is imported eagerly.
+
+    python scripts/check_import_time.py [--budget-ms 1000]
+
+HEXY_IMPORT_BUDGET_MS overrides the default budget.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that must only load on first use
+LAZY_MODULES = ('cv2', 'PIL', 'numpy', 'boto3', 'markdown')
+
+_PROBE = """
+import json, sys, time, threading
+start = time.perf_counter()
+from backend import create_app
+app = create_app()
+created = time.perf_counter()
+status = app.test_client().get('/api/health').status_code
+done = time.perf_counter()
+from backend.hex_service import hex_service
+print(json.dumps({
+    'create_app_ms': round((created - start) * 1000, 1),
+    'health_ms': round((done - start) * 1000, 1),
+    'status': status,
+    'eager_modules': [m for m in %r if m in sys.modules],
+    'hex_service_loaded': hex_service.is_initialized,
+}))
+""" % (LAZY_MODULES,)
+
+
+def run_probe() -> dict:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = str(ROOT) + os.pathsep + env.get('PYTHONPATH', '')
+    env.setdefault('HEXY_IDLE_TIMEOUT', '0')
+    result = subprocess.run([sys.executable, '-c', _PROBE], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    # The probe's JSON is the last line; the backend may print status lines first
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget-ms', type=float,
+                        default=float(os.getenv('HEXY_IMPORT_BUDGET_MS', '1000')))
+    args = parser.parse_args()
+
+    report = run_probe()
+    print(json.dumps(report, indent=2))
+    failures = []
+    if report['status'] != 200:
+        failures.append(f"/api/health returned {report['status']}")
+    if report['health_ms'] > args.budget_ms:
+        failures.append(f"startup took {report['health_ms']} ms (budget {args.budget_ms:.0f} ms)")
+    if report['eager_modules']:
+        failures.append(f"imported eagerly: {', '.join(report['eager_modules'])}")
+    if report['hex_service_loaded']:
+        failures.append("hex_service was loaded during startup")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Startup within budget")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())